@@ -1,7 +1,11 @@
 from .models import JobApplication, Notification
 from rest_framework import serializers
+from common.serializers import BatchPrimaryKeyRelatedField, Expansion, SparseFieldsetSerializerMixin
+from jobs.models import Job
+from jobs.serializers import JobSerializer
 
-class JobApplicationSerializer(serializers.ModelSerializer):
+class JobApplicationSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    job = BatchPrimaryKeyRelatedField(queryset=Job.objects.all())
     user_email = serializers.ReadOnlyField(source="user.email")
     job_title = serializers.ReadOnlyField(source="job.title")
 
@@ -19,6 +23,7 @@ class JobApplicationSerializer(serializers.ModelSerializer):
             "applied_at"
         ]
         read_only_fields = ["status", "applied_at", "user", "user_email", "job_title"]
+        expandable_fields = {"job": Expansion(JobSerializer)}
         extra_kwargs = {
             "resume": {"required": True, "allow_null": False},
             "cover_letter": {"required": False, "allow_null": True},
@@ -0,0 +1,151 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from common.cache import (
+    JOBS_LIST,
+    NOTIFICATIONS_LIST,
+    bump_generation,
+    user_namespace,
+    versioned_key,
+)
+
+
+class GenerationCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_orphans_only_the_namespace(self):
+        jobs_key = versioned_key(JOBS_LIST, "/api/jobs/")
+        user_key = versioned_key(user_namespace(NOTIFICATIONS_LIST, 1), "/notifications/")
+        cache.set(jobs_key, "jobs")
+        cache.set(user_key, "inbox")
+
+        bump_generation(JOBS_LIST)
+
+        self.assertNotEqual(versioned_key(JOBS_LIST, "/api/jobs/"), jobs_key)
+        self.assertEqual(
+            versioned_key(user_namespace(NOTIFICATIONS_LIST, 1), "/notifications/"), user_key
+        )
+        self.assertEqual(cache.get(user_key), "inbox")
+
+    def test_per_user_namespaces_are_independent(self):
+        first = versioned_key(user_namespace(NOTIFICATIONS_LIST, 1), "/n/")
+        second = versioned_key(user_namespace(NOTIFICATIONS_LIST, 2), "/n/")
+
+        bump_generation(user_namespace(NOTIFICATIONS_LIST, 2))
+
+        self.assertEqual(versioned_key(user_namespace(NOTIFICATIONS_LIST, 1), "/n/"), first)
+        self.assertNotEqual(versioned_key(user_namespace(NOTIFICATIONS_LIST, 2), "/n/"), second)
+
+    def test_bump_without_counter_still_invalidates(self):
+        key = versioned_key(JOBS_LIST, "/api/jobs/")
+        cache.delete("gen:" + JOBS_LIST)
+        bump_generation(JOBS_LIST)
+        self.assertNotEqual(versioned_key(JOBS_LIST, "/api/jobs/"), key)
+
+
+class CanonicalQueryTests(TestCase):
+    allowed = {"location", "search", "page", "page_size", "tags", "cursor"}
+
+    def canonical(self, query, **kwargs):
+        from django.http import QueryDict
+        from common.cache import canonical_query
+
+        kwargs.setdefault("defaults", {"page": 1, "page_size": 10})
+        return canonical_query(QueryDict(query), self.allowed, **kwargs)
+
+    def test_equivalent_queries_share_a_key(self):
+        self.assertEqual(
+            self.canonical("location=Lagos&search=Python%20%20dev&page=1&utm_source=x", casefold={"search"}),
+            self.canonical("search=python+dev&location=Lagos", casefold={"search"}),
+        )
+
+    def test_blank_cursor_is_kept_when_significant(self):
+        self.assertEqual(self.canonical("cursor=", keep_blank={"cursor"}), "cursor=")
+        self.assertEqual(self.canonical("location="), "")
+
+    def test_unordered_values_are_sorted(self):
+        self.assertEqual(self.canonical("tags=3,1&tags=2,1", unordered={"tags"}), "tags=1%2C2%2C3")
+        self.assertEqual(self.canonical("location=a&location=b"), "location=b")
+
+    def test_long_queries_are_hashed(self):
+        query = self.canonical("search=" + "x" * 300)
+        self.assertTrue(query.startswith("sha1="))
+        self.assertEqual(len(query), 45)
+
+
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_fresh_entry_is_not_recomputed(self):
+        from common.cache import get_or_compute
+
+        calls = []
+        compute = lambda: calls.append(1) or "value"
+        self.assertEqual(get_or_compute("k", compute, timeout=60), "value")
+        self.assertEqual(get_or_compute("k", compute, timeout=60), "value")
+        self.assertEqual(len(calls), 1)
+
+    def test_stale_copy_served_while_another_worker_rebuilds(self):
+        from common.cache import get_cache_stats, get_or_compute
+
+        get_or_compute("k", lambda: "old", timeout=60)
+        entry = cache.get("k")
+        entry["expires"] = 0
+        cache.set("k", entry)
+        cache.add("lock:k", 1)  # another worker holds the rebuild lock
+
+        self.assertEqual(get_or_compute("k", lambda: "new", timeout=60), "old")
+        self.assertEqual(get_cache_stats()["stale_serves"], 1)
+
+        cache.delete("lock:k")
+        self.assertEqual(get_or_compute("k", lambda: "new", timeout=60), "new")
+
+    def test_waiter_falls_back_to_computing(self):
+        from common.cache import get_cache_stats, get_or_compute
+
+        cache.add("lock:k", 1)
+        value = get_or_compute("k", lambda: "mine", timeout=60, max_wait=0.1, poll_interval=0.02)
+        self.assertEqual(value, "mine")
+        self.assertEqual(get_cache_stats()["lock_waits"], 1)
+
+    def test_none_is_not_cached(self):
+        from common.cache import get_or_compute
+
+        self.assertIsNone(get_or_compute("k", lambda: None, timeout=60))
+        self.assertIsNone(cache.get("k"))
+        self.assertIsNone(cache.get("lock:k"))
+
+
+class TwoTierCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_lru_evicts_least_recently_used(self):
+        from common.localcache import LocalLRUCache
+
+        lru = LocalLRUCache(maxsize=2, timeout=60)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertEqual(lru.get("b"), (False, None))
+        self.assertEqual(lru.get("a"), (True, 1))
+
+    def test_tiers_and_version_bump(self):
+        from common.localcache import TwoTierCache
+
+        loads = []
+        loader = lambda: loads.append(1) or {"n": len(loads)}
+        first = TwoTierCache("test:ref", version_check_interval=0)
+        other_process = TwoTierCache("test:ref", version_check_interval=0)
+
+        self.assertEqual(first.get_or_load("all", loader), {"n": 1})
+        self.assertEqual(first.get_or_load("all", loader), {"n": 1})
+        self.assertEqual(other_process.get_or_load("all", loader), {"n": 1})
+        self.assertEqual(first.stats(), {"local_hits": 1, "shared_hits": 0, "misses": 1, "size": 1})
+        self.assertEqual(other_process.stats()["shared_hits"], 1)
+
+        bump_generation("test:ref")
+        self.assertEqual(other_process.get_or_load("all", loader), {"n": 2})
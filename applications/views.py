@@ -16,39 +16,36 @@ from rest_framework.parsers import MultiPartParser, FormParser
 import os
 from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
-from django.core.cache import cache
-from django.utils.encoding import iri_to_uri
 from .permissions import IsJobPosterOrAdmin
+from common.cache import (
+    APPLICATIONS_LIST,
+    JOBS_RECOMMENDED,
+    NOTIFICATIONS_LIST,
+    USER_APPLICATIONS_LIST,
+    bump_generation,
+    user_namespace,
+)
+from common.mixins import CachedListMixin, SparseFieldsetMixin
 
 
-class JobApplicationViewSet(viewsets.ModelViewSet):
+class JobApplicationViewSet(CachedListMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = JobApplication.objects.all()
     serializer_class = JobApplicationSerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser)
+    list_cache_namespace = APPLICATIONS_LIST
+    list_cache_timeout = 30
+    list_cache_per_user = True
+    list_cache_query_params = ("fields", "expand")
+    list_cache_unordered_params = ("fields", "expand")
 
     @swagger_auto_schema(
         operation_description="List job applications for the current filter/view.",
         security=[{"Bearer": []}],
     )
     def list(self, request, *args, **kwargs):
-        # Cache list responses; include user id to avoid leaking others' data
-        user_part = (
-            f":user={request.user.pk}"
-            if request.user and request.user.is_authenticated
-            else ""
-        )
-        key = f"applications:list:{iri_to_uri(request.get_full_path())}{user_part}"
-        cached = cache.get(key)
-        if cached is not None:
-            return cached
-
-        response = super().list(request, *args, **kwargs)
-        try:
-            cache.set(key, response, timeout=30)
-        except Exception:
-            pass
-        return response
+        # Cached by CachedListMixin; the user id is part of the key to avoid leaking others' data
+        return super().list(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         # Attach the logged-in user to the application and perform post-create actions
@@ -143,16 +140,17 @@ class JobApplicationViewSet(viewsets.ModelViewSet):
                 recipient,
             )
         finally:
-            # Invalidate simple application-related caches
-            try:
-                if hasattr(cache, "delete_pattern"):
-                    cache.delete_pattern("applications:list:*")
-                    cache.delete_pattern("notifications:list:*")
-                    cache.delete_pattern("user_applications:list:*")
-                else:
-                    cache.clear()
-            except Exception:
-                pass
+            # Invalidate only the caches this application touched: the shared
+            # applications list, the applicant's own list and recommendations,
+            # and the poster's inbox
+            namespaces = [
+                APPLICATIONS_LIST,
+                user_namespace(USER_APPLICATIONS_LIST, application.user_id),
+                user_namespace(JOBS_RECOMMENDED, application.user_id),
+            ]
+            if posted_by:
+                namespaces.append(user_namespace(NOTIFICATIONS_LIST, posted_by.pk))
+            bump_generation(*namespaces)
 
     @swagger_auto_schema(
         operation_description="Create a new job application",
@@ -162,9 +160,10 @@ class JobApplicationViewSet(viewsets.ModelViewSet):
         return super().create(request, *args, **kwargs)
 
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(CachedListMixin, generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    list_cache_timeout = 15
 
     @swagger_auto_schema(
         operation_description="List notifications for the authenticated user",
@@ -176,21 +175,11 @@ class NotificationListView(generics.ListAPIView):
             return Notification.objects.none()  # avoid crash
         return Notification.objects.filter(recipient=user).order_by("-created_at")
 
-    def list(self, request, *args, **kwargs):
-        # Cache per-user notification list briefly
+    def get_list_cache_namespace(self, request):
+        # Cache per-user notification list briefly; anonymous requests are not cached
         if not request.user or not request.user.is_authenticated:
-            return super().list(request, *args, **kwargs)
-        key = f"notifications:list:user={request.user.pk}:{iri_to_uri(request.get_full_path())}"
-        cached = cache.get(key)
-        if cached is not None:
-            return cached
-
-        response = super().list(request, *args, **kwargs)
-        try:
-            cache.set(key, response, timeout=15)
-        except Exception:
-            pass
-        return response
+            return None
+        return user_namespace(NOTIFICATIONS_LIST, request.user.pk)
 
 
 class JobApplicationStatusUpdateView(generics.UpdateAPIView):
@@ -244,21 +233,18 @@ class JobApplicationStatusUpdateView(generics.UpdateAPIView):
                 else:
                     send_application_email_task.delay(to_email, subject, email_message)
 
-        # Invalidate related caches
-        try:
-            if hasattr(cache, "delete_pattern"):
-                cache.delete_pattern("applications:list:*")
-                cache.delete_pattern("notifications:list:*")
-                cache.delete_pattern("user_applications:list:*")
-            else:
-                cache.clear()
-        except Exception:
-            pass
+        # Invalidate related caches (the applicant is the only user affected)
+        bump_generation(
+            APPLICATIONS_LIST,
+            user_namespace(USER_APPLICATIONS_LIST, application.user_id),
+            user_namespace(NOTIFICATIONS_LIST, application.user_id),
+        )
 
 
-class UserJobApplicationsListView(generics.ListAPIView):
+class UserJobApplicationsListView(CachedListMixin, generics.ListAPIView):
     serializer_class = JobApplicationSerializer
     permission_classes = [IsAuthenticated]
+    list_cache_timeout = 20
 
     def get_queryset(self):
         user = self.request.user
@@ -270,21 +256,11 @@ class UserJobApplicationsListView(generics.ListAPIView):
             .order_by("-applied_at")
         )
 
-    def list(self, request, *args, **kwargs):
+    def get_list_cache_namespace(self, request):
         # Cache per-user job applications list
         if not request.user or not request.user.is_authenticated:
-            return super().list(request, *args, **kwargs)
-        key = f"user_applications:list:user={request.user.pk}:{iri_to_uri(request.get_full_path())}"
-        cached = cache.get(key)
-        if cached is not None:
-            return cached
-
-        response = super().list(request, *args, **kwargs)
-        try:
-            cache.set(key, response, timeout=20)
-        except Exception:
-            pass
-        return response
+            return None
+        return user_namespace(USER_APPLICATIONS_LIST, request.user.pk)
 
 
 class MarkNotificationReadView(generics.UpdateAPIView):
@@ -315,6 +291,7 @@ class MarkNotificationReadView(generics.UpdateAPIView):
 
         notification.is_read = True
         notification.save()
+        bump_generation(user_namespace(NOTIFICATIONS_LIST, user.pk))
         return Response(
             {"detail": "Notification marked as read"}, status=status.HTTP_200_OK
         )
\ No newline at end of file
@@ -215,6 +215,19 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "Africa/Lagos"
+# Web processes publish tasks after job writes (jobs.tasks); when the broker is
+# unreachable give up within a second or two instead of retrying for ~20s
+CELERY_BROKER_CONNECTION_TIMEOUT = 2
+CELERY_BROKER_TRANSPORT_OPTIONS = {"max_retries": 1, "interval_start": 0, "interval_step": 0.2, "interval_max": 0.5}
+CELERY_TASK_PUBLISH_RETRY_POLICY = {"max_retries": 1, "interval_start": 0, "interval_step": 0.2, "interval_max": 0.2}
+CELERY_BEAT_SCHEDULE = {
+    # Buffered job view counts -> JobStats and the trending leaderboard
+    "flush-job-views": {"task": "jobs.tasks.flush_job_views", "schedule": 60.0},
+    # Queued saved-search matches -> one notification and email per user
+    "send-job-alert-digests": {"task": "jobs.tasks.send_job_alert_digests", "schedule": 3600.0},
+    # Job matrix for /api/jobs/recommended/ (jobs.recommend.MATRIX_MAX_AGE)
+    "rebuild-job-matrix": {"task": "jobs.tasks.rebuild_job_matrix", "schedule": 300.0},
+}
 
 # ---------------------
 # Caching (use local memory for tests, Redis for dev/prod)
@@ -0,0 +1,225 @@
+import hashlib
+import math
+import random
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+
+# Namespaces for cached list endpoints. Per-user namespaces are built with
+# `user_namespace()` so a write only invalidates the affected user's entries.
+JOBS_LIST = "jobs:list"
+APPLICATIONS_LIST = "applications:list"
+NOTIFICATIONS_LIST = "notifications:list"
+USER_APPLICATIONS_LIST = "user_applications:list"
+# Per-user recommendations; bumped when the user applies to a job
+JOBS_RECOMMENDED = "jobs:recommended"
+# Bumped on every job write; workers re-sync their autocomplete index when it moves
+JOBS_AUTOCOMPLETE = "jobs:autocomplete"
+# Bumped by each view-count flush that changes the trending leaderboard
+JOBS_TRENDING = "jobs:trending"
+# Bumped whenever a category/tag is written; versions their list and detail validators
+JOB_CATEGORIES = "jobs:categories"
+JOB_TAGS = "jobs:tags"
+# Per-object detail namespaces, scoped with `object_namespace()`
+JOB_DETAIL = "jobs:detail"
+COMPANY_DETAIL = "companies:detail"
+
+
+def user_namespace(namespace: str, user_id) -> str:
+    """Scope a namespace to a single user, e.g. `notifications:list:user=7`."""
+    return f"{namespace}:user={user_id}"
+
+
+def object_namespace(namespace: str, pk) -> str:
+    """Scope a namespace to a single object, e.g. `jobs:detail:pk=42`."""
+    return f"{namespace}:pk={pk}"
+
+
+def _generation_key(namespace: str) -> str:
+    return f"gen:{namespace}"
+
+
+def get_generation(namespace: str) -> int:
+    """Return the current generation number of `namespace`.
+
+    A missing counter (first use, or evicted) is seeded from the clock so a new
+    generation can never collide with keys written under an older one.
+    """
+    key = _generation_key(namespace)
+    generation = cache.get(key)
+    if generation is None:
+        generation = int(time.time() * 1000)
+        # add() so concurrent seeders agree on a single value
+        if not cache.add(key, generation, timeout=None):
+            generation = cache.get(key, generation)
+    return generation
+
+
+def versioned_key(namespace: str, suffix: str) -> str:
+    """Build a cache key that embeds the namespace's current generation.
+
+    Bumping the generation orphans every key built under the previous one;
+    the orphans simply age out through their own TTL.
+    """
+    return f"{namespace}:g{get_generation(namespace)}:{suffix}"
+
+
+def bump_generation(*namespaces: str) -> None:
+    """Invalidate every key in each namespace with a single INCR apiece.
+
+    Replaces `delete_pattern()` (a keyspace SCAN on Redis) and `cache.clear()`
+    (which wiped unrelated data on LocMem). Cache errors are swallowed so a
+    cache outage never fails the write that triggered the invalidation.
+    """
+    for namespace in namespaces:
+        key = _generation_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Counter missing: any fresh seed differs from what readers used
+            cache.set(key, int(time.time() * 1000) + 1, timeout=None)
+        except Exception:
+            pass
+
+
+# Longer canonical query strings are replaced by their digest to keep keys short
+MAX_QUERY_KEY_LENGTH = 200
+
+
+def canonical_query(params, allowed, defaults=None, unordered=(), casefold=(), keep_blank=(),
+                    max_length=MAX_QUERY_KEY_LENGTH):
+    """Reduce a QueryDict to a canonical string for use in cache keys.
+
+    - parameters not in `allowed` (tracking params, typos) are dropped
+    - parameters are sorted by name; whitespace in values is collapsed
+    - single-valued parameters keep only their last value, like `QueryDict.get`
+    - `unordered` parameters are treated as sets: repeated and comma-separated
+      values are de-duplicated and sorted
+    - `casefold` parameters are lower-cased (case-insensitive inputs such as search)
+    - values equal to their entry in `defaults` are dropped, as are blank
+      values unless the parameter is listed in `keep_blank`
+    Results longer than `max_length` are hashed; pass None for the full query
+    string, e.g. to build URLs from it.
+    """
+    defaults = defaults or {}
+    items = []
+    for name in sorted(set(params.keys()) & set(allowed)):
+        values = [" ".join(value.split()) for value in params.getlist(name)]
+        if name in casefold:
+            values = [value.lower() for value in values]
+        if name in unordered:
+            parts = {part.strip() for value in values for part in value.split(",")}
+            value = ",".join(sorted(part for part in parts if part))
+        else:
+            value = values[-1] if values else ""
+        if value == "" and name not in keep_blank:
+            continue
+        if name in defaults and value == str(defaults[name]):
+            continue
+        items.append((name, value))
+
+    query = urlencode(items)
+    if max_length is not None and len(query) > max_length:
+        query = "sha1=" + hashlib.sha1(query.encode("utf-8")).hexdigest()
+    return query
+
+
+# Counters (shared across workers via the cache) describing stampede behaviour
+STAT_LOCK_WAITS = "lock_waits"
+STAT_STALE_SERVES = "stale_serves"
+STAT_EARLY_REFRESHES = "early_refreshes"
+
+
+def _stat_key(name: str) -> str:
+    return f"stats:cache:{name}"
+
+
+def _incr_stat(name: str) -> None:
+    key = _stat_key(name)
+    try:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+    except Exception:
+        pass
+
+
+def get_cache_stats() -> dict:
+    """Return the stampede counters as `{name: count}`."""
+    names = (STAT_LOCK_WAITS, STAT_STALE_SERVES, STAT_EARLY_REFRESHES)
+    values = cache.get_many([_stat_key(name) for name in names])
+    return {name: values.get(_stat_key(name), 0) for name in names}
+
+
+def get_or_compute(key, compute, timeout, stale_timeout=None, lock_timeout=10,
+                   max_wait=2.0, poll_interval=0.05, beta=1.0):
+    """Read-through cache with single-flight recomputation.
+
+    Entries are stored with a soft expiry (`timeout`) and kept for another
+    `stale_timeout` seconds (default: `timeout`) so a stale copy exists while
+    one worker rebuilds it:
+
+    - a fresh entry is returned directly, except that each reader may trigger
+      an early refresh with a probability that rises as expiry approaches
+      (XFetch: `now - delta * beta * ln(rand) >= expiry`, `delta` being the
+      last compute time), which spreads rebuilds out before the TTL lapses
+    - only the worker that wins a short `cache.add()` lock recomputes; others
+      get the stale copy if one exists, or poll for up to `max_wait` seconds
+    - if the lock holder never delivers, the waiter computes the value itself
+
+    `compute()` returning None means "do not cache" and is passed through.
+    """
+    stale_timeout = timeout if stale_timeout is None else stale_timeout
+    lock_key = f"lock:{key}"
+
+    def recompute():
+        started = time.monotonic()
+        value = compute()
+        if value is not None:
+            entry = {
+                "value": value,
+                "expires": time.time() + timeout,
+                "delta": time.monotonic() - started,
+            }
+            try:
+                cache.set(key, entry, timeout=timeout + stale_timeout)
+            except Exception:
+                # Silently ignore cache errors
+                pass
+        return value
+
+    def locked_recompute():
+        try:
+            return recompute()
+        finally:
+            cache.delete(lock_key)
+
+    entry = cache.get(key)
+    if entry is not None:
+        now = time.time()
+        stale = now >= entry["expires"]
+        if not stale:
+            # 1 - random() lies in (0, 1], keeping log() finite
+            jitter = -entry["delta"] * beta * math.log(1.0 - random.random())
+            if now + jitter < entry["expires"]:
+                return entry["value"]
+        if cache.add(lock_key, 1, timeout=lock_timeout):
+            if not stale:
+                _incr_stat(STAT_EARLY_REFRESHES)
+            return locked_recompute()
+        if stale:
+            _incr_stat(STAT_STALE_SERVES)
+        return entry["value"]
+
+    if cache.add(lock_key, 1, timeout=lock_timeout):
+        return locked_recompute()
+
+    # Another worker is building this key: wait briefly for its result
+    _incr_stat(STAT_LOCK_WAITS)
+    deadline = time.monotonic() + max_wait
+    while time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry["value"]
+    return recompute()
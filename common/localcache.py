@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from .cache import get_generation
+
+
+class LocalLRUCache:
+    """Thread-safe, process-local LRU cache with a per-entry TTL and a size bound."""
+
+    def __init__(self, maxsize=128, timeout=300):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return `(found, value)`; expired entries count as missing."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return False, None
+            expires, value = item
+            if expires <= time.monotonic():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TwoTierCache:
+    """Process-local LRU in front of the shared cache, versioned by a generation namespace.
+
+    Lookups go local LRU -> shared cache -> `loader()`. Entries are keyed by
+    the namespace generation, so `bump_generation(namespace)` in any process
+    retires them everywhere. The generation itself is re-read from the shared
+    cache at most every `version_check_interval` seconds; a writer in this
+    process should also call `invalidate()` to see its change immediately.
+    Meant for small, read-mostly reference data.
+    """
+
+    def __init__(self, namespace, maxsize=128, timeout=300, shared_timeout=3600,
+                 version_check_interval=1.0):
+        self.namespace = namespace
+        self.local = LocalLRUCache(maxsize=maxsize, timeout=timeout)
+        self.shared_timeout = shared_timeout
+        self.version_check_interval = version_check_interval
+        self._version = None
+        self._version_checked_at = 0.0
+        self._stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+    def _current_version(self):
+        now = time.monotonic()
+        if self._version is None or now - self._version_checked_at >= self.version_check_interval:
+            self._version = get_generation(self.namespace)
+            self._version_checked_at = now
+        return self._version
+
+    def get_or_load(self, name, loader):
+        version = self._current_version()
+        found, value = self.local.get((name, version))
+        if found:
+            self._stats["local_hits"] += 1
+            return value
+
+        shared_key = f"{self.namespace}:g{version}:{name}"
+        value = cache.get(shared_key)
+        if value is not None:
+            self._stats["shared_hits"] += 1
+        else:
+            self._stats["misses"] += 1
+            value = loader()
+            try:
+                cache.set(shared_key, value, timeout=self.shared_timeout)
+            except Exception:
+                # Silently ignore cache errors
+                pass
+        self.local.set((name, version), value)
+        return value
+
+    def invalidate(self):
+        """Drop local entries and force the next lookup to re-read the version."""
+        self.local.clear()
+        self._version = None
+
+    def stats(self):
+        """Return this process's hit/miss counters and the local entry count."""
+        return {**self._stats, "size": len(self.local)}
@@ -0,0 +1,455 @@
+import hashlib
+import time
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .cache import (
+    MAX_QUERY_KEY_LENGTH,
+    canonical_query,
+    get_generation,
+    get_or_compute,
+    object_namespace,
+    versioned_key,
+)
+from .serializers import plan_queryset
+
+
+class RenderedResponseCacheMixin:
+    """Serve a view action from a cache of its rendered response.
+
+    Only the final bytes are stored, together with status, content type and an
+    ETag, so a hit is a single cache GET that skips the queryset, the
+    serializer and the renderer entirely. Misses and expiring entries are
+    rebuilt single-flight through `common.cache.get_or_compute`.
+    """
+
+    def cached_response(self, key, timeout, handler, request, *args, **kwargs):
+        # get_or_compute() makes sure only one worker rebuilds a missing or
+        # expiring entry; the worker that does so returns the live Response.
+        computed = {}
+
+        def compute():
+            response = handler(request, *args, **kwargs)
+            computed["response"] = response
+            if response.status_code != 200:
+                return None
+            return self.render_cache_entry(request, response)
+
+        entry = get_or_compute(key, compute, timeout=timeout)
+        if "response" in computed:
+            return computed["response"]
+        return self.build_cached_response(entry)
+
+    def render_cache_entry(self, request, response):
+        """Render `response` the way finalize_response() would and describe it for the cache."""
+        response.accepted_renderer = request.accepted_renderer
+        response.accepted_media_type = request.accepted_media_type
+        response.renderer_context = self.get_renderer_context()
+        response.render()
+        etag = f'"{hashlib.md5(response.content).hexdigest()}"'
+        response["ETag"] = etag
+        return {
+            "body": response.content,
+            "status": response.status_code,
+            "content_type": response["Content-Type"],
+            "etag": etag,
+        }
+
+    def build_cached_response(self, entry):
+        response = HttpResponse(
+            entry["body"], status=entry["status"], content_type=entry["content_type"]
+        )
+        response["ETag"] = entry["etag"]
+        return response
+
+
+class CachedListMixin(RenderedResponseCacheMixin):
+    """Cache the rendered body of `list` responses under a generation namespace.
+
+    See RenderedResponseCacheMixin for how entries are stored and rebuilt.
+    Invalidate with `common.cache.bump_generation(namespace)`.
+
+    Views configure it with:
+    - `list_cache_namespace`: namespace to store entries under (None disables caching)
+    - `list_cache_timeout`: TTL in seconds
+    - `list_cache_per_user`: add the requesting user's id to the key
+    - `list_cache_query_params`: extra query params to keep in the key; the
+      filterset fields, search/ordering params and pagination params are
+      allowed automatically and everything else is dropped
+    - `list_cache_unordered_params`: multi-value params whose value order does
+      not matter (sorted and de-duplicated in the key)
+    Override `get_list_cache_namespace()` for per-user namespaces.
+
+    Entries are shared by every query with the same canonical form, so the
+    pagination links in them are built from that form (see
+    `common.pagination.get_base_url`) rather than from the caching request.
+    """
+
+    list_cache_namespace = None
+    list_cache_timeout = 30
+    list_cache_per_user = False
+    list_cache_query_params = ()
+    list_cache_unordered_params = ()
+
+    def get_list_cache_namespace(self, request):
+        return self.list_cache_namespace
+
+    def get_list_cache_query_params(self):
+        """Return (allowed, defaults, casefold, keep_blank) for the canonical key."""
+        allowed = set(self.list_cache_query_params)
+        defaults, casefold, keep_blank = {}, set(), set()
+
+        filterset_class = getattr(self, "filterset_class", None)
+        if filterset_class is not None:
+            allowed.update(filterset_class.base_filters)
+        for backend in getattr(self, "filter_backends", []):
+            if hasattr(backend, "search_param"):
+                allowed.add(backend.search_param)
+                casefold.add(backend.search_param)
+            if hasattr(backend, "ordering_param"):
+                allowed.add(backend.ordering_param)
+
+        paginator = self.paginator
+        if paginator is not None:
+            page_param = getattr(paginator, "page_query_param", None)
+            if page_param:
+                allowed.add(page_param)
+                defaults[page_param] = 1
+            size_param = getattr(paginator, "page_size_query_param", None)
+            if size_param:
+                allowed.add(size_param)
+                defaults[size_param] = paginator.page_size
+            cursor_class = getattr(paginator, "cursor_pagination_class", None)
+            if cursor_class is not None:
+                # An empty cursor is meaningful: it selects keyset mode
+                allowed.add(cursor_class.cursor_query_param)
+                keep_blank.add(cursor_class.cursor_query_param)
+        return allowed, defaults, casefold, keep_blank
+
+    def get_list_cache_query(self, request, max_length=MAX_QUERY_KEY_LENGTH):
+        allowed, defaults, casefold, keep_blank = self.get_list_cache_query_params()
+        return canonical_query(
+            request.query_params,
+            allowed,
+            defaults=defaults,
+            unordered=self.list_cache_unordered_params,
+            casefold=casefold,
+            keep_blank=keep_blank,
+            max_length=max_length,
+        )
+
+    def get_list_cache_suffix(self, request):
+        query = self.get_list_cache_query(request)
+        # The negotiated format is part of the key: JSON and the browsable API
+        # render the same data to different bytes. So are scheme and host,
+        # which the absolute pagination links embed.
+        suffix = f"{request.accepted_renderer.format}:{request.build_absolute_uri(request.path)}?{query}"
+        if self.list_cache_per_user and request.user and request.user.is_authenticated:
+            suffix = f"{suffix}:user={request.user.pk}"
+        return suffix
+
+    def get_list_cache_key(self, request):
+        namespace = self.get_list_cache_namespace(request)
+        if namespace is None:
+            return None
+        return versioned_key(namespace, self.get_list_cache_suffix(request))
+
+    def list(self, request, *args, **kwargs):
+        key = self.get_list_cache_key(request)
+        if key is None:
+            return super().list(request, *args, **kwargs)
+        query = self.get_list_cache_query(request, max_length=None)
+        request.pagination_base_url = request.build_absolute_uri(
+            f"{request.path}?{query}" if query else request.path
+        )
+        return self.cached_response(
+            key, self.list_cache_timeout, super().list, request, *args, **kwargs
+        )
+
+
+class CachedDetailMixin(RenderedResponseCacheMixin):
+    """Cache the rendered body of `retrieve` responses per object.
+
+    Every object gets its own generation namespace (`<namespace>:pk=<pk>`),
+    so `bump_generation(object_namespace(namespace, pk))` drops all of its
+    cached representations (formats, `?fields=`/`?expand=` variants) at once
+    without touching other objects. Views configure it with:
+    - `detail_cache_namespace`: base namespace (None disables caching)
+    - `detail_cache_timeout`: TTL in seconds
+    - `detail_cache_query_params`: query params that change the representation;
+      requests carrying any other param are not cached
+    - `detail_cache_expansions`: `{expansion: namespace}` for `?expand=`
+      relations rendered from shared data (e.g. category names); their
+      generations are folded into the key, so a rename retires every object's
+      expanded entries without bumping each object
+    Only integer primary keys are cached, so `/007/` and `/7/` share one entry.
+    """
+
+    detail_cache_namespace = None
+    detail_cache_timeout = 300
+    detail_cache_query_params = ()
+    detail_cache_expansions = {}
+
+    def get_detail_cache_pk(self):
+        value = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def get_detail_cache_namespace(self):
+        pk = self.get_detail_cache_pk()
+        if self.detail_cache_namespace is None or pk is None:
+            return None
+        return object_namespace(self.detail_cache_namespace, pk)
+
+    def get_detail_cache_dependencies(self, request):
+        """Generations of the `detail_cache_expansions` namespaces this request expands."""
+        expand = {part.strip() for part in (request.query_params.get("expand") or "").split(",")}
+        return tuple(
+            get_generation(namespace)
+            for name, namespace in sorted(self.detail_cache_expansions.items())
+            if name in expand
+        )
+
+    def get_detail_cache_key(self, request):
+        namespace = self.get_detail_cache_namespace()
+        if namespace is None or set(request.query_params) - set(self.detail_cache_query_params):
+            return None
+        query = canonical_query(
+            request.query_params,
+            self.detail_cache_query_params,
+            unordered=self.detail_cache_query_params,
+        )
+        suffix = f"{request.accepted_renderer.format}?{query}"
+        dependencies = self.get_detail_cache_dependencies(request)
+        if dependencies:
+            suffix += "#" + ".".join(map(str, dependencies))
+        return versioned_key(namespace, suffix)
+
+    def retrieve(self, request, *args, **kwargs):
+        key = self.get_detail_cache_key(request)
+        if key is None:
+            return super().retrieve(request, *args, **kwargs)
+        return self.cached_response(
+            key, self.detail_cache_timeout, super().retrieve, request, *args, **kwargs
+        )
+
+
+class SparseFieldsetMixin:
+    """Wire `?fields=` and `?expand=` into the serializer and the queryset.
+
+    Pairs with `common.serializers.SparseFieldsetSerializerMixin`: the parsed
+    names go into the serializer context, and `filter_queryset()` plans the
+    queryset from the resulting serializer (`.only()` for `?fields=`,
+    `select_related`/`prefetch_related` for expansions) so a new expansion
+    can never introduce an N+1. Applies to safe requests on
+    `sparse_fieldset_actions` only.
+    """
+
+    fields_query_param = "fields"
+    expand_query_param = "expand"
+    sparse_fieldset_actions = ("list", "retrieve")
+
+    def _uses_sparse_fieldsets(self):
+        request = getattr(self, "request", None)
+        return (
+            request is not None
+            and request.method in SAFE_METHODS
+            and getattr(self, "action", None) in self.sparse_fieldset_actions
+            and not getattr(self, "swagger_fake_view", False)
+        )
+
+    def _split_param(self, name):
+        raw = self.request.query_params.get(name)
+        if raw is None:
+            return None
+        return tuple(dict.fromkeys(part.strip() for part in raw.split(",") if part.strip()))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self._uses_sparse_fieldsets():
+            context["fields"] = self._split_param(self.fields_query_param)
+            context["expand"] = self._split_param(self.expand_query_param) or ()
+        return context
+
+    def get_sparse_required_fields(self, queryset):
+        """Columns the view itself reads: the pk plus ordering/pagination keys."""
+        model = queryset.model
+        fields = [model._meta.pk.name]
+        fields.extend(getattr(self, "ordering_fields", None) or ())
+        fields.extend(name.lstrip("-") for name in model._meta.ordering)
+        return fields
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not self._uses_sparse_fieldsets():
+            return queryset
+        return plan_queryset(
+            queryset,
+            self.get_serializer(),
+            required_fields=self.get_sparse_required_fields(queryset),
+            restrict_columns=self._split_param(self.fields_query_param) is not None,
+        )
+
+
+class ConditionalGetMixin:
+    """ETag / Last-Modified validators and 304 responses for `list` and `retrieve`.
+
+    Validators are computed before the queryset is evaluated or anything is
+    serialized, so a matching `If-None-Match` / `If-Modified-Since` costs at
+    most one cheap query:
+    - list, with a cache namespace (`get_list_cache_namespace()` from
+      CachedListMixin, or `conditional_namespace`): ETag from the namespace
+      generation; no query at all
+    - list, otherwise: ETag and Last-Modified from `Max(<timestamp field>)`
+      and `Count` over the filtered queryset
+    - retrieve: ETag and Last-Modified from the object's timestamp field
+      (plus the namespace generation if set, e.g. CachedDetailMixin's
+      per-object one), read with a `values_list` query; `?expand=` responses
+      embed other rows and get no Last-Modified
+
+    ETags also cover the request path, query string, renderer format and
+    user, so `?fields=`, `?expand=` or per-user data never share a validator.
+    Configure with:
+    - `conditional_namespace`: generation namespace bumped on every write
+    - `conditional_timestamp_field`: model field updated on every write, or None
+    - `conditional_etag_ttl`: seconds after which list ETags roll over even
+      without a write, for listings that also change with time
+    """
+
+    conditional_namespace = None
+    conditional_timestamp_field = "updated_at"
+    conditional_etag_ttl = None
+
+    def get_conditional_namespace(self, request):
+        # Reuse the generation that versions the cached response, if any
+        if self.action == "list" and hasattr(self, "get_list_cache_namespace"):
+            namespace = self.get_list_cache_namespace(request)
+            if namespace is not None:
+                return namespace
+        if self.action == "retrieve" and hasattr(self, "get_detail_cache_namespace"):
+            namespace = self.get_detail_cache_namespace()
+            if namespace is not None:
+                return namespace
+        return self.conditional_namespace
+
+    def _make_etag(self, request, *parts):
+        user = getattr(request, "user", None)
+        seed = [
+            request.accepted_renderer.format,
+            request.get_full_path(),
+            user.pk if user is not None and user.is_authenticated else "",
+            *parts,
+        ]
+        if self.conditional_etag_ttl and self.action == "list":
+            seed.append(int(time.time() // self.conditional_etag_ttl))
+        return f'W/"{hashlib.md5(repr(seed).encode("utf-8")).hexdigest()}"'
+
+    def get_list_validators(self, request):
+        """Return `(etag, last_modified)` for the list, either may be None."""
+        namespace = self.get_conditional_namespace(request)
+        if namespace is not None:
+            return self._make_etag(request, get_generation(namespace)), None
+        field = self.conditional_timestamp_field
+        if field is None:
+            return None, None
+        row = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            last_modified=Max(field), count=Count("pk")
+        )
+        return self._make_etag(request, row["last_modified"], row["count"]), row["last_modified"]
+
+    def get_object_validators(self, request):
+        """Return `(etag, last_modified)` for the requested object, or (None, None) if unknown."""
+        namespace = self.get_conditional_namespace(request)
+        generation = get_generation(namespace) if namespace is not None else None
+        # Expanded shared data (CachedDetailMixin) versions the response too
+        dependencies = ()
+        if hasattr(self, "get_detail_cache_dependencies"):
+            dependencies = self.get_detail_cache_dependencies(request)
+        field = self.conditional_timestamp_field
+        if field is None:
+            if generation is None:
+                return None, None
+            return self._make_etag(request, generation, *dependencies), None
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            timestamps = list(
+                self.get_queryset()
+                .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+                .values_list(field, flat=True)[:1]
+            )
+        except (TypeError, ValueError, ValidationError):
+            # A malformed lookup value (e.g. /jobs/abc/) names no object
+            return None, None
+        if not timestamps:
+            # Let retrieve() produce the 404
+            return None, None
+        # Expanded relations (e.g. ?expand=company) change without touching
+        # the object's timestamp, so only the ETag can vouch for them
+        expand_param = getattr(self, "expand_query_param", None)
+        last_modified = None if expand_param and request.query_params.get(expand_param) else timestamps[0]
+        return self._make_etag(request, timestamps[0], generation, *dependencies), last_modified
+
+    def conditional_response(self, request, validators, handler, *args, **kwargs):
+        etag, last_modified = validators
+        last_modified_ts = int(last_modified.timestamp()) if last_modified is not None else None
+        response = None
+        if etag is not None or last_modified is not None:
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified_ts)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if not 200 <= response.status_code < 300:
+                return response
+        if etag is not None:
+            response["ETag"] = etag
+        if last_modified_ts is not None:
+            response["Last-Modified"] = http_date(last_modified_ts)
+        # Clients must revalidate rather than reuse heuristically
+        patch_cache_control(response, no_cache=True)
+        patch_vary_headers(response, ["Authorization"])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, self.get_list_validators(request), super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, self.get_object_validators(request), super().retrieve, *args, **kwargs
+        )
+
+
+class ReferenceDataMixin:
+    """Serve `list`/`retrieve` of small reference tables from `reference_loader()`.
+
+    The loader returns an ordered `{pk: instance}` mapping held in memory
+    (e.g. a `common.localcache.TwoTierCache`), so neither action queries
+    the database.
+    """
+
+    reference_loader = None
+
+    def list(self, request, *args, **kwargs):
+        items = list(self.reference_loader().values())
+        page = self.paginate_queryset(items)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(items, many=True).data)
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            pk = int(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+            instance = self.reference_loader()[pk]
+        except (KeyError, ValueError):
+            raise NotFound()
+        return Response(self.get_serializer(instance).data)
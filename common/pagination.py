@@ -1,4 +1,23 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connection
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def get_base_url(request):
+    """Return the absolute URL that pagination links for `request` are built from.
+
+    That is the request's own URL unless a response cache set
+    `pagination_base_url` to the canonical URL its entry is shared under
+    (see common.mixins.CachedListMixin).
+    """
+    return getattr(request, "pagination_base_url", None) or request.build_absolute_uri()
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -11,3 +30,248 @@ class StandardResultsSetPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
+
+    def get_next_link(self):
+        if not self.page.has_next():
+            return None
+        return replace_query_param(
+            get_base_url(self.request), self.page_query_param, self.page.next_page_number()
+        )
+
+    def get_previous_link(self):
+        if not self.page.has_previous():
+            return None
+        url, page_number = get_base_url(self.request), self.page.previous_page_number()
+        if page_number == 1:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, page_number)
+
+
+def approximate_row_count(queryset):
+    """Return the planner's row estimate for `queryset`, or None.
+
+    An unfiltered queryset reads `pg_class.reltuples` (maintained by
+    VACUUM/ANALYZE); a filtered one, such as a default "open jobs" listing,
+    takes the top-level row estimate from `EXPLAIN`. Either way it costs
+    planning only, never a `COUNT(*)` scan. Only available on Postgres;
+    returns None elsewhere or when the table was never analyzed.
+    """
+    if connection.vendor != "postgresql":
+        return None
+    if queryset.query.where:
+        plan = json.loads(queryset.order_by().explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class KeysetPagination(BasePagination):
+    """Forward-only keyset (seek) pagination.
+
+    Rows are ordered by the view's requested ordering (via OrderingFilter) or
+    `ordering`, with `id` appended as a unique tie-breaker. The cursor stores
+    the sort key of the last row served, and the next page is fetched with a
+    `WHERE (key) > (cursor)` predicate instead of `OFFSET`, so every page costs
+    the same index range scan and no `COUNT(*)` is run. Nullable sort fields
+    are ordered NULLS LAST on every backend so the seek predicate is total.
+
+    Requests without filter or search params additionally report
+    `approximate_count` from the planner statistics (Postgres only; null
+    otherwise).
+
+    Querysets ordered by a computed annotation (search relevance, fuzzy
+    similarity, distance) cannot be seeked; without an explicit `?ordering=`
+    such requests are rejected with a 400 rather than silently re-sorted.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "id")
+    invalid_cursor_message = "Invalid cursor"
+    ranked_cursor_message = (
+        "Ranked results cannot be paged with a cursor; use page numbers or pass an explicit ordering."
+    )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = get_base_url(request)
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.model = queryset.model
+        self.approximate_count = (
+            approximate_row_count(queryset) if self.is_unfiltered(request, view) else None
+        )
+
+        queryset = queryset.order_by(*self._order_by_expressions())
+        position = self.decode_cursor(request)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self._seek_filter(position))
+            except (DjangoValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        self.has_next = len(results) > self.page_size
+        return self.page
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size,
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def is_unfiltered(self, request, view):
+        """True when the request only carries pagination and ordering params."""
+        allowed = {self.cursor_query_param, self.page_size_query_param}
+        for backend in getattr(view, "filter_backends", []):
+            if hasattr(backend, "ordering_param"):
+                allowed.add(backend.ordering_param)
+        return set(request.query_params) <= allowed
+
+    def get_ordering(self, request, queryset, view):
+        """Resolve the ordering from the view's OrderingFilter, then add `id`.
+
+        Raises a 400 for a queryset ordered by an annotation with no explicit ordering.
+        """
+        ordering, requested = list(self.ordering), None
+        for backend in getattr(view, "filter_backends", []):
+            if hasattr(backend, "get_ordering"):
+                requested = backend().get_ordering(request, queryset, view)
+                if requested:
+                    ordering = list(requested)
+                break
+        # A rank left in place by a filter (e.g. `-search_rank`) has no column to seek on
+        if not requested and any(
+            str(field).lstrip("-") in queryset.query.annotations for field in queryset.query.order_by
+        ):
+            raise ValidationError({self.cursor_query_param: [self.ranked_cursor_message]})
+        if not any(field.lstrip("-") == "id" for field in ordering):
+            ordering.append("id")
+        return tuple(ordering)
+
+    def _is_nullable(self, name):
+        return self.model._meta.get_field(name).null
+
+    def _order_by_expressions(self):
+        expressions = []
+        for field in self.ordering:
+            name = field.lstrip("-")
+            expr = F(name)
+            if field.startswith("-"):
+                expressions.append(expr.desc(nulls_last=True))
+            else:
+                expressions.append(expr.asc(nulls_last=True))
+        return expressions
+
+    def _seek_filter(self, position):
+        """Build `(k1, k2, ...) > (v1, v2, ...)` honouring per-field direction and NULLS LAST."""
+        condition = Q()
+        equal_prefix = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip("-")
+            if value is None:
+                # NULLs sort last: only ties on later keys can follow a NULL
+                equal_prefix &= Q(**{f"{name}__isnull": True})
+                continue
+            lookup = "lt" if field.startswith("-") else "gt"
+            beyond = Q(**{f"{name}__{lookup}": value})
+            if self._is_nullable(name):
+                beyond |= Q(**{f"{name}__isnull": True})
+            condition |= equal_prefix & beyond
+            equal_prefix &= Q(**{name: value})
+        return condition
+
+    def _position_from_instance(self, instance):
+        position = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip("-"))
+            if value is None:
+                position.append(None)
+            elif hasattr(value, "isoformat"):
+                position.append(value.isoformat())
+            else:
+                position.append(str(value))
+        return position
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8"))
+            ordering, position = tuple(payload["o"]), list(payload["p"])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        # A cursor is only meaningful for the ordering it was minted under
+        if ordering != self.ordering or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, position):
+        payload = json.dumps({"o": list(self.ordering), "p": position}, separators=(",", ":"))
+        encoded = urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._position_from_instance(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "approximate_count": self.approximate_count,
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "approximate_count": {"type": "integer", "nullable": True},
+                "results": schema,
+            },
+        }
+
+
+class PageOrCursorPagination(StandardResultsSetPagination):
+    """Page-number pagination by default; keyset pagination when `?cursor=` is sent.
+
+    Existing clients keep the `count`/`next`/`previous` page-number contract.
+    Clients that pass `cursor` (an empty value starts at the first page) get
+    KeysetPagination instead, which avoids `COUNT(*)` and deep `OFFSET` scans.
+    """
+
+    cursor_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.cursor_pagination_class.cursor_query_param in request.query_params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,258 @@
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+
+class Expansion:
+    """Declares a relation that clients may inline with `?expand=<name>`.
+
+    The relation is fetched with `select_related` (forward FK / one-to-one) or
+    `prefetch_related` (many-valued), chosen from the model field, so every
+    expansion is loaded in a constant number of queries.
+    """
+
+    def __init__(self, serializer_class, source=None):
+        self.serializer_class = serializer_class
+        self.source = source
+
+
+class SparseFieldsetSerializerMixin:
+    """Restrict output to `?fields=` and inline relations listed in `?expand=`.
+
+    The requested names are read from the serializer context (`fields`,
+    `expand`), which SparseFieldsetMixin fills in on the view. Expandable
+    relations are declared on the serializer:
+
+        class Meta:
+            expandable_fields = {"category": Expansion(JobCategorySerializer)}
+            # Model fields read by SerializerMethodFields; an undeclared method
+            # field disables column pruning for the whole serializer.
+            method_field_sources = {"description_snippet": ()}
+
+    Only the top-level serializer is reshaped; nested serializers render in full.
+    """
+
+    def get_expandable_fields(self):
+        return getattr(getattr(self, "Meta", None), "expandable_fields", {})
+
+    def _is_root_serializer(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_root_serializer():
+            return fields
+
+        expandable = self.get_expandable_fields()
+        requested = self.context.get("fields")
+        expand = self.context.get("expand") or ()
+
+        unknown = [name for name in expand if name not in expandable]
+        if unknown:
+            raise serializers.ValidationError(
+                {"expand": [f"Cannot expand: {', '.join(unknown)}. Choices: {', '.join(sorted(expandable))}."]}
+            )
+        for name in expand:
+            spec = expandable[name]
+            model_field = self.Meta.model._meta.get_field(spec.source or name)
+            many = model_field.many_to_many or model_field.one_to_many
+            kwargs = {"many": many, "read_only": True}
+            if spec.source and spec.source != name:
+                kwargs["source"] = spec.source
+            fields[name] = spec.serializer_class(**kwargs)
+
+        if requested is not None:
+            unknown = [name for name in requested if name not in fields]
+            if unknown:
+                raise serializers.ValidationError(
+                    {"fields": [f"Unknown fields: {', '.join(unknown)}. Choices: {', '.join(fields)}."]}
+                )
+            keep = set(requested) | set(expand)
+            for name in list(fields):
+                if name not in keep:
+                    fields.pop(name)
+        return fields
+
+
+class BatchManyRelatedField(serializers.ManyRelatedField):
+    """Many-valued relation that resolves every submitted pk with one query.
+
+    All unknown pks are reported together in a single error instead of one
+    lookup (and one error) per item. Duplicates are collapsed.
+    """
+
+    default_error_messages = {
+        "does_not_exist": _("Invalid pks {pk_values} - objects do not exist."),
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+
+        pks = list(dict.fromkeys(self.child_relation.to_pk(item) for item in data))
+        found = self.child_relation.resolve_many(pks)
+        missing = [str(pk) for pk in pks if pk not in found]
+        if missing:
+            self.fail("does_not_exist", pk_values=", ".join(missing))
+        return [found[pk] for pk in pks]
+
+
+class BatchPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField that resolves pks in bulk.
+
+    A single value costs one query like the stock field; with `many=True` the
+    field becomes a BatchManyRelatedField and resolves the whole list with one
+    `in_bulk()` query. Subclasses may override `resolve_many()` to read from
+    somewhere other than the database.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BatchManyRelatedField(**list_kwargs)
+
+    def to_pk(self, data):
+        """Coerce submitted data to the model's pk type or fail with `incorrect_type`."""
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return self.get_queryset().model._meta.pk.to_python(data)
+        except DjangoValidationError:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+    def resolve_many(self, pks):
+        """Return `{pk: instance}` for the pks that exist."""
+        return self.get_queryset().in_bulk(pks)
+
+    def to_internal_value(self, data):
+        pk = self.to_pk(data)
+        found = self.resolve_many([pk])
+        if pk not in found:
+            self.fail("does_not_exist", pk_value=data)
+        return found[pk]
+
+
+class CachedPrimaryKeyRelatedField(BatchPrimaryKeyRelatedField):
+    """BatchPrimaryKeyRelatedField that resolves pks from an in-memory `{pk: instance}` mapping.
+
+    `lookup` is a callable returning the mapping (e.g. backed by
+    `common.localcache.TwoTierCache`), so validating a write costs no query.
+    `queryset` is still required for schema generation and the browsable API.
+    The mapping can trail a delete in another process, so save through
+    `save_checking_references()` to let the database have the final word.
+    """
+
+    def __init__(self, lookup=None, **kwargs):
+        self.lookup = lookup
+        super().__init__(**kwargs)
+
+    def resolve_many(self, pks):
+        mapping = self.lookup()
+        return {pk: mapping[pk] for pk in pks if pk in mapping}
+
+
+def save_checking_references(serializer, **kwargs):
+    """`serializer.save(**kwargs)` in a transaction, failing with a 400 on a dangling reference.
+
+    Foreign keys are checked when the transaction commits; an object deleted
+    since validation then rolls the whole write back instead of raising a 500
+    (or, outside a transaction, leaving the row saved without its M2M links).
+    """
+    try:
+        with transaction.atomic():
+            return serializer.save(**kwargs)
+    except IntegrityError:
+        raise serializers.ValidationError(
+            {"non_field_errors": ["A referenced object no longer exists."]}
+        )
+
+
+def _collect_relations(serializer, opts, prefix, select_related, prefetch_related, prefetched=False):
+    """Record the select/prefetch lookups `serializer` and its nested serializers need.
+
+    Below a prefetched relation every further lookup must be prefetched too.
+    """
+    for field in serializer.fields.values():
+        if field.source == "*":
+            continue
+        attrs = field.source_attrs
+        try:
+            model_field = opts.get_field(attrs[0])
+        except FieldDoesNotExist:
+            continue
+        if not model_field.is_relation:
+            continue
+        lookup = prefix + attrs[0]
+        many = model_field.many_to_many or model_field.one_to_many
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        nested = nested if isinstance(nested, serializers.BaseSerializer) else None
+        if many:
+            prefetch_related.add(lookup)
+        elif len(attrs) > 1 or nested is not None:
+            (prefetch_related if prefetched else select_related).add(lookup)
+        if nested is not None:
+            _collect_relations(
+                nested,
+                model_field.related_model._meta,
+                lookup + "__",
+                select_related,
+                prefetch_related,
+                prefetched=prefetched or many,
+            )
+
+
+def plan_queryset(queryset, serializer, required_fields=(), restrict_columns=False):
+    """Shape `queryset` to load exactly what `serializer` will read.
+
+    Forward relations rendered through a nested serializer or a dotted source
+    (e.g. `job.title`) are `select_related`; many-valued relations are
+    `prefetch_related`, recursively through nested serializers. When
+    `restrict_columns` is set (a `?fields=` request), the existing
+    select/prefetch lists are replaced and `.only()` limits the columns to the
+    rendered fields plus `required_fields` (e.g. keys used by ordering and
+    pagination). Column pruning is skipped if the serializer reads something
+    it cannot account for, such as an undeclared method field.
+    """
+    opts = queryset.model._meta
+    meta = getattr(serializer, "Meta", None)
+    method_sources = getattr(meta, "method_field_sources", {})
+    only = {opts.pk.name, *required_fields}
+    can_restrict = restrict_columns
+
+    for name, field in serializer.fields.items():
+        if field.source == "*":
+            if name in method_sources:
+                only.update(method_sources[name])
+            else:
+                can_restrict = False
+            continue
+        try:
+            model_field = opts.get_field(field.source_attrs[0])
+        except FieldDoesNotExist:
+            # Annotations and properties: nothing to plan
+            continue
+        if model_field.concrete and not model_field.many_to_many:
+            only.add(model_field.name)
+        elif not model_field.is_relation:
+            can_restrict = False
+
+    select_related, prefetch_related = set(), set()
+    _collect_relations(serializer, opts, "", select_related, prefetch_related)
+
+    if can_restrict:
+        queryset = queryset.select_related(None).prefetch_related(None).only(*only)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*sorted(prefetch_related))
+    return queryset
@@ -0,0 +1,312 @@
+import logging
+import re
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.core.mail import send_mass_mail
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from common.cache import NOTIFICATIONS_LIST, bump_generation, user_namespace
+
+from .filters import DEFAULT_RADIUS_KM, FUZZY_THRESHOLD, JobFilter, word_similarity
+from .geo import haversine_km
+from .models import Job, SavedSearch, SavedSearchKey, SavedSearchMatch
+
+logger = logging.getLogger(__name__)
+
+# Everything the list endpoint filters on except `status`: alerts are for public jobs
+ALERT_PARAMS = tuple(name for name in JobFilter.base_filters if name != "status") + ("search",)
+MAX_SAVED_SEARCHES = 20
+# Key of searches with no indexable predicate; every job is matched against them
+WILDCARD_KEY = "*"
+# Keys per `IN (...)` when looking up candidate searches
+KEY_LOOKUP_BATCH = 500
+# Jobs listed per digest; the rest are counted
+DIGEST_MAX_JOBS = 20
+DIGEST_USER_BATCH = 200
+
+JobFacts = namedtuple(
+    "JobFacts",
+    "id posted_by_id title company_name location employment_type category_id tag_ids "
+    "salary_min salary_max created_at deadline requirements description latitude longitude",
+)
+
+
+def clean_query(query):
+    """Validate saved-search params against JobFilter; return them as `{param: str}`.
+
+    Lists are joined with commas and blank values dropped, so the result is
+    exactly what the list endpoint would receive.
+    """
+    if not isinstance(query, dict):
+        raise ValidationError("Expected an object of job list filter params.")
+    unknown = sorted(set(query) - set(ALERT_PARAMS))
+    if unknown:
+        raise ValidationError(f"Unsupported params: {', '.join(unknown)}.")
+    params = {}
+    for name, value in query.items():
+        if isinstance(value, (list, tuple)):
+            value = ",".join(str(item) for item in value)
+        value = "" if value is None else str(value).strip()
+        if value:
+            params[name] = value
+    if not params:
+        raise ValidationError("A saved search needs at least one filter.")
+    filterset = JobFilter(params, queryset=Job.objects.none())
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+    return params
+
+
+def _cleaned(params):
+    filterset = JobFilter(params, queryset=Job.objects.none())
+    if not filterset.is_valid():
+        raise ValueError(filterset.errors)
+    return filterset.form.cleaned_data
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def search_keys(params):
+    """Return the index keys of a saved search: the alternatives of its most selective predicate.
+
+    Candidate predicates are the category list, the tags (each tag on its own
+    with tags_mode=all), the employment type and a trigram of a non-fuzzy
+    location or company_name substring. Each is costed by how many public
+    jobs it matches right now, through JobFilter itself; the cheapest wins.
+    """
+    data = _cleaned(params)
+    candidates = []
+    if data.get("category"):
+        ids = sorted({int(pk) for pk in data["category"]})
+        candidates.append(({"category": ",".join(map(str, ids))}, [f"category:{pk}" for pk in ids]))
+    if data.get("tags"):
+        ids = sorted({int(pk) for pk in data["tags"]})
+        if data.get("tags_mode") == "all":
+            candidates.extend(({"tags": str(pk)}, [f"tag:{pk}"]) for pk in ids)
+        else:
+            candidates.append(({"tags": ",".join(map(str, ids))}, [f"tag:{pk}" for pk in ids]))
+    if data.get("employment_type"):
+        candidates.append(({"employment_type": data["employment_type"]}, [f"employment_type:{data['employment_type']}"]))
+    if not data.get("fuzzy"):
+        for name, prefix in (("location", "location"), ("company_name", "company")):
+            value = (data.get(name) or "").lower()
+            # Every trigram of a substring is a trigram of the text containing it
+            grams = sorted(_trigrams(value), key=lambda gram: (" " in gram, value.index(gram)))
+            if grams:
+                candidates.append(({name: grams[0]}, [f"{prefix}:{grams[0]}"]))
+    if not candidates:
+        return [WILDCARD_KEY]
+
+    def cost(candidate):
+        return JobFilter(candidate[0], queryset=Job.objects.public()).qs.count()
+
+    return min(candidates, key=cost)[1]
+
+
+def index_search(search):
+    """Rebuild the SavedSearchKey rows of `search` after it was saved."""
+    keys = search_keys(search.query)
+    with transaction.atomic():
+        SavedSearchKey.objects.filter(search=search).delete()
+        SavedSearchKey.objects.bulk_create(SavedSearchKey(search=search, key=key) for key in keys)
+    return keys
+
+
+def job_keys(job):
+    """Every index key a saved search could have been filed under for `job` to match it."""
+    keys = {WILDCARD_KEY, f"employment_type:{job.employment_type}"}
+    if job.category_id is not None:
+        keys.add(f"category:{job.category_id}")
+    keys.update(f"tag:{pk}" for pk in job.tag_ids)
+    keys.update(f"location:{gram}" for gram in _trigrams((job.location or "").lower()))
+    keys.update(f"company:{gram}" for gram in _trigrams((job.company_name or "").lower()))
+    return keys
+
+
+class SearchMatcher:
+    """Evaluates one saved search against JobFacts in memory, as JobFilter would in SQL.
+
+    `search` is matched the way the Postgres search matches it: every word
+    must begin a word of the title, company name, requirements or
+    description (without stemming).
+    """
+
+    def __init__(self, params):
+        self.data = _cleaned(params)
+        self.search_words = [word.lower() for word in re.findall(r"\w+", params.get("search", ""))]
+
+    def matches(self, job):
+        data = self.data
+        if data.get("employment_type") and job.employment_type != data["employment_type"]:
+            return False
+        for name in ("location", "company_name"):
+            value = data.get(name)
+            if value and not self._text_matches(value, getattr(job, name) or ""):
+                return False
+        if data.get("near"):
+            radius = DEFAULT_RADIUS_KM if data.get("radius_km") is None else float(data["radius_km"])
+            if job.latitude is None or haversine_km(*data["near"], job.latitude, job.longitude) > radius:
+                return False
+        if data.get("category") and job.category_id not in {int(pk) for pk in data["category"]}:
+            return False
+        if data.get("tags"):
+            tags = {int(pk) for pk in data["tags"]}
+            if not (tags <= job.tag_ids if data.get("tags_mode") == "all" else tags & job.tag_ids):
+                return False
+        for name, field, above in (
+            ("salary_min_gte", "salary_min", True),
+            ("salary_min_lte", "salary_min", False),
+            ("salary_max_gte", "salary_max", True),
+            ("salary_max_lte", "salary_max", False),
+            ("created_at_after", "created_at", True),
+            ("created_at_before", "created_at", False),
+        ):
+            bound, value = data.get(name), getattr(job, field)
+            if bound is not None and (value is None or (value < bound if above else value > bound)):
+                return False
+        if data.get("has_deadline") is not None and data["has_deadline"] != (job.deadline is not None):
+            return False
+        if self.search_words:
+            text = " ".join((job.title, job.company_name, job.requirements, job.description)).lower()
+            words = re.findall(r"\w+", text)
+            if not all(any(word.startswith(term) for word in words) for term in self.search_words):
+                return False
+        return True
+
+    def _text_matches(self, value, text):
+        if self.data.get("fuzzy"):
+            return word_similarity(value, text) >= FUZZY_THRESHOLD
+        return value.lower() in text.lower()
+
+
+def load_facts(job_ids):
+    """JobFacts for the publicly listed jobs among `job_ids`, with two queries."""
+    jobs = Job.objects.public().filter(pk__in=job_ids)
+    tags = defaultdict(set)
+    through = Job.tags.through.objects.filter(job_id__in=job_ids)
+    for job_id, tag_id in through.values_list("job_id", "jobtag_id"):
+        tags[job_id].add(tag_id)
+    rows = jobs.order_by().values_list(
+        "id", "posted_by_id", "title", "company_name", "location", "employment_type", "category_id",
+        "salary_min", "salary_max", "created_at", "deadline", "requirements", "description",
+        "place__latitude", "place__longitude",
+    )
+    return [
+        JobFacts(*row[:7], tags.get(row[0], set()), *row[7:])
+        for row in rows
+    ]
+
+
+def match_jobs(job_ids):
+    """Queue a SavedSearchMatch for every active saved search each job now satisfies.
+
+    Each job is evaluated only against the searches filed under one of its
+    keys, never against the whole table. Already-queued (or delivered)
+    matches are left alone, so re-matching an edited job is harmless.
+    Returns the number of matches found.
+    """
+    jobs = load_facts(sorted(set(job_ids)))
+    if not jobs:
+        return 0
+    keys_by_job = {job.id: job_keys(job) for job in jobs}
+    all_keys = sorted(set().union(*keys_by_job.values()))
+    filed = defaultdict(set)
+    for start in range(0, len(all_keys), KEY_LOOKUP_BATCH):
+        rows = SavedSearchKey.objects.filter(
+            key__in=all_keys[start:start + KEY_LOOKUP_BATCH], search__is_active=True
+        ).values_list("key", "search_id")
+        for key, search_id in rows:
+            filed[key].add(search_id)
+    searches = {
+        pk: (user_id, query)
+        for pk, user_id, query in SavedSearch.objects.filter(
+            pk__in=set().union(*filed.values())
+        ).values_list("pk", "user_id", "query")
+    } if filed else {}
+
+    matchers, found = {}, []
+    for job in jobs:
+        candidates = set().union(*(filed.get(key, ()) for key in keys_by_job[job.id]))
+        for search_id in sorted(candidates):
+            user_id, query = searches[search_id]
+            # Nobody is alerted about their own posting
+            if user_id == job.posted_by_id:
+                continue
+            if search_id not in matchers:
+                try:
+                    matchers[search_id] = SearchMatcher(query)
+                except ValueError:
+                    logger.warning("Skipping saved search %s with an invalid query", search_id)
+                    matchers[search_id] = None
+            matcher = matchers[search_id]
+            if matcher is not None and matcher.matches(job):
+                found.append(SavedSearchMatch(search_id=search_id, job_id=job.id))
+    SavedSearchMatch.objects.bulk_create(found, ignore_conflicts=True, batch_size=1000)
+    return len(found)
+
+
+def send_digests():
+    """Deliver queued matches: one notification and one email per user, in batches.
+
+    Matches whose job has since left the public listing are marked delivered
+    without being mentioned. Returns the number of users notified.
+    """
+    from applications.models import Notification
+
+    pending = SavedSearchMatch.objects.filter(notified_at__isnull=True)
+    user_ids = sorted(set(pending.values_list("search__user_id", flat=True)))
+    notified = 0
+    for start in range(0, len(user_ids), DIGEST_USER_BATCH):
+        batch = user_ids[start:start + DIGEST_USER_BATCH]
+        rows = pending.filter(search__user_id__in=batch).order_by("matched_at", "id").values_list(
+            "id", "search__user_id", "search__user__email", "search__name", "job_id", "job__title",
+            "job__company_name", "job__status", "job__deadline",
+        )
+        now = timezone.now()
+        match_ids, digests, emails = [], defaultdict(dict), {}
+        for match_id, user_id, email, search_name, job_id, title, company, status, deadline in rows:
+            match_ids.append(match_id)
+            # Mirrors JobQuerySet.public()
+            if status == "open" and (deadline is None or deadline > now):
+                line = f"- {title} at {company}" + (f" ({search_name})" if search_name else "")
+                # A job matching several searches is listed once
+                digests[user_id].setdefault(job_id, line)
+                emails[user_id] = email
+
+        messages = {user_id: _digest_message(list(lines.values())) for user_id, lines in digests.items()}
+        with transaction.atomic():
+            Notification.objects.bulk_create(
+                Notification(recipient_id=user_id, message=message) for user_id, (_, message) in messages.items()
+            )
+            SavedSearchMatch.objects.filter(pk__in=match_ids).update(notified_at=now)
+        if messages:
+            bump_generation(*(user_namespace(NOTIFICATIONS_LIST, user_id) for user_id in messages))
+            _send_emails(
+                (subject, message, settings.EMAIL_HOST_USER, [emails[user_id]])
+                for user_id, (subject, message) in messages.items()
+                if emails[user_id]
+            )
+        notified += len(messages)
+    return notified
+
+
+def _digest_message(lines):
+    count = len(lines)
+    subject = f"{count} new job{'s' if count != 1 else ''} match your saved searches"
+    body = [f"{subject}:", *lines[:DIGEST_MAX_JOBS]]
+    if count > DIGEST_MAX_JOBS:
+        body.append(f"…and {count - DIGEST_MAX_JOBS} more.")
+    return subject, "\n".join(body)
+
+
+def _send_emails(messages):
+    # One SMTP connection for the batch; a mail outage must not re-send the in-app digests
+    try:
+        send_mass_mail(tuple(messages), fail_silently=False)
+    except Exception:
+        logger.exception("Failed to send job alert digest emails")
@@ -0,0 +1,253 @@
+import bisect
+import heapq
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from common.cache import JOB_CATEGORIES, JOB_TAGS, JOBS_AUTOCOMPLETE, bump_generation, get_generation
+from common.localcache import LocalLRUCache
+
+from .changes import SETTLE_SECONDS
+from .geo import normalize
+from .models import Job, JobTombstone
+from .reference import get_categories, get_tags
+
+# Seconds between reads of the shared generations, per worker
+VERSION_CHECK_INTERVAL = 1.0
+# Seconds after which a worker rebuilds from scratch; picks up deadlines that
+# passed and writes that skipped signals (queryset.update(), admin deletes)
+MAX_AGE = 600
+# Longest label indexed and longest query accepted; shorter queries match
+# too much of the index to be useful
+MAX_TEXT_CHARS = 100
+MIN_QUERY_CHARS = 2
+# Memoized responses per worker, keyed by index revision
+RESULT_CACHE_SIZE = 2048
+
+
+def job_entries(title, company_name, category, tags):
+    """Return the `((kind, key, ref_id), label)` suggestions one open job contributes."""
+    entries = []
+    candidates = [("title", title, 0), ("company", company_name, 0)]
+    if category is not None:
+        candidates.append(("category", category.name, category.pk))
+    candidates.extend(("tag", tag.name, tag.pk) for tag in tags)
+    for kind, label, ref_id in candidates:
+        label = (label or "").strip()[:MAX_TEXT_CHARS]
+        key = normalize(label)
+        if key:
+            entries.append(((kind, key, ref_id), label))
+    return tuple(entries)
+
+
+class PrefixIndex:
+    """Sorted word-suffix index of suggestions, weighted by open-job counts.
+
+    A suggestion (entry) is a normalized job title, company name, category or
+    tag. Each is indexed under every word suffix of its key, so "python dev"
+    finds "Senior Python Developer". `keys` is the sorted list of suffixes and
+    `owners` the parallel list of entry numbers, so a query is two bisects
+    and a slice. Counts change in place as jobs come and go; entries that
+    drop to zero stay indexed but are skipped.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.owners = []
+        # Per entry number: (kind, key, ref_id), display label, open-job count
+        self.entries = []
+        self.labels = []
+        self.counts = []
+        self.numbers = {}
+        # job id -> entry numbers it contributes, to undo them when it changes
+        self.jobs = {}
+
+    @classmethod
+    def build(cls, job_entries_by_id):
+        index = cls()
+        pending = []
+        for job_id, entries in job_entries_by_id:
+            index.set_job(job_id, entries, pending)
+        pending.sort()
+        index.keys = [key for key, _ in pending]
+        index.owners = [number for _, number in pending]
+        return index
+
+    def set_job(self, job_id, entries, pending=None):
+        """Replace the entries `job_id` contributes; `()` removes the job."""
+        for number in self.jobs.pop(job_id, ()):
+            self.counts[number] -= 1
+        numbers = tuple(self._number(entry, label, pending) for entry, label in entries)
+        for number in numbers:
+            self.counts[number] += 1
+        if numbers:
+            self.jobs[job_id] = numbers
+
+    def _number(self, entry, label, pending):
+        number = self.numbers.get(entry)
+        if number is not None:
+            return number
+        number = self.numbers[entry] = len(self.entries)
+        self.entries.append(entry)
+        self.labels.append(label)
+        self.counts.append(0)
+        words = entry[1].split(" ")
+        for start in range(len(words)):
+            suffix = " ".join(words[start:])
+            if pending is None:
+                position = bisect.bisect_left(self.keys, suffix)
+                self.keys.insert(position, suffix)
+                self.owners.insert(position, number)
+            else:
+                pending.append((suffix, number))
+        return number
+
+    def search(self, query, limit):
+        prefix = normalize(query[:MAX_TEXT_CHARS])
+        if len(prefix) < MIN_QUERY_CHARS:
+            return []
+        low = bisect.bisect_left(self.keys, prefix)
+        high = bisect.bisect_left(self.keys, prefix + "\uffff", low)
+        counts, labels = self.counts, self.labels
+        matches = [number for number in set(self.owners[low:high]) if counts[number] > 0]
+        best = heapq.nsmallest(limit, matches, key=lambda number: (-counts[number], labels[number], number))
+        return [
+            {
+                "text": labels[number],
+                "kind": self.entries[number][0],
+                "id": self.entries[number][2] or None,
+                "jobs": counts[number],
+            }
+            for number in best
+        ]
+
+
+def load_entries(queryset):
+    """Yield `(job_id, entries)` for `queryset`, or `(job_id, ())` for jobs no longer public.
+
+    Two queries; categories and tags come from the in-memory reference caches.
+    """
+    categories, tags = get_categories(), get_tags()
+    job_tags = defaultdict(list)
+    through = Job.tags.through.objects.filter(job__in=queryset.order_by().values("pk"))
+    for job_id, tag_id in through.values_list("job_id", "jobtag_id").iterator():
+        if tag_id in tags:
+            job_tags[job_id].append(tags[tag_id])
+    now = timezone.now()
+    rows = queryset.order_by().values_list("id", "title", "company_name", "category_id", "status", "deadline")
+    for job_id, title, company_name, category_id, status, deadline in rows.iterator():
+        # Mirrors JobQuerySet.public()
+        if status != "open" or (deadline is not None and deadline <= now):
+            yield job_id, ()
+        else:
+            yield job_id, job_entries(title, company_name, categories.get(category_id), job_tags.get(job_id, ()))
+
+
+class AutocompleteIndex:
+    """Per-worker PrefixIndex kept in sync through shared-cache generations.
+
+    Every job write bumps JOBS_AUTOCOMPLETE (see `mark_stale()`). At most once
+    per VERSION_CHECK_INTERVAL a worker compares the shared generations with
+    the ones it last saw: a new JOBS_AUTOCOMPLETE applies only the jobs
+    updated or tombstoned since the last sync; a category or tag write (which
+    can rename entries) or MAX_AGE rebuilds from scratch. One thread syncs
+    while the others keep answering from the current index, so lookups never
+    wait on the database once the first build is done.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.results = LocalLRUCache(maxsize=RESULT_CACHE_SIZE, timeout=MAX_AGE)
+        # Bumped on every change to the index; retires memoized results
+        self.revision = 0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.index = None
+            self.versions = None
+            self.checked_at = 0.0
+            self.built_at = 0.0
+            self.synced_at = None
+            self.results.clear()
+
+    def invalidate(self):
+        """Make the next lookup re-read the shared generations."""
+        self.checked_at = 0.0
+
+    def suggest(self, query, limit=10):
+        self.sync()
+        key = (self.revision, query, limit)
+        found, results = self.results.get(key)
+        if not found:
+            with self._lock:
+                key = (self.revision, query, limit)
+                results = self.index.search(query, limit)
+            self.results.set(key, results)
+        return results
+
+    def sync(self):
+        if self.index is not None and time.monotonic() - self.checked_at < VERSION_CHECK_INTERVAL:
+            return
+        if not self._sync_lock.acquire(blocking=self.index is None):
+            return
+        try:
+            if self.index is not None and time.monotonic() - self.checked_at < VERSION_CHECK_INTERVAL:
+                return
+            # Read before loading, so a write during the load triggers another sync
+            versions = tuple(get_generation(namespace) for namespace in (JOBS_AUTOCOMPLETE, JOB_CATEGORIES, JOB_TAGS))
+            self.checked_at = time.monotonic()
+            if (
+                self.index is None
+                or versions[1:] != self.versions[1:]
+                or self.checked_at - self.built_at >= MAX_AGE
+            ):
+                self._rebuild()
+            elif versions[0] != self.versions[0]:
+                self._apply_changes()
+            self.versions = versions
+        finally:
+            self._sync_lock.release()
+
+    def _rebuild(self):
+        started = timezone.now()
+        index = PrefixIndex.build(load_entries(Job.objects.public()))
+        with self._lock:
+            self.index = index
+            self.built_at = time.monotonic()
+            # Overlap the next delta with rows whose transactions were still in flight
+            self.synced_at = started - timedelta(seconds=SETTLE_SECONDS)
+            self.revision += 1
+
+    def _apply_changes(self):
+        started = timezone.now()
+        removed = list(JobTombstone.objects.filter(removed_at__gte=self.synced_at).values_list("job_id", flat=True))
+        # Open jobs only (served by the delta-sync index); closing or deleting
+        # leaves a tombstone
+        changed = list(load_entries(Job.objects.filter(status="open", updated_at__gte=self.synced_at)))
+        with self._lock:
+            # A job closed and re-opened within the window is upserted last
+            for job_id in removed:
+                self.index.set_job(job_id, ())
+            for job_id, entries in changed:
+                self.index.set_job(job_id, entries)
+            self.synced_at = started - timedelta(seconds=SETTLE_SECONDS)
+            self.revision += 1
+
+
+autocomplete_index = AutocompleteIndex()
+
+
+def mark_stale():
+    """Announce a job write to every worker's index once the transaction commits."""
+
+    def bump():
+        bump_generation(JOBS_AUTOCOMPLETE)
+        autocomplete_index.invalidate()
+
+    transaction.on_commit(bump)
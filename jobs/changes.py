@@ -0,0 +1,131 @@
+import heapq
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from .models import Job, JobTombstone
+
+# Rows younger than this are held back: a transaction that started earlier may
+# still commit a smaller updated_at, which a client past it would never see.
+SETTLE_SECONDS = 2
+
+
+class Watermark:
+    """Position of a sync client in the three change streams.
+
+    `jobs`, `tombstones` and `expired` are `(timestamp, id)` pairs of the
+    last event served from each stream, or None before the first one.
+    Serialized as an opaque urlsafe-base64 token.
+    """
+
+    def __init__(self, jobs=None, tombstones=None, expired=None):
+        self.jobs = jobs
+        self.tombstones = tombstones
+        self.expired = expired
+
+    @classmethod
+    def decode(cls, token):
+        try:
+            payload = json.loads(urlsafe_b64decode(token.encode("ascii")).decode("utf-8"))
+            # Tokens issued before the expiry stream resume it where tombstones stand
+            payload.setdefault("e", payload["t"])
+            positions = [cls._parse_position(payload[key]) for key in ("j", "t", "e")]
+        except (TypeError, ValueError, KeyError, UnicodeError, AttributeError):
+            raise ValidationError({"since": ["Invalid watermark."]})
+        return cls(*positions)
+
+    @staticmethod
+    def _parse_position(value):
+        if value is None:
+            return None
+        timestamp, pk = value
+        parsed = parse_datetime(timestamp)
+        if parsed is None:
+            raise ValueError(timestamp)
+        return parsed, int(pk)
+
+    def encode(self):
+        def dump(position):
+            return None if position is None else [position[0].isoformat(), position[1]]
+
+        payload = json.dumps(
+            {"j": dump(self.jobs), "t": dump(self.tombstones), "e": dump(self.expired)}, separators=(",", ":")
+        )
+        return urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def _after(field, position):
+    """Seek predicate `(field, id) > position`."""
+    if position is None:
+        return Q()
+    timestamp, pk = position
+    return Q(**{f"{field}__gt": timestamp}) | Q(**{field: timestamp, "id__gt": pk})
+
+
+def collect_changes(watermark, limit, job_queryset=None):
+    """Return `(events, next_watermark, has_more)` for changes after `watermark`.
+
+    `events` is a time-ordered list of Job (upsert) and JobTombstone
+    (removal) instances, at most `limit` long.
+
+    Three keyset queries are merged in time order, so a job that was closed
+    and later re-opened replays correctly: listed jobs by updated_at,
+    tombstones by removed_at, and open jobs whose deadline has passed by
+    deadline. The last stream needs no write when a deadline passes; its
+    events are unsaved tombstones with reason "expired". Without a watermark
+    the job stream starts at the beginning (a full snapshot) and the removal
+    streams at the current horizon, since older removals cannot concern a
+    fresh client.
+    """
+    horizon = timezone.now() - timedelta(seconds=SETTLE_SECONDS)
+    if watermark is None:
+        watermark = Watermark(tombstones=(horizon, 0), expired=(horizon, 0))
+    if job_queryset is None:
+        job_queryset = Job.objects.all()
+
+    # JobQuerySet.public() as of the horizon, so every job is either listed
+    # here or expired below
+    jobs = list(
+        job_queryset.filter(status="open", updated_at__lte=horizon)
+        .filter(Q(deadline__isnull=True) | Q(deadline__gt=horizon))
+        .filter(_after("updated_at", watermark.jobs))
+        .order_by("updated_at", "id")[: limit + 1]
+    )
+    tombstones = list(
+        JobTombstone.objects.filter(removed_at__lte=horizon)
+        .filter(_after("removed_at", watermark.tombstones))
+        .order_by("removed_at", "id")[: limit + 1]
+    )
+    expired = [
+        JobTombstone(job_id=pk, reason="expired", removed_at=deadline)
+        for pk, deadline in job_queryset.filter(status="open", deadline__lte=horizon)
+        .filter(_after("deadline", watermark.expired))
+        .order_by("deadline", "id")
+        .values_list("id", "deadline")[: limit + 1]
+    ]
+
+    merged = heapq.merge(
+        ((job.updated_at, 2, job.pk, job) for job in jobs),
+        ((tombstone.removed_at, 0, tombstone.pk, tombstone) for tombstone in tombstones),
+        ((tombstone.removed_at, 1, tombstone.job_id, tombstone) for tombstone in expired),
+    )
+    events = [item for _, _, _, item in merged][:limit]
+
+    def last(kind):
+        return next((item for item in reversed(events) if kind(item)), None)
+
+    last_job = last(lambda item: isinstance(item, Job))
+    last_tombstone = last(lambda item: isinstance(item, JobTombstone) and item.pk is not None)
+    last_expired = last(lambda item: isinstance(item, JobTombstone) and item.pk is None)
+    next_watermark = Watermark(
+        jobs=(last_job.updated_at, last_job.pk) if last_job else watermark.jobs,
+        tombstones=(last_tombstone.removed_at, last_tombstone.pk) if last_tombstone else watermark.tombstones,
+        expired=(last_expired.removed_at, last_expired.job_id) if last_expired else watermark.expired,
+    )
+    has_more = len(events) < len(jobs) + len(tombstones) + len(expired)
+    return events, next_watermark, has_more
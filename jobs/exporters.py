@@ -0,0 +1,103 @@
+import csv
+import json
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Job
+
+FORMATS = ("csv", "ndjson")
+DEFAULT_CHUNK_SIZE = 2000
+
+# Flat columns read with values(); `category` and `tags` are exported as slugs
+# and `company` as an id so a file can be fed back through jobs.importers.
+EXPORT_COLUMNS = {
+    "id": "id",
+    "title": "title",
+    "description": "description",
+    "requirements": "requirements",
+    "company_name": "company_name",
+    "company": "company_id",
+    "location": "location",
+    "employment_type": "employment_type",
+    "salary_min": "salary_min",
+    "salary_max": "salary_max",
+    "salary_currency": "salary_currency",
+    "status": "status",
+    "category": "category__slug",
+    "deadline": "deadline",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+EXPORT_FIELDS = [*EXPORT_COLUMNS, "tags"]
+
+CONTENT_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def iter_job_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield one flat dict per job in `queryset`, holding at most one chunk in memory.
+
+    Rows come from a server-side cursor (`values().iterator()`); each chunk's
+    tags are fetched with a single query on the through table instead of
+    prefetching across the whole result set.
+    """
+    rows = (
+        queryset.select_related(None)
+        .prefetch_related(None)
+        .values(*EXPORT_COLUMNS.values())
+        .iterator(chunk_size=chunk_size)
+    )
+    through = Job.tags.through
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        tags = {}
+        links = (
+            through.objects.filter(job_id__in=[row["id"] for row in chunk])
+            .order_by("jobtag__slug")
+            .values_list("job_id", "jobtag__slug")
+        )
+        for job_id, slug in links:
+            tags.setdefault(job_id, []).append(slug)
+        for row in chunk:
+            item = {name: row[column] for name, column in EXPORT_COLUMNS.items()}
+            item["tags"] = tags.get(row["id"], [])
+            yield item
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer streaming."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        values = []
+        for name in EXPORT_FIELDS:
+            value = row[name]
+            if name == "tags":
+                value = ",".join(value)
+            elif hasattr(value, "isoformat"):
+                value = value.isoformat()
+            values.append("" if value is None else value)
+        yield writer.writerow(values)
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+def stream_export(queryset, file_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return an iterator of encoded text chunks for StreamingHttpResponse."""
+    rows = iter_job_rows(queryset, chunk_size=chunk_size)
+    if file_format == "csv":
+        return stream_csv(rows)
+    if file_format == "ndjson":
+        return stream_ndjson(rows)
+    raise ValueError(f"Unsupported format {file_format!r}; expected one of {', '.join(FORMATS)}")
@@ -0,0 +1,131 @@
+from collections import defaultdict
+
+from django.db.models import Count, Q
+
+from .models import Job
+
+# Salary bands over `salary_min`: (value, lower bound inclusive, upper bound exclusive)
+SALARY_BANDS = (
+    ("0-25000", None, 25000),
+    ("25000-50000", 25000, 50000),
+    ("50000-100000", 50000, 100000),
+    ("100000+", 100000, None),
+)
+
+# Upper bound on the number of category/tag buckets returned
+FACET_LIMIT = 50
+
+# Query params each facet "owns". A facet's counts ignore its own params so the
+# UI can show alternatives to the current selection (disjunctive faceting),
+# exactly like the per-option `?...&employment_type=X` requests they replace.
+FACET_PARAMS = {
+    "total": (),
+    "employment_type": ("employment_type",),
+    "status": (),
+    "salary": ("salary_min_gte", "salary_min_lte"),
+    "category": ("category",),
+    "tags": ("tags", "tags_mode"),
+}
+
+_AGGREGATE_FACETS = ("total", "employment_type", "status", "salary")
+
+
+def _salary_q(lower, upper):
+    q = Q()
+    if lower is not None:
+        q &= Q(salary_min__gte=lower)
+    if upper is not None:
+        q &= Q(salary_min__lt=upper)
+    return q
+
+
+def _aggregate_counts(queryset, names):
+    """Count every fixed-choice facet in `names` with a single conditional aggregate."""
+    aggregates = {}
+    if "total" in names:
+        aggregates["total"] = Count("pk")
+    if "employment_type" in names:
+        for value, _ in Job.EMPLOYMENT_TYPES:
+            aggregates[f"employment_type:{value}"] = Count("pk", filter=Q(employment_type=value))
+    if "status" in names:
+        for value, _ in Job.STATUS_CHOICES:
+            aggregates[f"status:{value}"] = Count("pk", filter=Q(status=value))
+    if "salary" in names:
+        for value, lower, upper in SALARY_BANDS:
+            aggregates[f"salary:{value}"] = Count("pk", filter=_salary_q(lower, upper))
+    if not aggregates:
+        return {}
+
+    row = queryset.order_by().aggregate(**aggregates)
+    facets = {}
+    if "total" in names:
+        facets["total"] = row["total"]
+    if "employment_type" in names:
+        facets["employment_type"] = [
+            {"value": value, "label": label, "count": row[f"employment_type:{value}"]}
+            for value, label in Job.EMPLOYMENT_TYPES
+        ]
+    if "status" in names:
+        facets["status"] = [
+            {"value": value, "label": label, "count": row[f"status:{value}"]}
+            for value, label in Job.STATUS_CHOICES
+        ]
+    if "salary" in names:
+        facets["salary"] = [
+            {"value": value, "min": lower, "max": upper, "count": row[f"salary:{value}"]}
+            for value, lower, upper in SALARY_BANDS
+        ]
+    return facets
+
+
+def _category_counts(queryset):
+    rows = (
+        queryset.filter(category__isnull=False)
+        .order_by()
+        .values("category_id", "category__name")
+        .annotate(count=Count("pk"))
+        .order_by("-count", "category__name")[:FACET_LIMIT]
+    )
+    return [
+        {"value": row["category_id"], "label": row["category__name"], "count": row["count"]}
+        for row in rows
+    ]
+
+
+def _tag_counts(queryset):
+    # Group the M2M through table directly; the job ids come in as a semi-join
+    rows = (
+        Job.tags.through.objects.filter(job_id__in=queryset.values("pk"))
+        .values("jobtag_id", "jobtag__name")
+        .annotate(count=Count("job_id"))
+        .order_by("-count", "jobtag__name")[:FACET_LIMIT]
+    )
+    return [
+        {"value": row["jobtag_id"], "label": row["jobtag__name"], "count": row["count"]}
+        for row in rows
+    ]
+
+
+def compute_facets(query_params, queryset_for):
+    """Return facet counts for the jobs matched by `query_params`.
+
+    `queryset_for(excluded_params)` must return the filtered job queryset with
+    the given params ignored. Facets whose params are not in the request share
+    one queryset, so the common case costs three queries: one conditional
+    aggregate for the fixed-choice facets plus one GROUP BY each for
+    categories and tags.
+    """
+    groups = defaultdict(list)
+    for name, params in FACET_PARAMS.items():
+        active = tuple(param for param in params if param in query_params)
+        groups[active].append(name)
+
+    facets = {}
+    for excluded, names in groups.items():
+        queryset = queryset_for(excluded)
+        facets.update(_aggregate_counts(queryset, [n for n in names if n in _AGGREGATE_FACETS]))
+        if "category" in names:
+            facets["category"] = _category_counts(queryset)
+        if "tags" in names:
+            facets["tags"] = _tag_counts(queryset)
+    return facets
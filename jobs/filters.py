@@ -1,24 +1,153 @@
+import re
+from functools import reduce
+from operator import add
+
 import django_filters
+from django import forms
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Case, Count, Exists, F, FloatField, Lookup, OuterRef, Value, When
+from django_filters.widgets import BooleanWidget, CSVWidget
+from rest_framework.filters import SearchFilter
+
+from .geo import bounding_box, distance_expression
 from .models import Job
 
+SEARCH_CONFIG = "english"
+# pg_trgm's default `pg_trgm.word_similarity_threshold`
+FUZZY_THRESHOLD = 0.6
+DEFAULT_RADIUS_KM = 50
+MAX_RADIUS_KM = 1000
+
+
+class LatLonField(forms.Field):
+    """Form field for a `lat,lon` pair in decimal degrees."""
+
+    default_error_messages = {
+        "invalid": "Enter a point as lat,lon, e.g. 6.52,3.38.",
+        "out_of_range": "Latitude must be within ±90 and longitude within ±180.",
+    }
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            latitude, longitude = (float(part) for part in value.split(","))
+        except ValueError:
+            raise forms.ValidationError(self.error_messages["invalid"], code="invalid")
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise forms.ValidationError(self.error_messages["out_of_range"], code="out_of_range")
+        return latitude, longitude
+
+
+class LatLonFilter(django_filters.Filter):
+    field_class = LatLonField
+
+
+class FlagWidget(BooleanWidget):
+    """BooleanWidget that also accepts `1`/`0` and `yes`/`no`, as in `?fuzzy=1`."""
+
+    ALIASES = {"1": "true", "yes": "true", "0": "false", "no": "false"}
+
+    def value_from_datadict(self, data, files, name):
+        value = data.get(name)
+        if isinstance(value, str):
+            data = {name: self.ALIASES.get(value.lower(), value)}
+        return super().value_from_datadict(data, files, name)
+
+
+class MultiValueCSVWidget(CSVWidget):
+    """CSVWidget that also accepts the parameter repeated (`?tags=1&tags=2`)."""
+
+    def value_from_datadict(self, data, files, name):
+        if hasattr(data, "getlist") and len(data.getlist(name)) > 1:
+            data = {name: ",".join(data.getlist(name))}
+        return super().value_from_datadict(data, files, name)
+
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("widget", MultiValueCSVWidget)
+        super().__init__(*args, **kwargs)
+
+
+class ILikeContains(Lookup):
+    """`lhs ILIKE '%value%'`, with LIKE wildcards in `value` escaped.
+
+    Django's `icontains` compiles to `UPPER(col::text) LIKE UPPER(...)` on
+    Postgres, which a plain-column trigram index cannot serve; ILIKE can.
+    Used as an expression (`filter(ILikeContains(F("location"), value))`).
+    """
+
+    lookup_name = "ilike_contains"
+    # Keep the raw string so get_db_prep_lookup() can escape and wrap it
+    prepare_rhs = False
+
+    def get_db_prep_lookup(self, value, connection):
+        return "%s", [f"%{connection.ops.prep_for_like_query(value)}%"]
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} ILIKE {rhs}", (*lhs_params, *rhs_params)
+
+
+def _trigrams(word):
+    """pg_trgm-style trigrams of one word, padded with two leading spaces and one trailing."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _words(text):
+    return re.findall(r"[^\W_]+", (text or "").lower())
+
+
+def word_similarity(query, text):
+    """Approximate pg_trgm's `word_similarity(query, text)` in Python.
+
+    Each query word is matched against its closest word in `text`; the result
+    is the share of all query trigrams found that way. Used where pg_trgm is
+    unavailable (SQLite in tests).
+    """
+    query_grams = [_trigrams(word) for word in _words(query)]
+    total = sum(len(grams) for grams in query_grams)
+    if not total:
+        return 0.0
+    text_grams = [_trigrams(word) for word in _words(text)]
+    matched = sum(max((len(grams & other) for other in text_grams), default=0) for grams in query_grams)
+    return matched / total
+
 
 class JobFilter(django_filters.FilterSet):
     """Filters for the Job model used by JobViewSet.
 
     Supports filtering by:
     - employment_type (exact)
-    - location (icontains)
-    - category (by id)
-    - tags (by id; many-to-many)
+    - location, company_name (case-insensitive substring; with `fuzzy=1`,
+      typo-tolerant trigram word similarity, best matches first)
+    - near (`lat,lon`) within radius_km (default 50), nearest first
+    - category (ids, comma-separated or repeated; any of them)
+    - tags (ids, comma-separated or repeated; jobs with any of them, or all
+      of them with tags_mode=all)
     - salary_min (gte/lte range)
     - salary_max (gte/lte range)
     - created_at (date range)
     - has_deadline (boolean, derived)
+    - status (exact; without it JobViewSet lists only public, open jobs)
     """
 
-    location = django_filters.CharFilter(field_name="location", lookup_expr="icontains")
-    category = django_filters.NumberFilter(field_name="category__id", lookup_expr="exact")
-    tags = django_filters.NumberFilter(field_name="tags__id", lookup_expr="exact")
+    location = django_filters.CharFilter(field_name="location", method="filter_text")
+    company_name = django_filters.CharFilter(field_name="company_name", method="filter_text")
+    fuzzy = django_filters.BooleanFilter(method="filter_fuzzy", widget=FlagWidget)
+    near = LatLonFilter(method="filter_near")
+    radius_km = django_filters.NumberFilter(method="filter_radius", min_value=0, max_value=MAX_RADIUS_KM)
+    category = NumberInFilter(field_name="category_id", lookup_expr="in")
+    # Semi-joins on the through table, never a JOIN that repeats a job per tag
+    tags = NumberInFilter(method="filter_tags")
+    tags_mode = django_filters.ChoiceFilter(
+        choices=(("any", "Any"), ("all", "All")), method="filter_tags_mode", empty_label=None
+    )
 
     salary_min_gte = django_filters.NumberFilter(field_name="salary_min", lookup_expr="gte")
     salary_min_lte = django_filters.NumberFilter(field_name="salary_min", lookup_expr="lte")
@@ -35,8 +164,13 @@ class JobFilter(django_filters.FilterSet):
         fields = [
             "employment_type",
             "location",
+            "company_name",
+            "fuzzy",
+            "near",
+            "radius_km",
             "category",
             "tags",
+            "tags_mode",
             "salary_min_gte",
             "salary_min_lte",
             "salary_max_gte",
@@ -44,8 +178,98 @@ class JobFilter(django_filters.FilterSet):
             "created_at_after",
             "created_at_before",
             "has_deadline",
+            "status",
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.similarities = []
+        self.ranking = []
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.similarities:
+            queryset = queryset.annotate(fuzzy_rank=reduce(add, self.similarities))
+            self.ranking.append("-fuzzy_rank")
+        if not self.ranking:
+            return queryset
+        # Ranked like search results; ?ordering= still overrides
+        return queryset.order_by(*self.ranking, "-created_at", "-id")
+
+    def filter_tags_mode(self, queryset, name, value):
+        # Read by filter_tags()
+        return queryset
+
+    def filter_tags(self, queryset, name, value):
+        tag_ids = {int(tag_id) for tag_id in value if tag_id is not None}
+        if not tag_ids:
+            return queryset
+        through = Job.tags.through.objects.filter(jobtag_id__in=tag_ids)
+        if self.form.cleaned_data.get("tags_mode") == "all":
+            # One GROUP BY over the (jobtag_id, job_id) index, however many tags
+            matching = (
+                through.values("job_id")
+                .annotate(matched=Count("jobtag_id", distinct=True))
+                .filter(matched=len(tag_ids))
+                .values("job_id")
+            )
+            return queryset.filter(pk__in=matching)
+        return queryset.filter(Exists(through.filter(job_id=OuterRef("pk"))))
+
+    def filter_radius(self, queryset, name, value):
+        # Read by filter_near()
+        return queryset
+
+    def filter_near(self, queryset, name, value):
+        latitude, longitude = value
+        radius = self.form.cleaned_data.get("radius_km")
+        radius = DEFAULT_RADIUS_KM if radius is None else float(radius)
+        # The box narrows candidates via jobs_location_latlon_idx and the
+        # place FK index; the exact great-circle distance then trims the corners.
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius)
+        self.ranking.append("distance_km")
+        return (
+            queryset.filter(
+                place__latitude__range=(min_lat, max_lat),
+                place__longitude__range=(min_lon, max_lon),
+            )
+            .annotate(distance_km=distance_expression(latitude, longitude, "place__latitude", "place__longitude"))
+            .filter(distance_km__lte=radius)
+        )
+
+    def filter_fuzzy(self, queryset, name, value):
+        # Read by filter_text(); selects the matching mode, not rows
+        return queryset
+
+    def filter_text(self, queryset, name, value):
+        if self.form.cleaned_data.get("fuzzy"):
+            return self.filter_similar(queryset, name, value)
+        if connection.vendor == "postgresql":
+            # Served by the jobs_job_<field>_trgm GIN index (migration 0008)
+            return queryset.filter(ILikeContains(F(name), value))
+        return queryset.filter(**{f"{name}__icontains": value})
+
+    def filter_similar(self, queryset, name, value):
+        if connection.vendor == "postgresql":
+            # `field %> value` is the indexable form of word_similarity(value, field)
+            self.similarities.append(TrigramWordSimilarity(value, name))
+            return queryset.filter(TrigramWordSimilar(F(name), Value(value)))
+
+        # No pg_trgm: score the field's distinct values in Python instead
+        scores = {}
+        for text in queryset.order_by().values_list(name, flat=True).distinct():
+            score = word_similarity(value, text)
+            if score >= FUZZY_THRESHOLD:
+                scores[text] = score
+        self.similarities.append(
+            Case(
+                *(When(**{name: text}, then=Value(score)) for text, score in scores.items()),
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        )
+        return queryset.filter(**{f"{name}__in": list(scores)})
+
     def filter_has_deadline(self, queryset, name, value):
         if value is True:
             return queryset.exclude(deadline__isnull=True)
@@ -53,3 +277,40 @@ class JobFilter(django_filters.FilterSet):
             return queryset.filter(deadline__isnull=True)
         return queryset
 
+
+def build_prefix_tsquery(terms):
+    """Turn raw search terms into a `to_tsquery` string with prefix matching.
+
+    Each term is reduced to its word characters so user input can never inject
+    tsquery operators; words are AND-ed and suffixed with `:*` so "dev" matches
+    "developer". Returns an empty string when nothing searchable remains.
+    """
+    words = []
+    for term in terms:
+        words.extend(re.findall(r"\w+", term))
+    return " & ".join(f"{word}:*" for word in words)
+
+
+class JobSearchFilter(SearchFilter):
+    """`?search=` backend that uses the weighted `Job.search_vector` on Postgres.
+
+    Matches are ranked by relevance (title > company > requirements >
+    description) unless the client asks for an explicit `?ordering=`, which
+    OrderingFilter applies afterwards. On other databases (SQLite in tests)
+    it falls back to DRF's icontains search over the view's `search_fields`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if connection.vendor != "postgresql":
+            return super().filter_queryset(request, queryset, view)
+
+        raw = build_prefix_tsquery(self.get_search_terms(request))
+        if not raw:
+            return queryset
+
+        query = SearchQuery(raw, config=SEARCH_CONFIG, search_type="raw")
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(search_rank=SearchRank(F("search_vector"), query))
+            .order_by("-search_rank", "-created_at", "-id")
+        )
@@ -0,0 +1,128 @@
+import csv
+import math
+import re
+import unicodedata
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / "data" / "gazetteer.csv"
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Extra spellings accepted as country hints, keyed by ISO 3166-1 alpha-2 code
+COUNTRY_ALIASES = {
+    "GB": ("uk", "great britain", "britain"),
+    "US": ("usa", "united states of america", "america"),
+    "AE": ("uae",),
+    "CD": ("drc", "democratic republic of the congo"),
+    "CI": ("ivory coast",),
+    "NG": ("naija",),
+}
+
+
+Place = namedtuple("Place", "city region country country_code latitude longitude")
+
+
+def normalize(text):
+    """Lower-case, accent-free words separated by single spaces."""
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii")
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+class Gazetteer:
+    """Offline place-name index: free-text locations to Place entries.
+
+    Cities are looked up by name or alias as a run of words anywhere in the
+    text, longest and earliest first, so "Lagos", "Lagos, NG" and "lagos
+    nigeria" all resolve to the same entry. When a name is shared ("Birmingham"),
+    the remaining words pick the entry whose region or country they mention;
+    otherwise the first listed entry wins.
+    """
+
+    def __init__(self, places, aliases=None):
+        self.names = {}
+        aliases = aliases or {}
+        for place in places:
+            for name in (place.city, *aliases.get(place, ())):
+                self.names.setdefault(tuple(normalize(name).split()), []).append(place)
+        self.max_words = max((len(key) for key in self.names), default=0)
+
+    @classmethod
+    def from_csv(cls, path):
+        places, aliases = [], {}
+        with open(path, encoding="utf-8", newline="") as stream:
+            for row in csv.DictReader(stream):
+                place = Place(
+                    city=row["city"],
+                    region=row["region"],
+                    country=row["country"],
+                    country_code=row["country_code"],
+                    latitude=float(row["latitude"]),
+                    longitude=float(row["longitude"]),
+                )
+                places.append(place)
+                aliases[place] = [alias for alias in row["aliases"].split("|") if alias]
+        return cls(places, aliases)
+
+    def match(self, text):
+        """Return the Place that `text` names, or None."""
+        words = normalize(text).split()
+        for start in range(len(words)):
+            for length in range(min(self.max_words, len(words) - start), 0, -1):
+                candidates = self.names.get(tuple(words[start:start + length]))
+                if candidates:
+                    rest = f" {' '.join(words[:start] + words[start + length:])} "
+                    return next((place for place in candidates if self._mentioned(place, rest)), candidates[0])
+        return None
+
+    @staticmethod
+    def _mentioned(place, text):
+        hints = (place.region, place.country, place.country_code, *COUNTRY_ALIASES.get(place.country_code, ()))
+        return any(f" {normalize(hint)} " in text for hint in hints)
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer():
+    return Gazetteer.from_csv(GAZETTEER_PATH)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """Return `(min_lat, max_lat, min_lon, max_lon)` enclosing a circle.
+
+    The box is a cheap, index-friendly superset of the circle. Near a pole or
+    across the antimeridian it widens to every longitude rather than wrapping.
+    """
+    delta_lat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = latitude - delta_lat, latitude + delta_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+    # Widest longitude span of the circle, reached north/south of its centre
+    ratio = math.sin(math.radians(delta_lat)) / math.cos(math.radians(latitude))
+    if ratio >= 1:
+        return min_lat, max_lat, -180.0, 180.0
+    delta_lon = math.degrees(math.asin(ratio))
+    min_lon, max_lon = longitude - delta_lon, longitude + delta_lon
+    if min_lon < -180 or max_lon > 180:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, min_lon, max_lon
+
+
+def distance_expression(latitude, longitude, lat_field, lon_field):
+    """ORM expression for the haversine distance (km) from a point to `(lat_field, lon_field)`."""
+    lat, lon = Value(float(latitude)), Value(float(longitude))
+    a = Power(Sin(Radians(F(lat_field) - lat) / 2), 2) + Cos(Radians(lat)) * Cos(Radians(F(lat_field))) * Power(
+        Sin(Radians(F(lon_field) - lon) / 2), 2
+    )
+    # Least() guards asin() against rounding just above 1 for antipodal points
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Least(Sqrt(a), Value(1.0)), output_field=FloatField())
@@ -0,0 +1,257 @@
+import csv
+import json
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils.text import slugify
+from rest_framework import serializers
+
+from common.cache import JOB_CATEGORIES, JOB_TAGS, JOBS_AUTOCOMPLETE, JOBS_LIST, bump_generation
+from .autocomplete import autocomplete_index
+from .models import CompanyProfile, Job, JobCategory, JobTag, Location
+from .reference import categories_cache, tags_cache
+from .serializers import JobImportRowSerializer
+from .tasks import schedule_alert_matching, schedule_related_refresh
+
+FORMATS = ("csv", "ndjson")
+DEFAULT_CHUNK_SIZE = 500
+# Rows with errors are always counted, but only this many are itemised
+MAX_REPORTED_ERRORS = 1000
+
+
+def detect_format(filename="", content_type=""):
+    """Guess the feed format from a file name or content type; None if unknown."""
+    name = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonlines" in content_type:
+        return "ndjson"
+    if name.endswith(".csv") or content_type in ("text/csv", "application/csv"):
+        return "csv"
+    return None
+
+
+def read_rows(stream, file_format):
+    """Yield `(line, row, error)` for each record of a text stream.
+
+    `row` is a dict of raw values, or None with `error` set when the record
+    cannot be parsed. Empty CSV cells are dropped so optional columns may be
+    left blank. Records are read lazily; the stream is never loaded whole.
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            if None in record:
+                yield reader.line_num, None, "Row has more cells than the header."
+                continue
+            row = {
+                key.strip(): value.strip()
+                for key, value in record.items()
+                if key and value is not None and value.strip() != ""
+            }
+            yield reader.line_num, row, None
+    elif file_format == "ndjson":
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError as exc:
+                yield line, None, f"Invalid JSON: {exc}"
+                continue
+            if not isinstance(row, dict):
+                yield line, None, "Each line must be a JSON object."
+                continue
+            yield line, {key: value for key, value in row.items() if value is not None}, None
+    else:
+        raise ValueError(f"Unsupported format {file_format!r}; expected one of {', '.join(FORMATS)}")
+
+
+class ImportReport:
+    """Outcome of an import: counts plus per-row errors keyed by source line."""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line, detail):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "errors": detail})
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def _resolve_named(model, values):
+    """Map each name-or-slug in `values` to a `model` instance, creating missing ones.
+
+    One query finds existing rows by name or slug; missing rows are inserted
+    with one `bulk_create` and read back with one more query. Values that
+    cannot be slugified are left unresolved. Returns `(resolved, created_any)`.
+    """
+    wanted = {value: slugify(value) for value in values}
+    wanted = {value: slug for value, slug in wanted.items() if slug}
+    if not wanted:
+        return {}, False
+
+    existing = model.objects.filter(Q(name__in=wanted) | Q(slug__in=set(wanted.values())))
+    by_name = {obj.name: obj for obj in existing}
+    by_slug = {obj.slug: obj for obj in by_name.values()}
+
+    resolved, missing = {}, {}
+    for value, slug in wanted.items():
+        obj = by_name.get(value) or by_slug.get(slug) or by_slug.get(value)
+        if obj is not None:
+            resolved[value] = obj
+        else:
+            missing.setdefault(slug, value)
+
+    if missing:
+        # ignore_conflicts: a concurrent import may have created the same rows
+        model.objects.bulk_create(
+            [model(name=name, slug=slug) for slug, name in missing.items()],
+            ignore_conflicts=True,
+        )
+        by_slug.update((obj.slug, obj) for obj in model.objects.filter(slug__in=missing))
+        for value, slug in wanted.items():
+            if value not in resolved and slug in by_slug:
+                resolved[value] = by_slug[slug]
+    return resolved, bool(missing)
+
+
+def _resolve_companies(values):
+    """Map company ids (as strings) and exact names to CompanyProfile instances in one query."""
+    if not values:
+        return {}
+    ids = {value for value in values if value.isdigit()}
+    resolved = {}
+    for company in CompanyProfile.objects.filter(Q(pk__in=ids) | Q(name__in=values)).order_by("pk"):
+        if str(company.pk) in ids:
+            resolved[str(company.pk)] = company
+        resolved.setdefault(company.name, company)
+    return resolved
+
+
+class JobImporter:
+    """Create jobs from parsed feed rows in chunks.
+
+    Per chunk: rows are validated with JobImportRowSerializer (no queries),
+    categories, tags, companies and locations are resolved with a fixed number of
+    queries, and the jobs and their tag links are written with two
+    `bulk_create` calls inside one transaction. The jobs list cache is
+    invalidated once, after the last chunk.
+    """
+
+    def __init__(self, user, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.user = user
+        self.chunk_size = chunk_size
+        self.report = ImportReport()
+        # bulk_create() skips the signals that version these namespaces
+        # and refresh the related-jobs index
+        self.invalidate = set()
+        self.created_ids = []
+        # Fields are built once and reused for every row
+        self.row_serializer = JobImportRowSerializer()
+
+    def run(self, rows):
+        """Import `(line, row, error)` tuples as produced by `read_rows()`."""
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self.import_chunk(chunk)
+        if self.report.created:
+            self.invalidate.update((JOBS_LIST, JOBS_AUTOCOMPLETE))
+        if self.invalidate:
+            bump_generation(*self.invalidate)
+        if JOB_CATEGORIES in self.invalidate:
+            categories_cache.invalidate()
+        if JOB_TAGS in self.invalidate:
+            tags_cache.invalidate()
+        if JOBS_AUTOCOMPLETE in self.invalidate:
+            autocomplete_index.invalidate()
+        schedule_related_refresh(self.created_ids)
+        schedule_alert_matching(self.created_ids)
+        return self.report
+
+    def validate_chunk(self, chunk):
+        valid = []
+        for line, row, error in chunk:
+            self.report.rows += 1
+            if error:
+                self.report.add_error(line, {"non_field_errors": [error]})
+                continue
+            try:
+                valid.append((line, self.row_serializer.run_validation(row)))
+            except serializers.ValidationError as exc:
+                self.report.add_error(line, exc.detail)
+        return valid
+
+    def import_chunk(self, chunk):
+        valid = self.validate_chunk(chunk)
+        if not valid:
+            return
+
+        categories, created = _resolve_named(
+            JobCategory, {attrs["category"] for _, attrs in valid if attrs.get("category")}
+        )
+        if created:
+            self.invalidate.update((JOB_CATEGORIES, JOBS_LIST))
+        tags, created = _resolve_named(JobTag, {tag for _, attrs in valid for tag in attrs.get("tags", ())})
+        if created:
+            self.invalidate.update((JOB_TAGS, JOBS_LIST))
+        companies = _resolve_companies({attrs["company"] for _, attrs in valid if attrs.get("company")})
+        places = Location.objects.resolve_many({attrs.get("location") for _, attrs in valid})
+
+        jobs, job_tags = [], []
+        for line, attrs in valid:
+            category = attrs.pop("category", "")
+            tag_names = attrs.pop("tags", [])
+            company = attrs.pop("company", "")
+            errors = {}
+            if category and category not in categories:
+                errors["category"] = [f"Invalid category {category!r}."]
+            unresolved = [tag for tag in tag_names if tag not in tags]
+            if unresolved:
+                errors["tags"] = [f"Invalid tags: {', '.join(unresolved)}."]
+            if company and company not in companies:
+                errors["company"] = [f"Company {company!r} does not exist."]
+            if errors:
+                self.report.add_error(line, errors)
+                continue
+
+            job = Job(
+                posted_by=self.user,
+                category=categories.get(category),
+                company=companies.get(company),
+                place=places.get(attrs.get("location")),
+                **attrs,
+            )
+            # Mirror Job.save(), which bulk_create() bypasses
+            if job.company is not None and not job.company_name:
+                job.company_name = job.company.name
+            jobs.append(job)
+            job_tags.append({tags[name].pk for name in tag_names})
+
+        if not jobs:
+            return
+        through = Job.tags.through
+        with transaction.atomic():
+            Job.objects.bulk_create(jobs)
+            through.objects.bulk_create(
+                through(job_id=job.pk, jobtag_id=tag_id)
+                for job, tag_ids in zip(jobs, job_tags)
+                for tag_id in tag_ids
+            )
+        self.report.created += len(jobs)
+        self.created_ids.extend(job.pk for job in jobs)
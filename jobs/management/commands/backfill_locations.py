@@ -0,0 +1,58 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from common.cache import JOBS_LIST, bump_generation
+from jobs.geo import get_gazetteer
+from jobs.models import CompanyProfile, Job, Location
+
+
+class Command(BaseCommand):
+    help = (
+        "Link jobs and company profiles to normalized Locations by matching their "
+        "free-text location against the bundled offline gazetteer. Only rows "
+        "without a place are touched, so the command can be re-run safely."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report matches without writing")
+        parser.add_argument("--show-unmatched", type=int, default=20, help="How many unmatched values to list")
+
+    def handle(self, *args, **options):
+        unmatched = Counter()
+        for model in (Job, CompanyProfile):
+            linked = self.backfill(model, unmatched, options["dry_run"])
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {linked} linked")
+
+        if unmatched:
+            self.stdout.write(f"unmatched values: {len(unmatched)} ({sum(unmatched.values())} rows)")
+            for text, count in unmatched.most_common(options["show_unmatched"]):
+                self.stdout.write(f"  {count:>7}  {text}")
+
+        if not options["dry_run"]:
+            # update() skips save signals; cached job details expire on their own TTL
+            bump_generation(JOBS_LIST)
+
+    def backfill(self, model, unmatched, dry_run):
+        pending = model.objects.filter(place__isnull=True).exclude(location__isnull=True).exclude(location="")
+        # Distinct spellings are few; group in SQL rather than reading every row
+        counts = dict(pending.values_list("location").annotate(rows=Count("pk")).order_by())
+        if dry_run:
+            # Match without creating Location rows
+            gazetteer = get_gazetteer()
+            places = {text: True for text in counts if gazetteer.match(text) is not None}
+        else:
+            places = Location.objects.resolve_many(counts)
+
+        linked = 0
+        for text, count in counts.items():
+            place = places.get(text)
+            if place is None:
+                unmatched[text] += count
+            elif dry_run:
+                linked += count
+            else:
+                # One UPDATE per distinct spelling, not per row
+                linked += pending.filter(location=text).update(place=place)
+        return linked
@@ -0,0 +1,97 @@
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models.functions import Substr
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from jobs.models import Job, JobCategory, JobTag
+from jobs.serializers import JobListSerializer, JobSerializer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare payload size and query/serialization time of a job list page "
+        "rendered with the full JobSerializer vs. the compact JobListSerializer. "
+        "Seeds a throwaway table inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2000, help="Jobs to seed")
+        parser.add_argument("--page-size", type=int, default=100, help="Rows per list page")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per variant")
+        parser.add_argument("--description-chars", type=int, default=3000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options["rows"], options["description_chars"])
+            results = [
+                self.measure("full (JobSerializer)", self.full_queryset, JobSerializer, options),
+                self.measure("compact (JobListSerializer)", self.compact_queryset, JobListSerializer, options),
+            ]
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{'variant':<30}{'payload bytes':>15}{'query ms':>12}{'serialize ms':>15}{'queries':>10}"
+        )
+        for name, size, query_ms, serialize_ms, queries in results:
+            self.stdout.write(f"{name:<30}{size:>15}{query_ms:>12.2f}{serialize_ms:>15.2f}{queries:>10}")
+        full_size, compact_size = results[0][1], results[1][1]
+        self.stdout.write(f"payload reduction: {100 * (1 - compact_size / full_size):.1f}%")
+
+    def seed(self, rows, description_chars):
+        user = User.objects.create_user(email=f"bench-{uuid.uuid4().hex}@example.com", password=None)
+        categories = [JobCategory.objects.create(name=f"bench-cat-{uuid.uuid4().hex[:8]}") for _ in range(5)]
+        tags = [JobTag.objects.create(name=f"bench-tag-{uuid.uuid4().hex[:8]}") for _ in range(10)]
+        text = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 100)[:description_chars]
+        jobs = Job.objects.bulk_create(
+            Job(
+                title=f"Benchmark job {i}",
+                description=text,
+                requirements=text,
+                company_name=f"Company {i % 50}",
+                location="Lagos",
+                posted_by=user,
+                category=categories[i % len(categories)],
+                salary_min=1000 + i,
+            )
+            for i in range(rows)
+        )
+        through = Job.tags.through
+        through.objects.bulk_create(
+            through(job_id=job.pk, jobtag_id=tags[(job.pk + offset) % len(tags)].pk)
+            for job in jobs
+            for offset in range(3)
+        )
+
+    def full_queryset(self, page_size):
+        return Job.objects.all().select_related("category").prefetch_related("tags")[:page_size]
+
+    def compact_queryset(self, page_size):
+        return (
+            Job.objects.public()
+            .prefetch_related("tags")
+            .defer("description", "requirements", "search_vector")
+            .annotate(description_snippet=Substr("description", 1, JobListSerializer.SNIPPET_LENGTH + 1))
+            [:page_size]
+        )
+
+    def measure(self, name, build_queryset, serializer_class, options):
+        query_times, serialize_times, size, queries = [], [], 0, 0
+        for _ in range(options["repeat"]):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                rows = list(build_queryset(options["page_size"]))
+                query_times.append((time.perf_counter() - started) * 1000)
+
+                started = time.perf_counter()
+                payload = JSONRenderer().render(serializer_class(rows, many=True).data)
+                serialize_times.append((time.perf_counter() - started) * 1000)
+            size, queries = len(payload), len(captured)
+        return name, size, statistics.median(query_times), statistics.median(serialize_times), queries
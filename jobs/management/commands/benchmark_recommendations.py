@@ -0,0 +1,80 @@
+import random
+import statistics
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from jobs import recommend
+
+
+class Command(BaseCommand):
+    help = (
+        "Time personalized recommendation scoring against a synthetic in-memory "
+        "job matrix (no database): matrix build time, then median and p95 "
+        "latency of scoring one seeker profile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=100_000, help="Jobs in the matrix")
+        parser.add_argument("--vocabulary", type=int, default=20_000, help="Distinct words in job text")
+        parser.add_argument("--words", type=int, default=60, help="Words of text per job")
+        parser.add_argument("--tags", type=int, default=500, help="Distinct tags")
+        parser.add_argument("--places", type=int, default=200, help="Distinct places")
+        parser.add_argument("--history", type=int, default=20, help="Applications per seeker profile")
+        parser.add_argument("--repeat", type=int, default=50, help="Profiles scored")
+        parser.add_argument("--limit", type=int, default=20, help="Jobs returned per profile")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        # Zipf-like word frequencies, as in real postings
+        vocabulary = [f"w{n}" for n in range(options["vocabulary"])]
+        word_weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+        def job_text():
+            return Counter(rng.choices(vocabulary, word_weights, k=options["words"]))
+
+        rows = [
+            (
+                job_id,
+                job_text(),
+                rng.sample(range(options["tags"]), rng.randint(0, 5)),
+                ("City %d" % rng.randrange(options["places"]), "XX"),
+            )
+            for job_id in range(options["jobs"], 0, -1)
+        ]
+        started = time.perf_counter()
+        matrix = recommend.JobMatrix(rows)
+        self.stdout.write(
+            f"built matrix of {len(matrix)} jobs, {len(matrix.columns)} features "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        timings = []
+        for _ in range(options["repeat"]):
+            history = [rng.randrange(len(rows)) for _ in range(options["history"])]
+            counts = Counter()
+            for row in history:
+                counts.update(rows[row][1])
+            text = matrix.text_vector(counts, limit=recommend.MAX_PROFILE_TERMS)
+            profile = {feature: recommend.TEXT_WEIGHT * weight for feature, weight in text.items()}
+            tags = Counter(tag for row in history for tag in rows[row][2])
+            for tag, count in tags.items():
+                profile[("tag", tag)] = recommend.TAG_WEIGHT * count / len(history)
+            profile[("place", rows[history[0]][3])] = recommend.LOCATION_WEIGHT
+
+            started = time.perf_counter()
+            matrix.score(profile, exclude=[rows[row][0] for row in history], limit=options["limit"])
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        engine = "numpy" if recommend.np is not None else "pure python"
+        self.stdout.write(f"engine: {engine}")
+        if recommend.np is None:
+            self.stdout.write(self.style.WARNING(
+                "NumPy is not installed here; deployed builds (requirements.txt) score with numpy"
+            ))
+        self.stdout.write(f"profile features: ~{len(profile)}")
+        self.stdout.write(f"score median {statistics.median(timings):.2f} ms, p95 {p95:.2f} ms")
@@ -0,0 +1,96 @@
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F
+
+from jobs.filters import ILikeContains, JobFilter
+from jobs.models import Job
+
+User = get_user_model()
+
+CITIES = ("Lagos", "Nairobi", "Accra", "Kigali", "Cairo", "Abuja", "Kampala", "Dakar", "Tunis", "Lusaka")
+
+# One statement seeds every row; the search_vector trigger still fires per row
+SEED_SQL = f"""
+INSERT INTO jobs_job (
+    title, description, requirements, company_name, location, employment_type,
+    salary_currency, status, posted_by_id, created_at, updated_at
+)
+SELECT
+    'Benchmark job ' || i,
+    'Benchmark description',
+    'Benchmark requirements',
+    'Company ' || substr(md5((i % 20000)::text), 1, 8),
+    (ARRAY[{", ".join(f"'{city}'" for city in CITIES)}])[1 + i % {len(CITIES)}] || ' District ' || (i % 5000),
+    'full-time',
+    'USD',
+    'open',
+    %s,
+    now() - (i || ' seconds')::interval,
+    now()
+FROM generate_series(1, %s) AS i
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Time location/company filters on Postgres: the old icontains query "
+        "(UPPER(col) LIKE, sequential scan), ILIKE served by the trigram GIN "
+        "indexes, and fuzzy (%>) matching. Seeds rows inside a transaction "
+        "that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Jobs to seed")
+        parser.add_argument("--page-size", type=int, default=20, help="Rows per list page")
+        parser.add_argument("--repeat", type=int, default=10, help="Timed runs per variant")
+        parser.add_argument("--location", default="District 1234", help="Substring to filter on")
+        parser.add_argument("--company", default="Company 0a", help="Company substring to filter on")
+        parser.add_argument("--fuzzy-location", default="Lgos", help="Misspelled location for fuzzy mode")
+        parser.add_argument("--explain", action="store_true", help="Print each variant's query plan")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Trigram indexes need Postgres with pg_trgm; this database is %s." % connection.vendor)
+
+        with transaction.atomic():
+            self.seed(options["rows"])
+            page_size = options["page_size"]
+            variants = [
+                ("location icontains", lambda: Job.objects.filter(location__icontains=options["location"])),
+                ("location ILIKE (trigram)", lambda: Job.objects.filter(ILikeContains(F("location"), options["location"]))),
+                ("company icontains", lambda: Job.objects.filter(company_name__icontains=options["company"])),
+                ("company ILIKE (trigram)", lambda: Job.objects.filter(ILikeContains(F("company_name"), options["company"]))),
+                ("location fuzzy (ranked)", lambda: self.fuzzy_queryset(options["fuzzy_location"])),
+            ]
+            results = [self.measure(name, build, page_size, options) for name, build in variants]
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{'variant':<30}{'median ms':>12}{'rows':>8}")
+        for name, median_ms, rows in results:
+            self.stdout.write(f"{name:<30}{median_ms:>12.2f}{rows:>8}")
+
+    def seed(self, rows):
+        user = User.objects.create_user(email=f"bench-{uuid.uuid4().hex}@example.com", password=None)
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(SEED_SQL, [user.pk, rows])
+            cursor.execute("ANALYZE jobs_job")
+        self.stdout.write(f"seeded {rows} jobs in {time.perf_counter() - started:.1f}s")
+
+    def fuzzy_queryset(self, value):
+        return JobFilter({"location": value, "fuzzy": "1"}, queryset=Job.objects.all()).qs
+
+    def measure(self, name, build_queryset, page_size, options):
+        if options["explain"]:
+            self.stdout.write(f"-- {name}\n{build_queryset()[:page_size].explain(analyze=True)}\n")
+        timings, rows = [], 0
+        for _ in range(options["repeat"]):
+            started = time.perf_counter()
+            rows = len(list(build_queryset().only("id")[:page_size]))
+            timings.append((time.perf_counter() - started) * 1000)
+        return name, statistics.median(timings), rows
@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs import related
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the related-jobs index for every open job. Job writes refresh "
+        "it incrementally; run this after bulk changes or on a schedule."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        indexed = related.rebuild()
+        engine = "numpy" if related.np is not None else "python"
+        self.stdout.write(f"indexed {indexed} jobs in {time.perf_counter() - started:.1f}s ({engine})")
@@ -0,0 +1,39 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.importers import DEFAULT_CHUNK_SIZE, FORMATS, JobImporter, detect_format, read_rows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-import jobs from a CSV (with header) or NDJSON feed. The file is "
+        "streamed and written in chunks; invalid rows are reported by line number."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Feed file to import")
+        parser.add_argument("--user", required=True, help="Email of the user the jobs are posted by")
+        parser.add_argument("--format", dest="file_format", choices=FORMATS, help="Defaults to the file extension")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        file_format = options["file_format"] or detect_format(options["path"])
+        if file_format is None:
+            raise CommandError(f"Cannot infer the format of {options['path']}; pass --format.")
+        try:
+            user = User.objects.get(email=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['user']!r}.")
+
+        with open(options["path"], encoding="utf-8-sig", newline="") as stream:
+            report = JobImporter(user, chunk_size=options["chunk_size"]).run(read_rows(stream, file_format))
+
+        for error in report.errors:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        if report.failed > len(report.errors):
+            self.stderr.write(f"... {report.failed - len(report.errors)} more rows with errors")
+        self.stdout.write(f"rows: {report.rows}, created: {report.created}, failed: {report.failed}")
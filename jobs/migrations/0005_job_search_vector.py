@@ -0,0 +1,62 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:15
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# The trigger keeps search_vector in sync for every write path (ORM save,
+# queryset.update, bulk_create, raw SQL), so application code never has to.
+CREATE_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION jobs_job_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.company_name, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.requirements, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS jobs_job_search_vector_trigger ON jobs_job;
+CREATE TRIGGER jobs_job_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, company_name, requirements, description
+    ON jobs_job
+    FOR EACH ROW EXECUTE FUNCTION jobs_job_search_vector_update();
+"""
+# Existing rows are backfilled in batches and the GIN index is built
+# concurrently by 0016_job_search_vector_backfill, outside any transaction
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS jobs_job_search_vector_trigger ON jobs_job;
+DROP FUNCTION IF EXISTS jobs_job_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    # Full-text search is Postgres-only; SQLite test runs use the icontains fallback
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(CREATE_TRIGGER_SQL)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(DROP_TRIGGER_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_status_job_jobs_job_title_0e1e41_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+from common.operations import AddIndexConcurrentlyIfSupported
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('jobs', '0005_job_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfSupported(
+            model_name='job',
+            index=models.Index(condition=models.Q(('status', 'open')), fields=['-created_at', 'id'], name='jobs_job_open_created_idx'),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name='job',
+            index=models.Index(fields=['category', '-created_at'], name='jobs_job_category_created_idx'),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name='job',
+            index=models.Index(fields=['employment_type', '-created_at'], name='jobs_job_emptype_created_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:40
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+from common.operations import AddIndexConcurrentlyIfSupported
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('jobs', '0006_job_listing_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.BigIntegerField()),
+                ('reason', models.CharField(choices=[('deleted', 'Deleted'), ('closed', 'Closed'), ('draft', 'Draft')], max_length=10)),
+                ('removed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['removed_at', 'id'],
+            },
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name='job',
+            index=models.Index(condition=models.Q(('status', 'open')), fields=['updated_at', 'id'], name='jobs_job_open_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobtombstone',
+            index=models.Index(fields=['removed_at', 'id'], name='jobs_tombstone_removed_idx'),
+        ),
+    ]
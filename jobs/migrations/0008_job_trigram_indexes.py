@@ -0,0 +1,43 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+# Plain-column trigram indexes serve both `ILIKE '%x%'` (substring filters)
+# and the `%>` word-similarity operator (fuzzy filters). They are kept out of
+# Job.Meta.indexes because GIN is Postgres-only and SQLite rebuilds tables
+# from Meta.indexes.
+TRIGRAM_INDEXES = {
+    "jobs_job_location_trgm": "location",
+    "jobs_job_company_name_trgm": "company_name",
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON jobs_job USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('jobs', '0007_job_changes_feed'),
+    ]
+
+    operations = [
+        # No-op on other databases
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
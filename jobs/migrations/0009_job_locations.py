@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from common.operations import AddIndexConcurrentlyIfSupported
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('jobs', '0008_job_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city', models.CharField(max_length=100)),
+                ('region', models.CharField(blank=True, max_length=100)),
+                ('country', models.CharField(max_length=100)),
+                ('country_code', models.CharField(max_length=2)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+            ],
+            options={
+                'ordering': ['country_code', 'city'],
+                'indexes': [models.Index(fields=['latitude', 'longitude'], name='jobs_location_latlon_idx')],
+                'constraints': [models.UniqueConstraint(fields=('city', 'region', 'country_code'), name='jobs_location_unique_place')],
+            },
+        ),
+        migrations.AddField(
+            model_name='companyprofile',
+            name='place',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='companies', to='jobs.location'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='place',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='jobs.location'),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name='job',
+            index=models.Index(fields=['place'], name='jobs_job_place_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+# Job.tags uses an auto-created through table, which cannot declare
+# Meta.indexes. Its unique (job_id, jobtag_id) index serves job -> tags;
+# this one serves tag -> jobs (tag filters and facets) as an index-only scan.
+INDEX_NAME = "jobs_job_tags_tag_job_idx"
+
+
+def create_index(apps, schema_editor):
+    concurrently = "CONCURRENTLY " if schema_editor.connection.vendor == "postgresql" else ""
+    schema_editor.execute(
+        f"CREATE INDEX {concurrently}IF NOT EXISTS {INDEX_NAME} ON jobs_job_tags (jobtag_id, job_id)"
+    )
+
+
+def drop_index(apps, schema_editor):
+    concurrently = "CONCURRENTLY " if schema_editor.connection.vendor == "postgresql" else ""
+    schema_editor.execute(f"DROP INDEX {concurrently}IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('jobs', '0009_job_locations'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
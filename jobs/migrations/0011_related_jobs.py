@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_job_tags_tag_job_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_entries', to='jobs.job')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jobs.job')),
+            ],
+            options={
+                'ordering': ['job', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('job', 'rank'), name='jobs_relatedjob_job_rank_uniq')],
+            },
+        ),
+    ]
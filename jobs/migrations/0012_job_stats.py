@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_related_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobStats',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='jobs.job')),
+                ('views', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'job stats',
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_job_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('query', models.JSONField(default=dict)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'saved searches',
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SavedSearchKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64)),
+                ('search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='keys', to='jobs.savedsearch')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('key', 'search'), name='jobs_savedsearchkey_key_search_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SavedSearchMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matched_at', models.DateTimeField(auto_now_add=True)),
+                ('notified_at', models.DateTimeField(blank=True, null=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jobs.job')),
+                ('search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='jobs.savedsearch')),
+            ],
+            options={
+                'verbose_name_plural': 'saved search matches',
+                'indexes': [models.Index(condition=models.Q(('notified_at__isnull', True)), fields=['matched_at'], name='jobs_ssmatch_pending_idx')],
+                'constraints': [models.UniqueConstraint(fields=('search', 'job'), name='jobs_savedsearchmatch_search_job_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0013_saved_searches'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedJobRefresh',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.BigIntegerField(unique=True)),
+                ('token', models.UUIDField()),
+                ('queued_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_related_job_refresh'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobtombstone',
+            name='reason',
+            field=models.CharField(choices=[('deleted', 'Deleted'), ('closed', 'Closed'), ('draft', 'Draft'), ('expired', 'Expired')], max_length=10),
+        ),
+    ]
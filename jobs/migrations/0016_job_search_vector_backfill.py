@@ -0,0 +1,54 @@
+from django.db import migrations
+
+
+# Rows per UPDATE; each batch commits on its own, so row locks on jobs_job
+# are held for one batch rather than the whole backfill
+BACKFILL_BATCH_SIZE = 5000
+
+
+def backfill_search_vector(apps, schema_editor):
+    # Full-text search is Postgres-only; SQLite test runs use the icontains fallback
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT min(id), max(id) FROM jobs_job")
+        low, high = cursor.fetchone()
+        if low is None:
+            return
+        for start in range(low, high + 1, BACKFILL_BATCH_SIZE):
+            # Touching title fires jobs_job_search_vector_trigger (0005); rows
+            # already filled are skipped, so an interrupted run can resume
+            cursor.execute(
+                "UPDATE jobs_job SET title = title WHERE id >= %s AND id < %s AND search_vector IS NULL",
+                [start, start + BACKFILL_BATCH_SIZE],
+            )
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS jobs_job_search_vector_gin ON jobs_job USING gin (search_vector)"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS jobs_job_search_vector_gin")
+
+
+class Migration(migrations.Migration):
+    # Batches must commit separately and CREATE INDEX CONCURRENTLY cannot run
+    # inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('jobs', '0015_tombstone_expired'),
+    ]
+
+    operations = [
+        # No-ops on other databases
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
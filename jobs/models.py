@@ -1,8 +1,11 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 from django.utils.text import slugify
 
+from .geo import get_gazetteer
+
 # --------------------------
 # Job Category
 # --------------------------
@@ -45,10 +48,109 @@ class JobTag(models.Model):
     def __str__(self):
         return self.name
 
+# --------------------------
+# Location
+# --------------------------
+class LocationQuerySet(models.QuerySet):
+    def resolve_many(self, texts):
+        """Map each free-text location in `texts` to a Location, creating missing ones.
+
+        Texts are matched against the bundled gazetteer (see jobs.geo); texts
+        it does not recognise ("Remote") are left out of the result. Existing
+        rows are read with one query and missing ones inserted with one
+        `bulk_create` and read back with one more.
+        """
+        gazetteer = get_gazetteer()
+        matches = {text: gazetteer.match(text) for text in set(texts) if text}
+        matches = {text: place for text, place in matches.items() if place is not None}
+        if not matches:
+            return {}
+
+        def key(obj):
+            return obj.city, obj.region, obj.country_code
+
+        wanted = {key(place): place for place in matches.values()}
+        lookup = models.Q()
+        for city, region, country_code in wanted:
+            lookup |= models.Q(city=city, region=region, country_code=country_code)
+        found = {key(obj): obj for obj in self.filter(lookup)}
+        missing = [place for place_key, place in wanted.items() if place_key not in found]
+        if missing:
+            # ignore_conflicts: a concurrent writer may have created the same rows
+            self.bulk_create([self.model(**place._asdict()) for place in missing], ignore_conflicts=True)
+            found.update((key(obj), obj) for obj in self.filter(lookup))
+        return {text: found[key(place)] for text, place in matches.items() if key(place) in found}
+
+    def resolve(self, text):
+        """Return the Location for one free-text location, or None."""
+        return self.resolve_many([text]).get(text)
+
+
+class Location(models.Model):
+    """A normalized place that jobs and companies reference for geo search.
+
+    The free-text `location` columns stay as entered for display; `place`
+    points here once the text is recognised by the gazetteer.
+    """
+
+    city = models.CharField(max_length=100)
+    region = models.CharField(max_length=100, blank=True)
+    country = models.CharField(max_length=100)
+    country_code = models.CharField(max_length=2)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+
+    objects = LocationQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["country_code", "city"]
+        constraints = [
+            models.UniqueConstraint(fields=["city", "region", "country_code"], name="jobs_location_unique_place"),
+        ]
+        indexes = [
+            # Bounding-box prefilter for ?near= radius search
+            models.Index(fields=["latitude", "longitude"], name="jobs_location_latlon_idx"),
+        ]
+
+    def __str__(self):
+        return ", ".join(part for part in (self.city, self.region, self.country) if part)
+
+
+class ResolvesPlaceMixin:
+    """Keeps `place` in step with the free-text `location` on every save.
+
+    The location as loaded from the database is remembered, so an edit made
+    anywhere (API, admin, shell) re-resolves the place and clearing it clears
+    the place. An unchanged location only fills an empty place.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_location = instance.__dict__.get("location", models.DEFERRED)
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        loaded = getattr(self, "_loaded_location", None)
+        # A deferred location that was never assigned cannot have changed; one
+        # assigned after a deferred load counts as changed
+        if "location" in self.__dict__ and (update_fields is None or "location" in update_fields):
+            if not self._state.adding and self.location != loaded:
+                self.place = Location.objects.resolve(self.location) if self.location else None
+                if update_fields is not None:
+                    kwargs["update_fields"] = {*update_fields, "place"}
+            elif self.location and self.place_id is None:
+                self.place = Location.objects.resolve(self.location)
+        super().save(*args, **kwargs)
+        if "location" in self.__dict__:
+            self._loaded_location = self.location
+
+
 # --------------------------
 # Company Profile
 # --------------------------
-class CompanyProfile(models.Model):
+class CompanyProfile(ResolvesPlaceMixin, models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -58,6 +160,13 @@ class CompanyProfile(models.Model):
     description = models.TextField(blank=True, null=True)
     website = models.URLField(blank=True, null=True)
     location = models.CharField(max_length=255, blank=True, null=True)
+    place = models.ForeignKey(
+        Location,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="companies",
+    )
     logo = models.ImageField(upload_to="company_logos/", blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -68,7 +177,31 @@ class CompanyProfile(models.Model):
 # --------------------------
 # Job Model
 # --------------------------
-class Job(models.Model):
+class JobQuerySet(models.QuerySet):
+    def public(self):
+        """Jobs shown on public listings: open and not past their deadline."""
+        return self.filter(status="open").filter(
+            models.Q(deadline__isnull=True) | models.Q(deadline__gt=timezone.now())
+        )
+
+    def update(self, **kwargs):
+        """UPDATE that tombstones the jobs it takes off public listings, as saves do (jobs.signals)."""
+        if "status" not in kwargs and "deadline" not in kwargs:
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            listed = list(self.public().values_list("pk", flat=True))
+            updated = super().update(**kwargs)
+            if listed:
+                rows = self.model._base_manager.using(self.db).filter(pk__in=listed)
+                JobTombstone.objects.using(self.db).bulk_create(
+                    JobTombstone(job_id=pk, reason=reason)
+                    for pk, job_status, deadline in rows.values_list("pk", "status", "deadline")
+                    if (reason := JobTombstone.reason_for(job_status, deadline)) is not None
+                )
+        return updated
+
+
+class Job(ResolvesPlaceMixin, models.Model):
     EMPLOYMENT_TYPES = (
         ("full-time", "Full-time"),
         ("part-time", "Part-time"),
@@ -119,11 +252,26 @@ class Job(models.Model):
         related_name="jobs",
     )
     tags = models.ManyToManyField(JobTag, blank=True, related_name="jobs")
+    # Normalized form of `location`; indexed concurrently by migration 0009
+    place = models.ForeignKey(
+        Location,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="jobs",
+        db_index=False,
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     deadline = models.DateTimeField(null=True, blank=True)
 
+    # Weighted full-text document (title > company > requirements > description).
+    # Maintained by a Postgres trigger (see migration 0005); stays NULL on SQLite.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = JobQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
         # If a company profile is set but company_name is empty, sync the display name
         if getattr(self, "company", None) and not self.company_name:
@@ -141,4 +289,198 @@ class Job(models.Model):
         indexes = [
             models.Index(fields=["title"]),
             models.Index(fields=["location"]),
+            # Public listing: open jobs, newest first (matches JobQuerySet.public + keyset order)
+            models.Index(
+                fields=["-created_at", "id"],
+                name="jobs_job_open_created_idx",
+                condition=models.Q(status="open"),
+            ),
+            # Delta sync: open jobs in (updated_at, id) watermark order
+            models.Index(
+                fields=["updated_at", "id"],
+                name="jobs_job_open_updated_idx",
+                condition=models.Q(status="open"),
+            ),
+            models.Index(fields=["category", "-created_at"], name="jobs_job_category_created_idx"),
+            models.Index(fields=["employment_type", "-created_at"], name="jobs_job_emptype_created_idx"),
+            models.Index(fields=["place"], name="jobs_job_place_idx"),
+        ]
+
+
+# --------------------------
+# Related Jobs
+# --------------------------
+class RelatedJob(models.Model):
+    """One precomputed "similar job" neighbour; see jobs.related.
+
+    Rebuilt in the background, so `/api/jobs/<id>/related/` is a single
+    lookup on (job, rank).
+    """
+
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="related_entries")
+    related = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ["job", "rank"]
+        constraints = [
+            models.UniqueConstraint(fields=["job", "rank"], name="jobs_relatedjob_job_rank_uniq"),
+        ]
+
+    def __str__(self):
+        return f"Job {self.job_id} -> {self.related_id} ({self.score:.2f})"
+
+
+class RelatedJobRefresh(models.Model):
+    """A job whose stored neighbours are due for recomputation; see jobs.related.
+
+    Queued in the same transaction as the job write and drained in batches,
+    so a burst of writes costs one corpus load rather than one per write.
+    """
+
+    # Not a foreign key: a queued job may be deleted before the refresh runs
+    job_id = models.BigIntegerField(unique=True)
+    # New on every (re-)queue; a refresh only clears the versions it read
+    token = models.UUIDField()
+    queued_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Refresh related jobs of {self.job_id}"
+
+
+# --------------------------
+# Job Stats
+# --------------------------
+class JobStats(models.Model):
+    """Running counters for a job, written in batches by jobs.trending.flush().
+
+    Detail views are buffered in memory and the cache, never counted with a
+    per-request UPDATE on jobs_job.
+    """
+
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    views = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "job stats"
+
+    def __str__(self):
+        return f"Job {self.job_id}: {self.views} views"
+
+
+# --------------------------
+# Job Tombstone
+# --------------------------
+class JobTombstone(models.Model):
+    """Records a job leaving the public feed so delta-sync clients can drop it.
+
+    Written by jobs.signals when a job is deleted or saved out of public()
+    (closed, unpublished, or given a past deadline), and by
+    JobQuerySet.update(); read by `/api/jobs/changes/` in (removed_at, id)
+    order. Deadlines passing on their own are reported by the feed itself.
+    """
+
+    REASON_CHOICES = (
+        ("deleted", "Deleted"),
+        ("closed", "Closed"),
+        ("draft", "Draft"),
+        ("expired", "Expired"),
+    )
+
+    # Not a foreign key: the job row may no longer exist
+    job_id = models.BigIntegerField()
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+    removed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["removed_at", "id"]
+        indexes = [
+            models.Index(fields=["removed_at", "id"], name="jobs_tombstone_removed_idx"),
         ]
+
+    def __str__(self):
+        return f"Job {self.job_id} {self.reason} at {self.removed_at}"
+
+    @staticmethod
+    def reason_for(status, deadline, now=None):
+        """Why a job with this status and deadline is off public listings, or None if it is listed."""
+        if status != "open":
+            return status
+        if deadline is not None and deadline <= (now or timezone.now()):
+            return "expired"
+        return None
+
+
+# --------------------------
+# Saved Searches & Job Alerts
+# --------------------------
+class SavedSearch(models.Model):
+    """A job seeker's stored JobFilter query, alerted on when new jobs match.
+
+    `query` holds the JobFilter params (plus `search`) as strings, exactly as
+    they would appear in the list URL. Its index keys (SavedSearchKey) are
+    rebuilt by jobs.alerts.index_search() whenever it is saved.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="saved_searches")
+    name = models.CharField(max_length=100, blank=True)
+    query = models.JSONField(default=dict)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "saved searches"
+        ordering = ["-created_at", "-id"]
+
+    def __str__(self):
+        return self.name or f"Saved search {self.pk}"
+
+
+class SavedSearchKey(models.Model):
+    """One alternative of a saved search's most selective predicate.
+
+    A job can only match the search if it carries one of these keys (e.g.
+    `tag:7`, `category:3`, `location:lag`, or `*` when nothing narrows it),
+    so matching a job starts with a `key IN (...)` lookup on this table.
+    """
+
+    search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name="keys")
+    key = models.CharField(max_length=64)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["key", "search"], name="jobs_savedsearchkey_key_search_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.key} -> {self.search_id}"
+
+
+class SavedSearchMatch(models.Model):
+    """A job that matched a saved search, queued until its digest is sent."""
+
+    search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name="matches")
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="+")
+    matched_at = models.DateTimeField(auto_now_add=True)
+    notified_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "saved search matches"
+        constraints = [
+            # A job is alerted on once per search, however often it is edited
+            models.UniqueConstraint(fields=["search", "job"], name="jobs_savedsearchmatch_search_job_uniq"),
+        ]
+        indexes = [
+            # The digest queue
+            models.Index(
+                fields=["matched_at"],
+                name="jobs_ssmatch_pending_idx",
+                condition=models.Q(notified_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"Job {self.job_id} matched search {self.search_id}"
@@ -0,0 +1,289 @@
+import heapq
+import math
+import re
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db.models.functions import Substr
+
+from .geo import get_gazetteer
+from .models import Job
+# `np` is None only without NumPy (see requirements.txt); scoring then falls back to Python
+from .related import STOPWORDS, np
+
+# Seconds between builds of the shared job matrix (jobs.tasks.rebuild_job_matrix
+# on the beat schedule); the cached copy outlives a few missed runs
+MATRIX_MAX_AGE = 300
+MATRIX_CACHE_KEY = "jobs:recommend:matrix"
+MATRIX_STAMP_KEY = "jobs:recommend:matrix-built-at"
+MATRIX_CACHE_TIMEOUT = 4 * MATRIX_MAX_AGE
+# Seconds a process scores with its loaded copy before checking for a newer build
+MATRIX_CHECK_INTERVAL = 30
+# Longest text a job contributes, and its strongest terms kept per job
+MAX_TEXT_CHARS = 5000
+MAX_TERMS_PER_JOB = 50
+# Past applications that make up a seeker's profile, newest first, and the
+# strongest terms kept from them (each term costs one column scan when scoring)
+PROFILE_HISTORY = 50
+MAX_PROFILE_TERMS = 100
+# Title words count this many times over requirement words
+TITLE_BOOST = 2
+# Share of the score from each signal
+TEXT_WEIGHT = 1.0
+TAG_WEIGHT = 0.5
+LOCATION_WEIGHT = 0.3
+
+
+def terms(text):
+    return [word for word in re.findall(r"[a-z0-9]+", (text or "")[:MAX_TEXT_CHARS].lower())
+            if len(word) > 2 and word not in STOPWORDS]
+
+
+def job_terms(title, requirements):
+    counts = Counter(terms(requirements))
+    for word in terms(title):
+        counts[word] += TITLE_BOOST
+    return counts
+
+
+def place_key(city, country_code):
+    return (city, country_code) if city else None
+
+
+class JobMatrix:
+    """Column-major sparse matrix of open jobs, for scoring seeker profiles.
+
+    Rows are jobs. Columns are features: TF-IDF weighted terms from title and
+    requirements (L2-normalized per job), tags (scaled by 1/sqrt(tag count))
+    and the job's place. Each column is stored as parallel arrays of row
+    numbers and weights, so scoring a profile is a sparse dot product that
+    touches only the columns the profile uses: with NumPy one vectorized
+    scatter-add per column, without it the same sums in pure Python.
+    """
+
+    def __init__(self, rows):
+        """`rows`: `(job_id, term_counts, tag_ids, place_key)` tuples, newest job first."""
+        rows = list(rows)
+        document_frequency = Counter()
+        for _, counts, _, _ in rows:
+            document_frequency.update(counts.keys())
+        total = len(rows)
+        self.idf = {term: math.log((1 + total) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+        self.ids = array("q")
+        columns = defaultdict(lambda: (array("i"), array("d")))
+        for row, (job_id, counts, tag_ids, place) in enumerate(rows):
+            self.ids.append(job_id)
+            for feature, weight in self.text_vector(counts, limit=MAX_TERMS_PER_JOB).items():
+                self._append(columns[feature], row, weight)
+            for tag_id in tag_ids:
+                self._append(columns[("tag", tag_id)], row, 1 / math.sqrt(len(tag_ids)))
+            if place is not None:
+                self._append(columns[("place", place)], row, 1.0)
+
+        if np is not None:
+            self.columns = {
+                feature: (np.frombuffer(rows_, dtype=np.int32), np.frombuffer(weights, dtype=np.float64))
+                for feature, (rows_, weights) in columns.items()
+            }
+        else:
+            self.columns = dict(columns)
+        # Wall clock, so processes can tell which build they hold
+        self.built_at = time.time()
+
+    @staticmethod
+    def _append(column, row, weight):
+        column[0].append(row)
+        column[1].append(weight)
+
+    @classmethod
+    def load(cls):
+        """Build the matrix from publicly listed jobs with two queries."""
+        jobs = Job.objects.public().order_by("-created_at", "-id")
+        tags = defaultdict(list)
+        through = Job.tags.through.objects.filter(job__in=jobs.values("pk"))
+        for job_id, tag_id in through.values_list("job_id", "jobtag_id").iterator():
+            tags[job_id].append(tag_id)
+        return cls(
+            (job_id, job_terms(title, requirements), tags.get(job_id, ()), place_key(city, country_code))
+            for job_id, title, requirements, city, country_code in jobs.values_list(
+                "id", "title", "requirements", "place__city", "place__country_code"
+            ).iterator()
+        )
+
+    def text_vector(self, counts, limit=None):
+        """TF-IDF weights of `counts` over known terms, L2-normalized."""
+        weights = {
+            ("term", term): (1 + math.log(count)) * self.idf[term]
+            for term, count in counts.items()
+            if count > 0 and term in self.idf
+        }
+        if limit is not None and len(weights) > limit:
+            weights = dict(heapq.nlargest(limit, weights.items(), key=lambda item: item[1]))
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {feature: w / norm for feature, w in weights.items()}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def score(self, profile, exclude=(), limit=20):
+        """Return the best `limit` `(job_id, score)` pairs for a `{feature: weight}` profile.
+
+        Jobs in `exclude` and jobs sharing no feature with the profile are
+        left out; ties go to the newer job.
+        """
+        exclude = set(exclude)
+        if np is not None:
+            scores = np.zeros(len(self.ids))
+            for feature, weight in profile.items():
+                column = self.columns.get(feature)
+                if column is not None:
+                    # Rows are unique within a column, so fancy-index += is a scatter-add
+                    scores[column[0]] += weight * column[1]
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > limit + len(exclude):
+                keep = limit + len(exclude)
+                candidates = candidates[np.argpartition(-scores[candidates], keep - 1)[:keep]]
+            scored = ((int(row), float(scores[row])) for row in candidates)
+        else:
+            totals = defaultdict(float)
+            for feature, weight in profile.items():
+                rows, weights = self.columns.get(feature, ((), ()))
+                for row, value in zip(rows, weights):
+                    totals[row] += weight * value
+            scored = totals.items()
+        # Rows are ordered newest first, so the lower row wins a tie
+        best = heapq.nsmallest(
+            limit,
+            ((-score, row) for row, score in scored if score > 0 and self.ids[row] not in exclude),
+        )
+        return [(self.ids[row], -negative) for negative, row in best]
+
+
+def build_job_matrix():
+    """Build the job matrix from the database and publish it to every process."""
+    matrix = JobMatrix.load()
+    # The matrix first: a process that sees the new stamp must find its build
+    cache.set(MATRIX_CACHE_KEY, matrix, timeout=MATRIX_CACHE_TIMEOUT)
+    cache.set(MATRIX_STAMP_KEY, matrix.built_at, timeout=MATRIX_CACHE_TIMEOUT)
+    return len(matrix)
+
+
+_matrix = None
+_matrix_checked_at = 0.0
+_matrix_lock = threading.Lock()
+
+
+def get_job_matrix():
+    """Return the latest built job matrix, or None if none has been built yet.
+
+    Requests never build the matrix: they load the copy build_job_matrix()
+    cached, keep it in the process and compare its stamp with the cached one
+    every MATRIX_CHECK_INTERVAL seconds. With nothing cached a build is
+    queued and None returned. One thread checks while the others keep
+    scoring against the copy they have.
+    """
+    global _matrix, _matrix_checked_at
+    from .tasks import schedule_job_matrix_build
+
+    matrix = _matrix
+    if matrix is not None and time.monotonic() - _matrix_checked_at < MATRIX_CHECK_INTERVAL:
+        return matrix
+    if not _matrix_lock.acquire(blocking=False):
+        return matrix
+    try:
+        _matrix_checked_at = time.monotonic()
+        if matrix is None or cache.get(MATRIX_STAMP_KEY) != matrix.built_at:
+            loaded = cache.get(MATRIX_CACHE_KEY)
+            if loaded is None:
+                # Runs inline in eager mode, so look once more
+                schedule_job_matrix_build()
+                loaded = cache.get(MATRIX_CACHE_KEY)
+            if loaded is not None:
+                _matrix = loaded
+    finally:
+        _matrix_lock.release()
+    return _matrix
+
+
+def reset_job_matrix():
+    """Drop this process's copy; the next lookup loads the cached build."""
+    global _matrix
+    _matrix = None
+
+
+def build_profile(user, matrix):
+    """Return `({feature: weight}, applied_job_ids)` for a job seeker.
+
+    Text terms come from the titles and requirements of the seeker's recent
+    applications, tag affinities from how often each tag appears among them,
+    and the location from the seeker's own `location`, matched against the
+    gazetteer.
+    """
+    from applications.models import JobApplication
+
+    applications = list(
+        JobApplication.objects.filter(user=user)
+        .order_by("-applied_at")
+        .values_list("job_id", "job__title", "job__requirements")[:PROFILE_HISTORY]
+    )
+    applied = [job_id for job_id, _, _ in applications]
+    profile = {}
+
+    counts = Counter()
+    for _, title, requirements in applications:
+        counts.update(job_terms(title, requirements))
+    for feature, weight in matrix.text_vector(counts, limit=MAX_PROFILE_TERMS).items():
+        profile[feature] = TEXT_WEIGHT * weight
+
+    if applied:
+        tag_counts = Counter(
+            Job.tags.through.objects.filter(job_id__in=applied).values_list("jobtag_id", flat=True)
+        )
+        for tag_id, count in tag_counts.items():
+            profile[("tag", tag_id)] = TAG_WEIGHT * count / len(applied)
+
+    place = get_gazetteer().match(user.location) if user.location else None
+    if place is not None:
+        profile[("place", (place.city, place.country_code))] = LOCATION_WEIGHT
+    return profile, applied
+
+
+def recommend(user, limit=20):
+    """Return `(job_id, score)` pairs for `user`, best first.
+
+    Empty without a profile, or while no matrix has been built.
+    """
+    matrix = get_job_matrix()
+    if matrix is None:
+        return []
+    profile, applied = build_profile(user, matrix)
+    if not profile:
+        return []
+    return matrix.score(profile, exclude=applied, limit=limit)
+
+
+def recommended_jobs(user, limit=20):
+    """Return `([(job, score), ...], personalized)` ready for JobListSerializer.
+
+    Seekers with no usable profile, and everyone until the first matrix
+    build lands, get the newest public jobs (score None) and `personalized`
+    False. Jobs are re-checked against public() since the
+    matrix may be up to MATRIX_MAX_AGE old.
+    """
+    from .serializers import JobListSerializer
+
+    jobs = (
+        Job.objects.public()
+        .defer("description", "requirements", "search_vector")
+        .annotate(description_snippet=Substr("description", 1, JobListSerializer.SNIPPET_LENGTH + 1))
+        .prefetch_related("tags")
+    )
+    scored = recommend(user, limit)
+    if not scored:
+        return [(job, None) for job in jobs.order_by("-created_at", "-id")[:limit]], False
+    by_id = jobs.in_bulk([job_id for job_id, _ in scored])
+    return [(by_id[job_id], score) for job_id, score in scored if job_id in by_id], True
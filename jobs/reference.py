@@ -0,0 +1,21 @@
+from common.cache import JOB_CATEGORIES, JOB_TAGS
+from common.localcache import TwoTierCache
+from .models import JobCategory, JobTag
+
+# Versioned by the generations jobs.signals bumps on every category/tag write
+categories_cache = TwoTierCache(JOB_CATEGORIES, maxsize=4)
+tags_cache = TwoTierCache(JOB_TAGS, maxsize=4)
+
+
+def get_categories():
+    """Return every category as an ordered `{pk: JobCategory}` dict, served from memory."""
+    return categories_cache.get_or_load("all", lambda: {c.pk: c for c in JobCategory.objects.all()})
+
+
+def get_tags():
+    """Return every tag as an ordered `{pk: JobTag}` dict, served from memory."""
+    return tags_cache.get_or_load("all", lambda: {t.pk: t for t in JobTag.objects.all()})
+
+
+def get_reference_cache_stats():
+    return {"categories": categories_cache.stats(), "tags": tags_cache.stats()}
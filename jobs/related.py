@@ -0,0 +1,246 @@
+import heapq
+import math
+import re
+import uuid
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from .models import Job, RelatedJob, RelatedJobRefresh
+
+try:
+    import numpy as np
+except ImportError:
+    # Installed from requirements.txt; the pure-Python path gives the same
+    # result, just slower, e.g. in a bare checkout
+    np = None
+
+# Neighbours stored per job
+RELATED_LIMIT = 10
+# Pairs scoring below this are not worth showing
+MIN_SCORE = 0.05
+# Relative weight of each feature kind, on top of its IDF
+FEATURE_WEIGHTS = {"category": 1.0, "tag": 1.0, "word": 0.5}
+# Features shared by more jobs than this (and by more than MAX_FEATURE_SHARE of
+# them) barely discriminate but would dominate the cost of scoring; skip them
+MAX_POSTING = 1000
+MAX_FEATURE_SHARE = 0.1
+# Cells in one NumPy batch score matrix (rows x open jobs); bounds memory to ~64MB
+BATCH_CELLS = 8_000_000
+# Past this many queued jobs a full rebuild is cheaper than an incremental refresh
+FULL_REBUILD_THRESHOLD = 1000
+REFRESH_LOCK_KEY = "jobs:related:refresh-lock"
+REFRESH_LOCK_TIMEOUT = 600
+
+STOPWORDS = frozenset(
+    "and the for with from into our your you are was were has have who all any per via "
+    "job jobs role position opening hiring needed wanted".split()
+)
+
+
+def title_words(title):
+    return {word for word in re.findall(r"[a-z0-9]+", (title or "").lower()) if len(word) > 2 and word not in STOPWORDS}
+
+
+class SimilarityCorpus:
+    """Sparse, L2-normalized feature vectors for every open job.
+
+    Features are the job's category, its tags and its title words, each
+    weighted by kind and inverse document frequency, so two jobs' similarity
+    is the cosine of their vectors. `postings` is the inverted index used to
+    score only the jobs that share at least one feature.
+    """
+
+    def __init__(self, features):
+        self.ids = sorted(features)
+        self.index = {job_id: i for i, job_id in enumerate(self.ids)}
+
+        document_frequency = defaultdict(int)
+        for job_features in features.values():
+            for feature in job_features:
+                document_frequency[feature] += 1
+        total = len(self.ids)
+        limit = max(MAX_POSTING, MAX_FEATURE_SHARE * total)
+        self.feature_ids = {
+            feature: n
+            for n, feature in enumerate(sorted(f for f, df in document_frequency.items() if df <= limit))
+        }
+
+        self.vectors = []
+        self.postings = defaultdict(list)
+        for i, job_id in enumerate(self.ids):
+            weights = {
+                self.feature_ids[feature]: FEATURE_WEIGHTS[feature[0]] * math.log(1 + total / document_frequency[feature])
+                for feature in sorted(features[job_id])
+                if feature in self.feature_ids
+            }
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            vector = {feature: w / norm for feature, w in weights.items()}
+            self.vectors.append(vector)
+            for feature, w in vector.items():
+                self.postings[feature].append((i, w))
+
+    @classmethod
+    def load(cls):
+        """Build the corpus from open jobs with two queries."""
+        features = {}
+        for job_id, title, category_id in Job.objects.filter(status="open").values_list("id", "title", "category_id").iterator():
+            job_features = {("word", word) for word in title_words(title)}
+            if category_id is not None:
+                job_features.add(("category", category_id))
+            features[job_id] = job_features
+        through = Job.tags.through.objects.filter(job__status="open")
+        for job_id, tag_id in through.values_list("job_id", "jobtag_id").iterator():
+            features[job_id].add(("tag", tag_id))
+        return cls(features)
+
+    def scores(self, i):
+        """Return `{row: score}` for every other job sharing a feature with row `i`."""
+        totals = defaultdict(float)
+        for feature, weight in self.vectors[i].items():
+            for j, other in self.postings[feature]:
+                totals[j] += weight * other
+        totals.pop(i, None)
+        return totals
+
+    def top_k(self, rows, k=RELATED_LIMIT):
+        """Return `{job_id: [(related_id, score), ...]}`, best first, for each row."""
+        if np is not None and len(rows) > 1:
+            return self._top_k_numpy(rows, k)
+        return {self.ids[i]: self._best(self.scores(i).items(), k) for i in rows}
+
+    def _best(self, scored, k):
+        # Ties go to the lower job id so both code paths agree
+        best = heapq.nsmallest(k, ((-score, self.ids[j]) for j, score in scored if score >= MIN_SCORE))
+        return [(job_id, -float(negative)) for negative, job_id in best]
+
+    def _top_k_numpy(self, rows, k):
+        postings = {
+            feature: (np.fromiter((j for j, _ in entries), dtype=np.int64, count=len(entries)),
+                      np.fromiter((w for _, w in entries), dtype=np.float64, count=len(entries)))
+            for feature, entries in self.postings.items()
+        }
+        batch_size = max(1, BATCH_CELLS // max(1, len(self.ids)))
+        result = {}
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            scores = np.zeros((len(batch), len(self.ids)))
+            for b, i in enumerate(batch):
+                for feature, weight in self.vectors[i].items():
+                    others, other_weights = postings[feature]
+                    scores[b, others] += weight * other_weights
+                scores[b, i] = 0.0
+            # Everything tied with the k-th best survives the cut, then _best() orders it
+            kth = min(k, len(self.ids)) - 1
+            thresholds = -np.partition(-scores, kth, axis=1)[:, kth] if kth >= 0 else np.zeros(len(batch))
+            for b, i in enumerate(batch):
+                candidates = np.nonzero(scores[b] >= max(thresholds[b], MIN_SCORE))[0]
+                result[self.ids[i]] = self._best(((j, scores[b, j]) for j in candidates.tolist()), k)
+        return result
+
+
+def _write(neighbours, stale_job_ids):
+    """Replace the stored neighbours of `stale_job_ids` with `neighbours`."""
+    with transaction.atomic():
+        RelatedJob.objects.filter(job_id__in=stale_job_ids).delete()
+        RelatedJob.objects.bulk_create(
+            (
+                RelatedJob(job_id=job_id, related_id=related_id, rank=rank, score=score)
+                for job_id, related in neighbours.items()
+                for rank, (related_id, score) in enumerate(related)
+            ),
+            batch_size=1000,
+        )
+
+
+def rebuild():
+    """Recompute the neighbours of every open job. Returns the number of jobs indexed."""
+    corpus = SimilarityCorpus.load()
+    neighbours = corpus.top_k(list(range(len(corpus.ids))))
+    with transaction.atomic():
+        RelatedJob.objects.all().delete()
+        _write(neighbours, [])
+    return len(neighbours)
+
+
+def refresh(job_ids):
+    """Bring the index up to date after the jobs in `job_ids` changed.
+
+    Recomputed: the changed jobs themselves, the jobs that currently list
+    one of them, and the jobs they now score high enough to enter. Changed
+    jobs that are no longer open just lose their rows. Returns the number of
+    jobs recomputed.
+    """
+    job_ids = set(job_ids)
+    corpus = SimilarityCorpus.load()
+    affected = job_ids | set(RelatedJob.objects.filter(related_id__in=job_ids).values_list("job_id", flat=True))
+
+    # Best score each other job now has against a changed one
+    entering = {}
+    for job_id in job_ids & set(corpus.index):
+        for j, score in corpus.scores(corpus.index[job_id]).items():
+            if score >= MIN_SCORE:
+                other = corpus.ids[j]
+                entering[other] = max(score, entering.get(other, 0.0))
+    current = RelatedJob.objects.filter(job_id__in=entering).values("job_id").annotate(size=Count("pk"), low=Min("score"))
+    floors = {row["job_id"]: row["low"] if row["size"] >= RELATED_LIMIT else 0.0 for row in current}
+    affected.update(other for other, score in entering.items() if score >= floors.get(other, 0.0))
+
+    rows = [corpus.index[job_id] for job_id in sorted(affected) if job_id in corpus.index]
+    _write(corpus.top_k(rows), affected)
+    return len(rows)
+
+
+def queue_refresh(job_ids):
+    """Queue `job_ids` for the next `refresh_pending()`, inside the caller's transaction."""
+    token, now = uuid.uuid4(), timezone.now()
+    RelatedJobRefresh.objects.bulk_create(
+        [RelatedJobRefresh(job_id=job_id, token=token, queued_at=now) for job_id in job_ids],
+        update_conflicts=True,
+        unique_fields=["job_id"],
+        update_fields=["token", "queued_at"],
+        batch_size=1000,
+    )
+
+
+def refresh_pending():
+    """Refresh every queued job with a single corpus load, then dequeue them.
+
+    Run by jobs.tasks.refresh_pending_related_jobs, debounced. Only one runs
+    at a time. Returns the number of jobs recomputed, or None when another
+    refresh holds the lock.
+    """
+    if not cache.add(REFRESH_LOCK_KEY, 1, timeout=REFRESH_LOCK_TIMEOUT):
+        return None
+    try:
+        queued = dict(RelatedJobRefresh.objects.values_list("job_id", "token"))
+        if not queued:
+            return 0
+        if len(queued) > FULL_REBUILD_THRESHOLD:
+            count = rebuild()
+        else:
+            count = refresh(queued)
+        # Jobs re-queued since they were read carry a new token and stay queued
+        RelatedJobRefresh.objects.filter(job_id__in=queued, token__in=set(queued.values())).delete()
+        return count
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
+
+
+def related_jobs(job_id):
+    """Return the stored neighbours of `job_id` that are publicly listed, best first.
+
+    One query over the (job_id, rank) index, joined to the neighbour rows
+    (plus one to prefetch their tags); the filter mirrors JobQuerySet.public().
+    """
+    entries = (
+        RelatedJob.objects.filter(job_id=job_id, related__status="open")
+        .filter(Q(related__deadline__isnull=True) | Q(related__deadline__gt=timezone.now()))
+        .select_related("related")
+        .prefetch_related("related__tags")
+        .order_by("rank")
+    )
+    return [(entry.related, entry.score) for entry in entries]
@@ -1,28 +1,72 @@
 from rest_framework import serializers
-from .models import Job, CompanyProfile, JobCategory, JobTag
+from .models import Job, CompanyProfile, JobCategory, JobTag, Location, SavedSearch
 from django.contrib.auth import get_user_model
+from common.serializers import (
+    BatchPrimaryKeyRelatedField,
+    CachedPrimaryKeyRelatedField,
+    Expansion,
+    SparseFieldsetSerializerMixin,
+)
+from .alerts import MAX_SAVED_SEARCHES, clean_query
+from .reference import get_categories, get_tags
 
 User = get_user_model()
 
-class JobSerializer(serializers.ModelSerializer):
+class LocationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Location
+        fields = "__all__"
+        ref_name = "LocationSerializer_Custom"
+
+class CompanyProfileSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CompanyProfile
+        fields = "__all__"
+        ref_name = "CompanyProfileSerializer_Custom"
+        # Derived from `location`
+        read_only_fields = ["place"]
+
+class JobCategorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobCategory
+        fields = "__all__"
+        ref_name = "JobCategorySerializer_Custom"
+
+class JobTagSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobTag
+        fields = "__all__"
+        ref_name = "JobTagSerializer_Custom"
+
+class JobSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     # Make relations optional and friendly to Swagger's default "0" inputs
-    company = serializers.PrimaryKeyRelatedField(
+    company = BatchPrimaryKeyRelatedField(
         queryset=CompanyProfile.objects.all(), required=False, allow_null=True
     )
-    category = serializers.PrimaryKeyRelatedField(
-        queryset=JobCategory.objects.all(), required=False, allow_null=True
+    # Resolved from the in-process reference cache rather than one query per pk
+    category = CachedPrimaryKeyRelatedField(
+        lookup=get_categories, queryset=JobCategory.objects.all(), required=False, allow_null=True
     )
-    tags = serializers.PrimaryKeyRelatedField(
-        queryset=JobTag.objects.all(), many=True, required=False
+    tags = CachedPrimaryKeyRelatedField(
+        lookup=get_tags, queryset=JobTag.objects.all(), many=True, required=False
     )
 
     class Meta:
         model = Job
-        fields = "__all__"
+        # search_vector is an internal, trigger-maintained index column
+        exclude = ["search_vector"]
         ref_name = "JobSerializer_Custom"  # avoid Swagger conflicts
+        expandable_fields = {
+            "company": Expansion(CompanyProfileSerializer),
+            "category": Expansion(JobCategorySerializer),
+            "tags": Expansion(JobTagSerializer),
+            "place": Expansion(LocationSerializer),
+        }
         extra_kwargs = {
             # Server sets posted_by in the view; do not require it in requests
             "posted_by": {"read_only": True},
+            # Derived from `location`
+            "place": {"read_only": True},
             # Make relations optional (reflected in schema/Swagger)
             "company": {"required": False, "allow_null": True},
             "category": {"required": False, "allow_null": True},
@@ -52,34 +96,132 @@ class JobSerializer(serializers.ModelSerializer):
 
         return super().to_internal_value(data)
 
-    def validate(self, attrs):
-        # Coerce string/integer 0 to None for optional FKs commonly sent by UIs
-        for fk in ("company", "category"):
-            if fk in self.initial_data and self.initial_data.get(fk) in ("0", 0):
-                attrs[fk] = None
-        # Coerce tags [0] or "0" to empty list
-        if "tags" in self.initial_data:
-            raw_tags = self.initial_data.get("tags")
-            if raw_tags in ("0", 0):
-                attrs["tags"] = []
-            elif isinstance(raw_tags, list) and any(t in ("0", 0) for t in raw_tags):
-                attrs["tags"] = [t for t in raw_tags if t not in ("0", 0)]
-        return super().validate(attrs)
+class JobListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """Compact, read-only job representation used by list endpoints.
+
+    Ships a short `description_snippet` instead of the full `description` and
+    `requirements` TextFields. The view annotates the snippet in SQL and
+    defers the long columns, so they are never read from the database.
+    `distance_km` is set for `?near=` searches and null otherwise.
+    """
+
+    SNIPPET_LENGTH = 200
+
+    description_snippet = serializers.SerializerMethodField()
+    distance_km = serializers.SerializerMethodField()
 
-class CompanyProfileSerializer(serializers.ModelSerializer):
     class Meta:
-        model = CompanyProfile
-        fields = "__all__"
-        ref_name = "CompanyProfileSerializer_Custom"
+        model = Job
+        fields = [
+            "id",
+            "title",
+            "company_name",
+            "company",
+            "location",
+            "place",
+            "distance_km",
+            "employment_type",
+            "salary_min",
+            "salary_max",
+            "salary_currency",
+            "status",
+            "category",
+            "tags",
+            "description_snippet",
+            "created_at",
+            "updated_at",
+            "deadline",
+        ]
+        read_only_fields = fields
+        ref_name = "JobListSerializer_Custom"
+        expandable_fields = JobSerializer.Meta.expandable_fields
+        # Both come from SQL annotations (JobViewSet, JobFilter)
+        method_field_sources = {"description_snippet": (), "distance_km": ()}
+
+    def get_description_snippet(self, obj):
+        # The queryset fetches one character more than the limit to detect truncation
+        snippet = getattr(obj, "description_snippet", None)
+        if snippet is None:
+            snippet = obj.description[: self.SNIPPET_LENGTH + 1]
+        if len(snippet) > self.SNIPPET_LENGTH:
+            return snippet[: self.SNIPPET_LENGTH].rstrip() + "…"
+        return snippet
+
+    def get_distance_km(self, obj):
+        distance = getattr(obj, "distance_km", None)
+        return None if distance is None else round(distance, 1)
+
+
+class JobImportRowSerializer(serializers.ModelSerializer):
+    """Validates one row of a bulk import feed (see jobs.importers).
+
+    Relations are given by name rather than primary key and are resolved by
+    the importer for a whole chunk at once, so validating a row never touches
+    the database:
+    - `category`: category name or slug (created if missing)
+    - `tags`: list of tag names or slugs, or a comma-separated string (created if missing)
+    - `company`: company profile id or exact name (must exist)
+    """
+
+    category = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    tags = serializers.ListField(child=serializers.CharField(max_length=50), required=False)
+    company = serializers.CharField(max_length=255, required=False, allow_blank=True)
 
-class JobCategorySerializer(serializers.ModelSerializer):
     class Meta:
-        model = JobCategory
-        fields = "__all__"
-        ref_name = "JobCategorySerializer_Custom"
+        model = Job
+        fields = [
+            "title",
+            "description",
+            "requirements",
+            "company_name",
+            "company",
+            "location",
+            "employment_type",
+            "salary_min",
+            "salary_max",
+            "salary_currency",
+            "status",
+            "category",
+            "tags",
+            "deadline",
+        ]
+        extra_kwargs = {
+            # Filled from the company profile when omitted
+            "company_name": {"required": False},
+        }
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict) and isinstance(data.get("tags"), str):
+            data = {**data, "tags": [tag for tag in data["tags"].split(",") if tag.strip()]}
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        if not attrs.get("company_name") and not attrs.get("company"):
+            raise serializers.ValidationError({"company_name": ["Provide company_name or company."]})
+        salary_min, salary_max = attrs.get("salary_min"), attrs.get("salary_max")
+        if salary_min is not None and salary_max is not None and salary_min > salary_max:
+            raise serializers.ValidationError({"salary_max": ["Must be greater than or equal to salary_min."]})
+        return attrs
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    """A job seeker's saved job list query, alerted on as new jobs match it.
+
+    `query` takes the job list filter params (`?search=`, `location`, `tags`,
+    `category`, salary ranges, ...) as an object; lists may be given as
+    arrays or comma-separated strings.
+    """
 
-class JobTagSerializer(serializers.ModelSerializer):
     class Meta:
-        model = JobTag
-        fields = "__all__"
-        ref_name = "JobTagSerializer_Custom"
+        model = SavedSearch
+        fields = ["id", "name", "query", "is_active", "created_at", "updated_at"]
+        read_only_fields = ["created_at", "updated_at"]
+
+    def validate_query(self, value):
+        return clean_query(value)
+
+    def validate(self, attrs):
+        user = self.context["request"].user
+        if self.instance is None and user.saved_searches.count() >= MAX_SAVED_SEARCHES:
+            raise serializers.ValidationError(f"You can keep at most {MAX_SAVED_SEARCHES} saved searches.")
+        return attrs
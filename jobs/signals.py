@@ -0,0 +1,172 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from common.cache import (
+    COMPANY_DETAIL,
+    JOB_CATEGORIES,
+    JOB_DETAIL,
+    JOB_TAGS,
+    JOBS_LIST,
+    bump_generation,
+    object_namespace,
+)
+from . import autocomplete
+from .models import CompanyProfile, Job, JobCategory, JobTag, JobTombstone, RelatedJob
+from .reference import categories_cache, tags_cache
+from .tasks import schedule_alert_matching, schedule_related_refresh
+
+
+@receiver([post_save, post_delete], sender=JobCategory)
+def invalidate_categories(sender, **kwargs):
+    # Job lists inline categories via ?expand=category
+    bump_generation(JOB_CATEGORIES, JOBS_LIST)
+    categories_cache.invalidate()
+    # Entries are labelled with category/tag names; rebuild on the next lookup
+    autocomplete.autocomplete_index.invalidate()
+
+
+@receiver([post_save, post_delete], sender=JobTag)
+def invalidate_tags(sender, **kwargs):
+    bump_generation(JOB_TAGS, JOBS_LIST)
+    tags_cache.invalidate()
+    autocomplete.autocomplete_index.invalidate()
+
+
+@receiver(pre_delete, sender=JobCategory)
+def collect_category_jobs(sender, instance, **kwargs):
+    # Job.category is nulled before post_delete fires; find the jobs now
+    instance._job_namespaces = [
+        object_namespace(JOB_DETAIL, pk)
+        for pk in Job.objects.filter(category_id=instance.pk).values_list("pk", flat=True)
+    ]
+
+
+@receiver(pre_delete, sender=JobTag)
+def collect_tag_jobs(sender, instance, **kwargs):
+    # The through rows cascade without m2m_changed; find the jobs now
+    instance._job_namespaces = [
+        object_namespace(JOB_DETAIL, pk)
+        for pk in Job.tags.through.objects.filter(jobtag_id=instance.pk).values_list(
+            "job_id", flat=True
+        )
+    ]
+
+
+@receiver(post_delete, sender=JobCategory)
+@receiver(post_delete, sender=JobTag)
+def invalidate_referencing_job_details(sender, instance, **kwargs):
+    # Unexpanded details still list the deleted category/tag id
+    bump_generation(*getattr(instance, "_job_namespaces", ()))
+
+
+@receiver([post_save, post_delete], sender=Job)
+def invalidate_job_detail(sender, instance, **kwargs):
+    bump_generation(object_namespace(JOB_DETAIL, instance.pk))
+
+
+# Tombstones for delta-sync clients (/api/jobs/changes/), whatever made the
+# change: the API, the admin, a shell or a cascade from a company or user
+@receiver(pre_save, sender=Job)
+def collect_public_state(sender, instance, raw=False, **kwargs):
+    instance._was_public = (
+        not raw and instance.pk is not None and Job.objects.public().filter(pk=instance.pk).exists()
+    )
+
+
+@receiver(post_save, sender=Job)
+def tombstone_on_save(sender, instance, **kwargs):
+    if getattr(instance, "_was_public", False):
+        reason = JobTombstone.reason_for(instance.status, instance.deadline)
+        if reason is not None:
+            JobTombstone.objects.create(job_id=instance.pk, reason=reason)
+
+
+@receiver(post_delete, sender=Job)
+def tombstone_on_delete(sender, instance, **kwargs):
+    JobTombstone.objects.create(job_id=instance.pk, reason="deleted")
+
+
+@receiver([post_save, post_delete], sender=Job)
+def refresh_autocomplete(sender, **kwargs):
+    autocomplete.mark_stale()
+
+
+@receiver(m2m_changed, sender=Job.tags.through)
+def refresh_autocomplete_on_tags(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        autocomplete.mark_stale()
+
+
+@receiver(post_save, sender=Job)
+def refresh_related_on_save(sender, instance, **kwargs):
+    schedule_related_refresh([instance.pk])
+
+
+@receiver(m2m_changed, sender=Job.tags.through)
+def refresh_related_on_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        schedule_related_refresh([instance.pk])
+    elif pk_set:
+        # tag.jobs.add(...) and friends
+        schedule_related_refresh(pk_set)
+
+
+@receiver(post_save, sender=Job)
+def match_alerts_on_save(sender, instance, **kwargs):
+    # Only listed jobs are alerted on; a draft is matched once it opens
+    if instance.status == "open":
+        schedule_alert_matching([instance.pk])
+
+
+@receiver(m2m_changed, sender=Job.tags.through)
+def match_alerts_on_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    # Added tags can satisfy more searches; removals never create matches
+    if action != "post_add":
+        return
+    if not reverse:
+        schedule_alert_matching([instance.pk])
+    elif pk_set:
+        schedule_alert_matching(pk_set)
+
+
+@receiver(pre_delete, sender=Job)
+def collect_related_referrers(sender, instance, **kwargs):
+    # Their RelatedJob rows pointing here cascade away; refill those lists
+    instance._related_referrers = list(
+        RelatedJob.objects.filter(related_id=instance.pk).values_list("job_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Job)
+def refresh_related_on_delete(sender, instance, **kwargs):
+    schedule_related_refresh(getattr(instance, "_related_referrers", ()))
+
+
+def _company_job_namespaces(company):
+    job_ids = Job.objects.filter(company_id=company.pk).values_list("pk", flat=True)
+    return [object_namespace(JOB_DETAIL, pk) for pk in job_ids]
+
+
+@receiver(post_save, sender=CompanyProfile)
+def invalidate_company_detail(sender, instance, **kwargs):
+    # Job details embed the company (?expand=company), so they go too
+    bump_generation(
+        object_namespace(COMPANY_DETAIL, instance.pk), JOBS_LIST, *_company_job_namespaces(instance)
+    )
+
+
+@receiver(pre_delete, sender=CompanyProfile)
+def collect_company_jobs(sender, instance, **kwargs):
+    # The jobs' company FK is nulled before post_delete fires; find them now
+    instance._job_namespaces = _company_job_namespaces(instance)
+
+
+@receiver(post_delete, sender=CompanyProfile)
+def invalidate_deleted_company(sender, instance, **kwargs):
+    bump_generation(
+        object_namespace(COMPANY_DETAIL, instance.pk),
+        JOBS_LIST,
+        *getattr(instance, "_job_namespaces", ()),
+    )
@@ -0,0 +1,123 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from . import alerts, recommend, related, trending
+
+logger = logging.getLogger(__name__)
+
+# Job writes within this many seconds share one related-jobs refresh
+RELATED_REFRESH_DELAY = 30
+# Set while a refresh is queued; expires in case the task is lost
+RELATED_REFRESH_SCHEDULED_KEY = "jobs:related:refresh-scheduled"
+RELATED_REFRESH_SCHEDULED_TIMEOUT = 10 * RELATED_REFRESH_DELAY
+# Set while an on-demand job matrix build is queued
+JOB_MATRIX_BUILD_SCHEDULED_KEY = "jobs:recommend:build-scheduled"
+
+
+# Fire-and-forget: nothing reads the results, and tracking them makes the
+# sender subscribe to the result backend, which blocks when it is down
+@shared_task(ignore_result=True)
+def refresh_pending_related_jobs():
+    # Writes from here on arm the next run
+    cache.delete(RELATED_REFRESH_SCHEDULED_KEY)
+    count = related.refresh_pending()
+    if count is None and not getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False):
+        # Another refresh is running; try again after it
+        _arm_related_refresh()
+    return count
+
+
+@shared_task(ignore_result=True)
+def rebuild_related_jobs():
+    return related.rebuild()
+
+
+@shared_task(ignore_result=True)
+def rebuild_job_matrix():
+    try:
+        return recommend.build_job_matrix()
+    finally:
+        cache.delete(JOB_MATRIX_BUILD_SCHEDULED_KEY)
+
+
+@shared_task
+def flush_job_views():
+    return trending.flush()
+
+
+@shared_task(ignore_result=True)
+def match_saved_searches(job_ids):
+    return alerts.match_jobs(job_ids)
+
+
+@shared_task(ignore_result=True)
+def send_job_alert_digests():
+    return alerts.send_digests()
+
+
+def _dispatch(task, *args, **options):
+    # Without a broker (eager mode) run inline, as applications.views does
+    if getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False):
+        task(*args)
+    else:
+        task.apply_async(args, **options)
+
+
+def _arm_related_refresh():
+    if not cache.add(RELATED_REFRESH_SCHEDULED_KEY, 1, timeout=RELATED_REFRESH_SCHEDULED_TIMEOUT):
+        return
+    # Never let a broker outage fail the write that triggered the refresh
+    try:
+        _dispatch(refresh_pending_related_jobs, countdown=RELATED_REFRESH_DELAY)
+    except Exception:
+        # Leave it to the next write to try again
+        cache.delete(RELATED_REFRESH_SCHEDULED_KEY)
+        logger.exception("Failed to enqueue related-jobs refresh")
+
+
+def schedule_related_refresh(job_ids):
+    """Queue `job_ids` for a related-jobs refresh.
+
+    The jobs are recorded in the current transaction; once it commits, a
+    refresh is scheduled RELATED_REFRESH_DELAY seconds out unless one already
+    is, so every write until it runs shares its single corpus load.
+    """
+    job_ids = sorted(set(job_ids))
+    if not job_ids:
+        return
+    related.queue_refresh(job_ids)
+    transaction.on_commit(_arm_related_refresh)
+
+
+def schedule_alert_matching(job_ids):
+    """Queue saved-search matching for `job_ids` once the current transaction commits."""
+    job_ids = sorted(set(job_ids))
+    if not job_ids:
+        return
+
+    def enqueue():
+        try:
+            _dispatch(match_saved_searches, job_ids)
+        except Exception:
+            logger.exception("Failed to enqueue saved-search matching for %d jobs", len(job_ids))
+
+    transaction.on_commit(enqueue)
+
+
+def schedule_job_matrix_build():
+    """Queue a job matrix build unless one is queued already.
+
+    For when no matrix is cached (first deploy, cache flush); the beat
+    schedule keeps it fresh otherwise.
+    """
+    if not cache.add(JOB_MATRIX_BUILD_SCHEDULED_KEY, 1, timeout=recommend.MATRIX_MAX_AGE):
+        return
+    try:
+        _dispatch(rebuild_job_matrix)
+    except Exception:
+        cache.delete(JOB_MATRIX_BUILD_SCHEDULED_KEY)
+        logger.exception("Failed to enqueue job matrix build")
@@ -1,7 +1,33 @@
-from django.test import TestCase
+import io
+import json
+import tempfile
+import time
+from unittest import mock, skipUnless
+from datetime import timedelta
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
-from jobs.models import JobCategory, JobTag, CompanyProfile, Job
+from jobs.models import (
+    JobCategory, JobTag, CompanyProfile, Job, JobStats, JobTombstone, RelatedJob, SavedSearch, SavedSearchMatch,
+)
+from jobs import alerts as alerts_module
+from jobs import trending as trending_module
+from jobs import recommend as recommend_module
+from jobs.autocomplete import autocomplete_index
+from jobs.reference import categories_cache, tags_cache
+from jobs import related as related_module
+from jobs.exporters import iter_job_rows
+from jobs.serializers import JobSerializer
+from common.serializers import BatchPrimaryKeyRelatedField
+from rest_framework.exceptions import ValidationError
 from rest_framework import status
 User = get_user_model()
 
@@ -34,6 +60,7 @@ class JobModelsTest(TestCase):
 
 class JobAPITest(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = User.objects.create_user(email="user@example.com", password="pass1234")
         self.client.force_authenticate(user=self.user)
@@ -60,6 +87,7 @@ class JobAPITest(TestCase):
 
 class JobPaginationTest(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = User.objects.create_user(email="user@example.com", password="pass1234")
         self.client.force_authenticate(user=self.user)
@@ -79,4 +107,1263 @@ class JobPaginationTest(TestCase):
         response = self.client.get("/api/jobs/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn("results", response.data)   # standard DRF pagination format
-        self.assertLessEqual(len(response.data["results"]), 10)  # page size
\ No newline at end of file
+        self.assertLessEqual(len(response.data["results"]), 10)  # page size
+
+class JobSearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="user@example.com", password="pass1234")
+        self.client.force_authenticate(user=self.user)
+        Job.objects.create(title="Python Developer", description="desc", requirements="req",
+                           company_name="Acme", employment_type="full-time", posted_by=self.user)
+        Job.objects.create(title="Python Intern", description="desc", requirements="req",
+                           company_name="Acme", employment_type="internship", posted_by=self.user)
+        Job.objects.create(title="Designer", description="desc", requirements="Figma",
+                           company_name="Pixel", posted_by=self.user)
+
+    def test_prefix_tsquery_strips_operators(self):
+        from jobs.filters import build_prefix_tsquery
+        self.assertEqual(build_prefix_tsquery(["dev", "py&!thon"]), "dev:* & py:* & thon:*")
+        self.assertEqual(build_prefix_tsquery(["&|!"]), "")
+
+    def test_search_composes_with_filters(self):
+        response = self.client.get("/api/jobs/", {"search": "python", "employment_type": "internship"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        titles = [job["title"] for job in response.data["results"]]
+        self.assertEqual(titles, ["Python Intern"])
+        self.assertNotIn("search_vector", response.data["results"][0])
+
+
+class JobCursorPaginationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="user@example.com", password="pass1234")
+        for i in range(7):
+            Job.objects.create(
+                title=f"Job {i}",
+                description="desc",
+                requirements="req",
+                company_name="CompanyX",
+                posted_by=self.user,
+                salary_min=None if i % 3 == 0 else 1000 * (i % 2 + 1),
+            )
+
+    def walk(self, params):
+        titles, url, data = [], "/api/jobs/", dict(params, cursor="", page_size=3)
+        while url:
+            response = self.client.get(url, data)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            titles.extend(job["title"] for job in response.data["results"])
+            url, data = response.data["next"], None
+        return titles
+
+    def test_cursor_walk_matches_page_order(self):
+        expected = [job.title for job in Job.objects.order_by("-created_at", "id")]
+        self.assertEqual(self.walk({}), expected)
+
+    def test_cursor_walk_nullable_ordering(self):
+        titles = self.walk({"ordering": "-salary_min"})
+        self.assertEqual(sorted(titles), sorted(job.title for job in Job.objects.all()))
+        self.assertEqual(len(titles), len(set(titles)))
+        nulls = set(Job.objects.filter(salary_min__isnull=True).values_list("title", flat=True))
+        self.assertEqual(set(titles[-len(nulls):]), nulls)
+
+    def test_page_number_remains_default(self):
+        response = self.client.get("/api/jobs/")
+        self.assertEqual(response.data["count"], 7)
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get("/api/jobs/", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_ranked_results_need_an_explicit_ordering(self):
+        for job in Job.objects.all():
+            job.location = "Lagos"
+            job.save()
+        response = self.client.get("/api/jobs/", {"near": "6.45,3.39", "cursor": ""})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("cursor", response.data)
+        self.assertEqual(len(self.walk({"near": "6.45,3.39", "ordering": "-created_at"})), 7)
+
+
+class JobListCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="user@example.com", password="pass1234")
+        self.client.force_authenticate(user=self.user)
+        Job.objects.create(title="Job1", description="desc", requirements="req", company_name="C1", posted_by=self.user)
+
+    def test_hit_serves_rendered_bytes_without_queries(self):
+        first = self.client.get("/api/jobs/")
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/jobs/")
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertEqual(second["Content-Type"], first["Content-Type"])
+
+    def test_write_invalidates_list(self):
+        self.client.get("/api/jobs/")
+        self.client.post("/api/jobs/", {"title": "Job2", "description": "d", "requirements": "r",
+                                        "company_name": "C2"}, format="json")
+        response = self.client.get("/api/jobs/")
+        self.assertEqual(response.json()["count"], 2)
+
+    def test_equivalent_queries_share_cache_entry(self):
+        self.client.get("/api/jobs/", {"location": "x", "ordering": "-created_at"})
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/jobs/?utm_source=mail&ordering=-created_at&page=1&location=x")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cached_pages_link_from_the_canonical_query(self):
+        Job.objects.create(title="Job2", description="desc", requirements="req", company_name="C1", posted_by=self.user)
+        first = self.client.get("/api/jobs/?utm_source=mail&page_size=1&ordering=-created_at")
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/jobs/?ordering=-created_at&page_size=1", HTTP_HOST="testserver")
+        expected = "http://testserver/api/jobs/?ordering=-created_at&page=2&page_size=1"
+        self.assertEqual((first.json()["next"], second.json()["next"]), (expected, expected))
+        cursor = self.client.get("/api/jobs/?cursor=&utm_source=mail&page_size=1").json()["next"]
+        self.assertNotIn("utm_source", cursor)
+        # Absolute links carry the host, so other hosts get their own entry
+        other = self.client.get("/api/jobs/?ordering=-created_at&page_size=1", HTTP_HOST="api.example.com")
+        self.assertTrue(other.json()["next"].startswith("http://api.example.com/"))
+
+
+class JobFacetsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="user@example.com", password="pass1234")
+        self.engineering = JobCategory.objects.create(name="Engineering")
+        self.python = JobTag.objects.create(name="Python")
+        self.django = JobTag.objects.create(name="Django")
+        specs = [
+            ("full-time", self.engineering, 30000, [self.python, self.django]),
+            ("full-time", self.engineering, 120000, [self.python]),
+            ("contract", None, None, [self.django]),
+        ]
+        for employment_type, category, salary, tags in specs:
+            job = Job.objects.create(title="Dev", description="d", requirements="r", company_name="C",
+                                     posted_by=self.user, employment_type=employment_type,
+                                     category=category, salary_min=salary)
+            job.tags.set(tags)
+
+    def counts(self, facet):
+        return {row["value"]: row["count"] for row in facet}
+
+    def test_facet_counts(self):
+        response = self.client.get("/api/jobs/facets/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data
+        self.assertEqual(data["total"], 3)
+        self.assertEqual(self.counts(data["employment_type"])["full-time"], 2)
+        self.assertEqual(self.counts(data["category"]), {self.engineering.id: 2})
+        self.assertEqual(self.counts(data["tags"]), {self.python.id: 2, self.django.id: 2})
+        self.assertEqual(self.counts(data["salary"])["25000-50000"], 1)
+        self.assertEqual(self.counts(data["status"])["open"], 3)
+
+    def test_facet_ignores_its_own_filter(self):
+        data = self.client.get("/api/jobs/facets/", {"employment_type": "contract"}).data
+        self.assertEqual(data["total"], 1)
+        self.assertEqual(self.counts(data["employment_type"])["full-time"], 2)
+        self.assertEqual(self.counts(data["tags"]), {self.django.id: 1})
+
+
+class JobPublicListingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="user@example.com", password="pass1234")
+        self.other = User.objects.create_user(email="other@example.com", password="pass1234")
+        past = timezone.now() - timedelta(days=1)
+        future = timezone.now() + timedelta(days=1)
+        for title, status_value, deadline, poster in [
+            ("Open", "open", None, self.user),
+            ("Open future", "open", future, self.user),
+            ("Expired", "open", past, self.user),
+            ("Closed", "closed", None, self.user),
+            ("Draft", "draft", None, self.user),
+            ("Other draft", "draft", None, self.other),
+        ]:
+            Job.objects.create(title=title, description="d", requirements="r", company_name="C",
+                               posted_by=poster, status=status_value, deadline=deadline)
+
+    def titles(self, params=None):
+        response = self.client.get("/api/jobs/", params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(job["title"] for job in response.data["results"])
+
+    def test_default_listing_is_open_and_not_expired(self):
+        self.assertEqual(self.titles(), ["Open", "Open future"])
+
+    def test_drafts_are_only_listed_for_their_poster(self):
+        self.assertEqual(self.titles({"status": "draft"}), [])
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.titles({"status": "draft"}), ["Draft"])
+
+
+class JobListSerializerTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="user@example.com", password="pass1234")
+        self.job = Job.objects.create(title="Writer", description="x" * 500, requirements="long",
+                                      company_name="C", posted_by=self.user)
+
+    def test_list_ships_snippet_and_detail_ships_full_text(self):
+        item = self.client.get("/api/jobs/").data["results"][0]
+        self.assertNotIn("description", item)
+        self.assertNotIn("requirements", item)
+        self.assertEqual(item["description_snippet"], "x" * 200 + "…")
+
+        detail = self.client.get(f"/api/jobs/{self.job.id}/").data
+        self.assertEqual(detail["description"], "x" * 500)
+        self.assertEqual(detail["requirements"], "long")
+
+
+class JobSparseFieldsetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="user@example.com", password="pass1234")
+        self.category = JobCategory.objects.create(name="Design")
+        self.tags = [JobTag.objects.create(name=f"tag{i}") for i in range(3)]
+
+    def create_jobs(self, count):
+        for i in range(count):
+            job = Job.objects.create(title=f"Job {i}", description="d", requirements="r",
+                                     company_name="C", posted_by=self.user, category=self.category)
+            job.tags.set(self.tags)
+
+    def test_fields_limits_keys(self):
+        self.create_jobs(1)
+        item = self.client.get("/api/jobs/", {"fields": "id,title"}).data["results"][0]
+        self.assertEqual(set(item), {"id", "title"})
+
+    def test_unknown_field_or_expansion_is_rejected(self):
+        self.create_jobs(1)
+        self.assertEqual(self.client.get("/api/jobs/", {"fields": "nope"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/jobs/", {"expand": "posted_by"}).status_code, 400)
+
+    def test_expand_inlines_relations_in_constant_queries(self):
+        self.create_jobs(2)
+        params = {"expand": "category,tags", "fields": "id"}
+        with self.assertNumQueries(3):
+            item = self.client.get("/api/jobs/", params).data["results"][0]
+        self.assertEqual(item["category"]["name"], "Design")
+        self.assertEqual(len(item["tags"]), 3)
+
+        cache.clear()
+        self.create_jobs(5)
+        with self.assertNumQueries(3):
+            self.client.get("/api/jobs/", params)
+
+
+class JobBulkImportTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="partner@example.com", password="pass1234")
+        self.client.force_authenticate(user=self.user)
+        self.category = JobCategory.objects.create(name="Engineering")
+        self.tag = JobTag.objects.create(name="Python")
+
+    def upload(self, content, name="feed.csv"):
+        feed = SimpleUploadedFile(name, content.encode("utf-8"))
+        return self.client.post("/api/jobs/import/", {"file": feed}, format="multipart")
+
+    def csv_feed(self, rows):
+        header = "title,description,requirements,company_name,category,tags,salary_min\n"
+        return header + "".join(
+            f'Job {i},Desc,Reqs,Acme,engineering,"python,Go",{1000 + i}\n' for i in range(rows)
+        )
+
+    def test_csv_import_resolves_relations_and_reports_bad_rows(self):
+        feed = self.csv_feed(2) + "Broken,Desc,Reqs,,,,\n" + "Bad salary,Desc,Reqs,Acme,,,abc\n"
+        response = self.upload(feed)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual([e["line"] for e in response.data["errors"]], [4, 5])
+        self.assertIn("company_name", response.data["errors"][0]["errors"])
+        self.assertIn("salary_min", response.data["errors"][1]["errors"])
+
+        job = Job.objects.get(title="Job 0")
+        self.assertEqual(job.category, self.category)
+        self.assertEqual(sorted(job.tags.values_list("slug", flat=True)), ["go", "python"])
+        self.assertEqual(JobTag.objects.count(), 2)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.upload(self.csv_feed(2))  # creates the "Go" tag
+        with CaptureQueriesContext(connection) as small:
+            self.upload(self.csv_feed(3))
+        with CaptureQueriesContext(connection) as large:
+            self.upload(self.csv_feed(30))
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(Job.objects.count(), 35)
+
+    def test_management_command_imports_ndjson(self):
+        lines = [
+            {"title": "Remote dev", "description": "d", "requirements": "r", "company_name": "Acme", "tags": ["Rust"]},
+            "not json",
+        ]
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson", delete=False) as feed:
+            feed.write("\n".join(json.dumps(l) if isinstance(l, dict) else l for l in lines))
+        call_command("import_jobs", feed.name, user="partner@example.com", stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertEqual(list(Job.objects.get(title="Remote dev").tags.values_list("name", flat=True)), ["Rust"])
+
+
+class JobExportTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="user@example.com", password="pass1234")
+        tag = JobTag.objects.create(name="Python")
+        for i, employment_type in enumerate(["full-time", "contract", "contract"]):
+            job = Job.objects.create(title=f"Job {i}", description="d", requirements="r", company_name="Acme",
+                                     employment_type=employment_type, posted_by=self.user)
+            job.tags.add(tag)
+
+    def export(self, params):
+        response = self.client.get("/api/jobs/export/", params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode("utf-8")
+
+    def test_csv_export_applies_filters(self):
+        lines = self.export({"employment_type": "contract"}).splitlines()
+        self.assertTrue(lines[0].startswith("id,title,"))
+        self.assertEqual(len(lines), 3)
+        self.assertIn("python", lines[1])
+
+    def test_ndjson_export_with_small_chunks(self):
+        rows = list(iter_job_rows(Job.objects.order_by("id"), chunk_size=2))
+        self.assertEqual([row["tags"] for row in rows], [["python"]] * 3)
+        lines = self.export({"file_format": "ndjson"}).splitlines()
+        self.assertEqual(json.loads(lines[0])["tags"], ["python"])
+        self.assertEqual(len(lines), 3)
+
+    def test_unknown_format_is_rejected(self):
+        self.assertEqual(self.client.get("/api/jobs/export/", {"file_format": "xml"}).status_code, 400)
+
+
+@mock.patch("jobs.changes.SETTLE_SECONDS", 0)
+class JobChangesTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="user@example.com", password="pass1234")
+        self.client.force_authenticate(user=self.user)
+        self.jobs = [self.create_job(f"Job {i}") for i in range(3)]
+
+    def create_job(self, title):
+        return Job.objects.create(title=title, description="d", requirements="r",
+                                  company_name="C", posted_by=self.user)
+
+    def sync(self, since=None, **params):
+        if since:
+            params["since"] = since
+        response = self.client.get("/api/jobs/changes/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_snapshot_pages_then_incremental_changes(self):
+        first = self.sync(page_size=2)
+        self.assertTrue(first["has_more"])
+        second = self.sync(first["watermark"], page_size=2)
+        self.assertFalse(second["has_more"])
+        self.assertEqual(
+            [e["id"] for e in first["events"] + second["events"]], [job.id for job in self.jobs]
+        )
+        self.assertEqual(self.sync(second["watermark"])["events"], [])
+
+        closed, deleted = self.jobs[0], self.jobs[1]
+        self.client.patch(f"/api/jobs/{closed.id}/", {"status": "closed"}, format="json")
+        self.client.delete(f"/api/jobs/{deleted.id}/")
+        added = self.create_job("New")
+
+        events = self.sync(second["watermark"])["events"]
+        self.assertEqual(
+            [(e["op"], e["id"]) for e in events],
+            [("delete", closed.id), ("delete", deleted.id), ("upsert", added.id)],
+        )
+        self.assertEqual(events[0]["reason"], "closed")
+        self.assertEqual(events[2]["job"]["title"], "New")
+
+    def test_removals_outside_the_api_are_tombstoned(self):
+        watermark = self.sync()["watermark"]
+        in_a_minute = timezone.now() + timedelta(minutes=1)
+        expiring, edited, updated, cascaded = self.jobs + [self.create_job("Cascaded")]
+        expiring.deadline = in_a_minute
+        expiring.save()
+        cascaded.posted_by = User.objects.create_user(email="other@example.com", password="pass1234")
+        cascaded.save()
+        watermark = self.sync(watermark)["watermark"]
+
+        # Admin or shell save, queryset update, and a cascade from the poster
+        edited.status = "draft"
+        edited.save()
+        Job.objects.filter(pk=updated.pk).update(deadline=timezone.now() - timedelta(days=1))
+        cascaded.posted_by.delete()
+        with mock.patch("jobs.changes.timezone.now", return_value=in_a_minute + timedelta(seconds=10)):
+            data = self.sync(watermark)
+            events = data["events"]
+            self.assertEqual(self.sync(data["watermark"])["events"], [])
+        self.assertEqual(
+            sorted((e["op"], e["id"], e["reason"]) for e in events),
+            sorted([
+                ("delete", edited.id, "draft"),
+                ("delete", updated.id, "expired"),
+                ("delete", expiring.id, "expired"),
+                ("delete", cascaded.id, "deleted"),
+            ]),
+        )
+        # A passed deadline is reported when it passes, with no write
+        self.assertEqual(events[-1]["id"], expiring.id)
+        self.assertFalse(JobTombstone.objects.filter(job_id=expiring.id).exists())
+
+    def test_invalid_watermark_is_rejected(self):
+        response = self.client.get("/api/jobs/changes/", {"since": "garbage"})
+        self.assertEqual(response.status_code, 400)
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="user@example.com", password="pass1234")
+        self.job = Job.objects.create(title="Dev", description="d", requirements="r",
+                                      company_name="C", posted_by=self.user)
+
+    def test_list_revalidates_until_a_job_is_written(self):
+        etag = self.client.get("/api/jobs/")["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/jobs/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertNotEqual(self.client.get("/api/jobs/?page_size=5")["ETag"], etag)
+
+        self.client.force_authenticate(user=self.user)
+        self.client.post("/api/jobs/", {"title": "New", "description": "d", "requirements": "r",
+                                        "company_name": "C"}, format="json")
+        self.assertEqual(self.client.get("/api/jobs/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_uses_updated_at(self):
+        response = self.client.get(f"/api/jobs/{self.job.id}/")
+        with self.assertNumQueries(1):
+            not_modified = self.client.get(f"/api/jobs/{self.job.id}/",
+                                           HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(
+            self.client.get(f"/api/jobs/{self.job.id}/", HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304
+        )
+        Job.objects.filter(pk=self.job.pk).update(updated_at=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(
+            self.client.get(f"/api/jobs/{self.job.id}/", HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 200
+        )
+        self.assertEqual(self.client.get("/api/jobs/999999/", HTTP_IF_NONE_MATCH="*").status_code, 404)
+
+    def test_malformed_pk_is_not_found(self):
+        for path in ("/api/jobs/abc/", "/api/jobs/companies/abc/"):
+            self.assertEqual(self.client.get(path).status_code, 404, path)
+            self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH="*").status_code, 404, path)
+
+    def test_expanded_detail_has_no_last_modified(self):
+        company = CompanyProfile.objects.create(user=self.user, name="Acme")
+        self.job.company = company
+        self.job.save()
+        url = f"/api/jobs/{self.job.id}/?expand=company"
+        first = self.client.get(url)
+        self.assertNotIn("Last-Modified", first)
+        since = self.client.get(f"/api/jobs/{self.job.id}/")["Last-Modified"]
+
+        company.name = "Acme Ltd"
+        company.save()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["company"]["name"], "Acme Ltd")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 200)
+
+    def test_tag_list_is_versioned_by_writes(self):
+        etag = self.client.get("/api/jobs/tags/")["ETag"]
+        self.assertEqual(self.client.get("/api/jobs/tags/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        JobTag.objects.create(name="Go")
+        self.assertEqual(self.client.get("/api/jobs/tags/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class DetailCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="user@example.com", password="pass1234")
+        self.company = CompanyProfile.objects.create(user=self.user, name="Acme")
+        self.job = Job.objects.create(title="Dev", description="d", requirements="r",
+                                      company_name="Acme", company=self.company, posted_by=self.user)
+        self.url = f"/api/jobs/{self.job.id}/"
+
+    def test_hit_skips_the_database_except_for_validators(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["title"], "Dev")
+
+    def test_update_invalidates_only_that_job(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.get(self.url)
+        self.client.patch(self.url, {"title": "Senior Dev"}, format="json")
+        self.assertEqual(json.loads(self.client.get(self.url).content)["title"], "Senior Dev")
+
+    def test_company_edit_invalidates_embedding_jobs(self):
+        params = {"expand": "company"}
+        self.assertEqual(json.loads(self.client.get(self.url, params).content)["company"]["name"], "Acme")
+        self.company.name = "Acme Ltd"
+        self.company.save()
+        self.assertEqual(json.loads(self.client.get(self.url, params).content)["company"]["name"], "Acme Ltd")
+        self.assertEqual(
+            json.loads(self.client.get(f"/api/jobs/companies/{self.company.id}/").content)["name"], "Acme Ltd"
+        )
+
+    def test_category_and_tag_renames_reach_expanded_details(self):
+        category, tag = JobCategory.objects.create(name="Dev"), JobTag.objects.create(name="Python")
+        self.job.category = category
+        self.job.save()
+        self.job.tags.add(tag)
+        params = {"expand": "category,tags"}
+        first = self.client.get(self.url, params)
+        self.assertEqual(json.loads(first.content)["category"]["name"], "Dev")
+        self.assertNotIn("Last-Modified", first)
+        plain_etag = self.client.get(self.url)["ETag"]
+
+        category.name = "Engineering"
+        category.save()
+        tag.name = "Python 3"
+        tag.save()
+        self.assertEqual(self.client.get(self.url, params, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 200)
+        body = json.loads(self.client.get(self.url, params).content)
+        self.assertEqual((body["category"]["name"], body["tags"][0]["name"]), ("Engineering", "Python 3"))
+        # Unexpanded responses only carry ids and keep validating
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=plain_etag).status_code, 304)
+
+    def test_category_and_tag_deletes_reach_plain_details(self):
+        category = JobCategory.objects.create(name="Dev")
+        kept, dropped = JobTag.objects.create(name="Python"), JobTag.objects.create(name="Go")
+        self.job.category = category
+        self.job.save()
+        self.job.tags.add(kept, dropped)
+        first = self.client.get(self.url)
+        self.assertEqual(json.loads(first.content)["category"], category.id)
+
+        dropped.delete()
+        category.delete()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 200)
+        body = json.loads(self.client.get(self.url).content)
+        self.assertEqual((body["category"], body["tags"]), (None, [kept.id]))
+
+
+class ReferenceCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="user@example.com", password="pass1234")
+        self.category = JobCategory.objects.create(name="Design")
+        self.tags = [JobTag.objects.create(name=f"tag{i}") for i in range(3)]
+
+    def test_listing_is_served_from_memory_and_tracks_writes(self):
+        self.client.get("/api/jobs/tags/")
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/jobs/tags/")
+        self.assertEqual(response.data["count"], 3)
+        JobTag.objects.create(name="new")
+        self.assertEqual(self.client.get("/api/jobs/tags/").data["count"], 4)
+        self.assertEqual(self.client.get(f"/api/jobs/categories/{self.category.id}/").data["name"], "Design")
+        self.assertEqual(self.client.get("/api/jobs/categories/999/").status_code, 404)
+
+    def test_serializer_resolves_pks_without_queries(self):
+        data = {"title": "Dev", "description": "d", "requirements": "r", "company_name": "C",
+                "category": self.category.id, "tags": [tag.id for tag in self.tags]}
+        JobSerializer(data=data).is_valid()  # warm the reference cache
+        with self.assertNumQueries(0):
+            serializer = JobSerializer(data=data)
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data["tags"], self.tags)
+
+        bad = JobSerializer(data={**data, "tags": [999]})
+        self.assertFalse(bad.is_valid())
+        self.assertIn("tags", bad.errors)
+
+
+# Foreign keys are only checked on commit, so these writes must really commit
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class StaleReferenceTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="poster@example.com", password="pass1234")
+        self.client.force_authenticate(self.user)
+        self.data = {"title": "Dev", "description": "d", "requirements": "r", "company_name": "C"}
+
+    def test_reference_deleted_in_another_process_is_a_400(self):
+        category, tag = JobCategory.objects.create(name="Dev"), JobTag.objects.create(name="Go")
+        # What a process whose reference cache has not caught up still sees
+        stale_categories = mock.patch.object(categories_cache, "get_or_load", return_value={category.pk: category})
+        stale_tags = mock.patch.object(tags_cache, "get_or_load", return_value={tag.pk: tag})
+        writes = ({"category": category.pk}, {"tags": [tag.pk]})
+        JobCategory.objects.all().delete()
+        JobTag.objects.all().delete()
+        with stale_categories, stale_tags:
+            for extra in writes:
+                response = self.client.post("/api/jobs/", {**self.data, **extra}, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, extra)
+        self.assertFalse(Job.objects.exists())
+
+
+class BatchPrimaryKeyFieldTest(TestCase):
+    def setUp(self):
+        self.tags = [JobTag.objects.create(name=f"tag{i}") for i in range(15)]
+
+    def field(self):
+        return BatchPrimaryKeyRelatedField(queryset=JobTag.objects.all(), many=True)
+
+    def test_resolves_all_pks_with_one_query(self):
+        pks = [str(tag.pk) for tag in self.tags]
+        with self.assertNumQueries(1):
+            self.assertEqual(self.field().to_internal_value(pks + pks[:1]), self.tags)
+
+    def test_reports_all_missing_pks_at_once(self):
+        with self.assertRaises(ValidationError) as raised:
+            self.field().to_internal_value([self.tags[0].pk, 998, 999])
+        self.assertEqual(str(raised.exception.detail[0]), "Invalid pks 998, 999 - objects do not exist.")
+        with self.assertRaises(ValidationError):
+            self.field().to_internal_value(["abc"])
+
+
+class JobTextFilterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="user@example.com", password="pass1234")
+        for title, location, company in [
+            ("Backend", "Lagos, Nigeria", "Acme Corp"),
+            ("Frontend", "Nairobi", "Pixel Labs"),
+            ("Data", "Lagos Island", "Acme Analytics"),
+            ("Ops", "Accra", "100% Remote Ltd"),
+        ]:
+            Job.objects.create(title=title, description="d", requirements="r", location=location,
+                               company_name=company, posted_by=self.user)
+
+    def titles(self, params):
+        response = self.client.get("/api/jobs/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [job["title"] for job in response.data["results"]]
+
+    def test_substring_filters(self):
+        self.assertEqual(sorted(self.titles({"location": "lagos"})), ["Backend", "Data"])
+        self.assertEqual(sorted(self.titles({"company_name": "acme", "location": "island"})), ["Data"])
+        # LIKE wildcards in the value are matched literally
+        self.assertEqual(self.titles({"company_name": "100%"}), ["Ops"])
+        self.assertEqual(self.titles({"company_name": "%"}), ["Ops"])
+
+    def test_fuzzy_matches_typos_best_first(self):
+        self.assertEqual(self.titles({"location": "lgos"}), [])
+        self.assertEqual(sorted(self.titles({"location": "lgos", "fuzzy": "1"})), ["Backend", "Data"])
+        self.assertEqual(self.titles({"company_name": "Pixl Labs", "fuzzy": "true"}), ["Frontend"])
+
+    def test_word_similarity(self):
+        from jobs.filters import word_similarity
+        self.assertEqual(word_similarity("lagos", "Lagos, Nigeria"), 1.0)
+        self.assertEqual(word_similarity("lgos", "Lagos"), 0.6)
+        self.assertEqual(word_similarity("lgos", None), 0.0)
+
+
+class LocationSearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="user@example.com", password="pass1234")
+        for title, location in [
+            ("Lagos job", "Lagos, NG"),
+            ("Ikeja job", "ikeja lagos nigeria"),
+            ("Ibadan job", "Ibadan"),
+            ("Nairobi job", "Nairobi, Kenya"),
+            ("Remote job", "Remote"),
+        ]:
+            Job.objects.create(title=title, description="d", requirements="r", location=location,
+                               company_name="Acme", posted_by=self.user)
+
+    def test_gazetteer_normalizes_spellings(self):
+        from jobs.geo import get_gazetteer
+        gazetteer = get_gazetteer()
+        for text in ("Lagos", "Lagos, NG", "lagos nigeria", "LAGOS  (Nigeria)"):
+            self.assertEqual(gazetteer.match(text).city, "Lagos")
+        self.assertEqual(gazetteer.match("Birmingham, AL, USA").country_code, "US")
+        self.assertEqual(gazetteer.match("Birmingham").country_code, "GB")
+        self.assertIsNone(gazetteer.match("Remote"))
+
+    def test_jobs_share_one_location_per_place(self):
+        self.assertEqual(Job.objects.filter(place__city="Lagos").count(), 2)
+        self.assertIsNone(Job.objects.get(title="Remote job").place)
+
+    def test_location_edits_outside_the_api_move_the_place(self):
+        job = Job.objects.get(title="Lagos job")
+        job.location = "Nairobi"
+        job.save()
+        self.assertEqual(Job.objects.get(pk=job.pk).place.city, "Nairobi")
+        job.location = "Ibadan"
+        job.save(update_fields=["location"])
+        self.assertEqual(Job.objects.get(pk=job.pk).place.city, "Ibadan")
+        job = Job.objects.only("title").get(pk=job.pk)
+        job.title = "Renamed"
+        job.save()
+        self.assertEqual(Job.objects.get(pk=job.pk).place.city, "Ibadan")
+        job.location = ""
+        job.save()
+        self.assertIsNone(Job.objects.get(pk=job.pk).place)
+
+        company = CompanyProfile.objects.create(user=self.user, name="Acme", location="Lagos")
+        company = CompanyProfile.objects.get(pk=company.pk)
+        company.location = "Nairobi, Kenya"
+        company.save()
+        self.assertEqual(CompanyProfile.objects.get(pk=company.pk).place.city, "Nairobi")
+
+    def test_near_filters_by_radius_nearest_first(self):
+        response = self.client.get("/api/jobs/", {"near": "6.60,3.35", "radius_km": 200})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        # Ibadan is ~120 km away; Nairobi and the unplaced job are excluded
+        self.assertEqual([job["title"] for job in results][-1], "Ibadan job")
+        self.assertEqual(len(results), 3)
+        self.assertAlmostEqual(results[-1]["distance_km"], 120, delta=15)
+
+        response = self.client.get("/api/jobs/", {"near": "6.60,3.35", "radius_km": 50})
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(self.client.get("/api/jobs/", {"near": "91,0"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bounding_box_contains_circle(self):
+        from jobs.geo import bounding_box, haversine_km
+        min_lat, max_lat, min_lon, max_lon = bounding_box(60.0, 10.0, 300)
+        grid = [(55 + i * 0.05, 10 + j * 0.1) for i in range(200) for j in range(-150, 151)]
+        inside = [(lat, lon) for lat, lon in grid if haversine_km(60.0, 10.0, lat, lon) <= 300]
+        self.assertTrue(inside)
+        for lat, lon in inside:
+            self.assertTrue(min_lat <= lat <= max_lat and min_lon <= lon <= max_lon, (lat, lon))
+        self.assertEqual(bounding_box(0.0, 179.9, 100)[2:], (-180.0, 180.0))
+
+    def test_backfill_links_existing_rows(self):
+        Job.objects.update(place=None)
+        out = io.StringIO()
+        call_command("backfill_locations", stdout=out)
+        self.assertIn("jobs: 4 linked", out.getvalue())
+        self.assertIn("Remote", out.getvalue())
+        self.assertEqual(Job.objects.filter(place__isnull=False).count(), 4)
+
+
+class JobTagFilterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="user@example.com", password="pass1234")
+        self.tags = [JobTag.objects.create(name=f"tag{i}") for i in range(6)]
+        self.design = JobCategory.objects.create(name="Design")
+        self.dev = JobCategory.objects.create(name="Dev")
+        self.ops = JobCategory.objects.create(name="Ops")
+        for title, tag_indexes, category in [
+            ("a", (0, 1, 2), self.dev),
+            ("b", (0, 1), self.design),
+            ("c", (0,), self.ops),
+            ("d", (), self.dev),
+        ]:
+            job = Job.objects.create(title=title, description="d", requirements="r", company_name="Acme",
+                                     posted_by=self.user, category=category)
+            job.tags.set([self.tags[i] for i in tag_indexes])
+
+    def titles(self, query):
+        response = self.client.get(f"/api/jobs/?{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        titles = sorted(job["title"] for job in response.data["results"])
+        self.assertEqual(response.data["count"], len(titles))
+        return titles
+
+    def test_any_mode_does_not_duplicate_jobs(self):
+        t = [tag.pk for tag in self.tags]
+        self.assertEqual(self.titles(f"tags={t[0]},{t[1]},{t[2]}"), ["a", "b", "c"])
+        self.assertEqual(self.titles(f"tags={t[1]}&tags={t[2]}&tags_mode=any"), ["a", "b"])
+        self.assertEqual(self.titles(f"tags={t[5]}"), [])
+
+    def test_all_mode_requires_every_tag(self):
+        t = [tag.pk for tag in self.tags]
+        self.assertEqual(self.titles(f"tags={t[0]},{t[1]}&tags_mode=all"), ["a", "b"])
+        self.assertEqual(self.titles(f"tags={t[0]},{t[1]},{t[2]},{t[0]}&tags_mode=all"), ["a"])
+        self.assertEqual(self.titles(f"tags={t[0]},{t[5]}&tags_mode=all"), [])
+        self.assertEqual(self.client.get("/api/jobs/?tags=1&tags_mode=some").status_code, 400)
+
+    def test_multiple_categories(self):
+        self.assertEqual(self.titles(f"category={self.dev.pk},{self.ops.pk}"), ["a", "c", "d"])
+        self.assertEqual(self.titles(f"category={self.design.pk}&tags={self.tags[0].pk}"), ["b"])
+
+    def test_tag_order_shares_cache_entry(self):
+        t = [tag.pk for tag in self.tags]
+        self.client.get(f"/api/jobs/?tags={t[0]},{t[1]}")
+        with self.assertNumQueries(0):
+            self.client.get(f"/api/jobs/?tags={t[1]},{t[0]}")
+
+    @skipUnless(connection.vendor == "sqlite", "asserts SQLite's EXPLAIN QUERY PLAN output")
+    def test_all_mode_plan_stays_index_only(self):
+        from jobs.filters import JobFilter
+        for count in (1, 3, 6):
+            ids = ",".join(str(tag.pk) for tag in self.tags[:count])
+            plan = JobFilter({"tags": ids, "tags_mode": "all"}, queryset=Job.objects.all()).qs.explain()
+            self.assertIn("COVERING INDEX jobs_job_tags_tag_job_idx", plan)
+            self.assertNotIn("SCAN jobs_job_tags\n", plan + "\n")
+
+
+# Refreshes are Celery tasks; run them inline whatever the settings module
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class RelatedJobsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="user@example.com", password="pass1234")
+        self.dev = JobCategory.objects.create(name="Dev")
+        self.design = JobCategory.objects.create(name="Design")
+        self.python, self.django, self.figma = (JobTag.objects.create(name=n) for n in ("Python", "Django", "Figma"))
+        self.backend = self.make("Python Backend Engineer", self.dev, [self.python, self.django])
+        self.api = self.make("Django API Engineer", self.dev, [self.python, self.django])
+        self.data = self.make("Python Data Analyst", self.dev, [self.python])
+        self.designer = self.make("Product Designer", self.design, [self.figma])
+
+    def make(self, title, category, tags, **kwargs):
+        job = Job.objects.create(title=title, description="d", requirements="r", company_name="Acme",
+                                 posted_by=self.user, category=category, **kwargs)
+        job.tags.set(tags)
+        return job
+
+    def related_titles(self, job):
+        response = self.client.get(f"/api/jobs/{job.pk}/related/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item["title"] for item in response.data]
+
+    def test_rebuild_ranks_by_shared_features(self):
+        from jobs import related
+        self.assertEqual(related.rebuild(), 4)
+        self.assertEqual(self.related_titles(self.backend), ["Django API Engineer", "Python Data Analyst"])
+        self.assertEqual(self.related_titles(self.designer), [])
+        # The neighbour lookup plus the tag prefetch
+        with self.assertNumQueries(2):
+            self.client.get(f"/api/jobs/{self.backend.pk}/related/")
+        self.assertEqual(self.client.get("/api/jobs/999999/related/").status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_refresh_follows_job_changes(self):
+        from jobs import related
+        related.rebuild()
+        # A new job enters the lists of the jobs it resembles
+        with self.captureOnCommitCallbacks(execute=True):
+            newcomer = self.make("Senior Python Backend Engineer", self.dev, [self.python, self.django])
+        self.assertEqual(self.related_titles(self.backend)[0], newcomer.title)
+
+        # Closing it drops it everywhere, and the lists are refilled
+        with self.captureOnCommitCallbacks(execute=True):
+            newcomer.status = "closed"
+            newcomer.save()
+        self.assertNotIn(newcomer.title, self.related_titles(self.backend))
+        self.assertEqual(self.related_titles(self.backend), ["Django API Engineer", "Python Data Analyst"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api.delete()
+        self.assertEqual(self.related_titles(self.backend), ["Python Data Analyst"])
+
+    def test_incremental_refresh_matches_rebuild(self):
+        from jobs import related
+        related.rebuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make("Django Designer", self.design, [self.django, self.figma])
+            self.data.tags.add(self.django)
+        incremental = list(RelatedJob.objects.values_list("job_id", "related_id", "rank"))
+        related.rebuild()
+        self.assertEqual(sorted(incremental), sorted(RelatedJob.objects.values_list("job_id", "related_id", "rank")))
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=False)
+    def test_writes_are_coalesced_into_one_refresh(self):
+        from jobs import related, tasks
+        related.rebuild()
+        # Queued by setUp's writes, whose transaction never commits
+        related.RelatedJobRefresh.objects.all().delete()
+        with mock.patch.object(tasks.refresh_pending_related_jobs, "apply_async") as apply_async, \
+                mock.patch.object(tasks.match_saved_searches, "apply_async"):
+            with self.captureOnCommitCallbacks(execute=True):
+                newcomer = self.make("Senior Python Backend Engineer", self.dev, [self.python])
+            with self.captureOnCommitCallbacks(execute=True):
+                self.data.tags.add(self.django)
+        apply_async.assert_called_once_with((), countdown=tasks.RELATED_REFRESH_DELAY)
+        self.assertEqual(
+            set(related.RelatedJobRefresh.objects.values_list("job_id", flat=True)), {newcomer.pk, self.data.pk}
+        )
+
+        # A job written again while the refresh runs stays queued for the next one
+        original = related.refresh
+
+        def refresh_during_write(job_ids):
+            related.queue_refresh([self.data.pk])
+            return original(job_ids)
+
+        with mock.patch.object(related.SimilarityCorpus, "load", wraps=related.SimilarityCorpus.load) as load, \
+                mock.patch.object(related, "refresh", side_effect=refresh_during_write):
+            tasks.refresh_pending_related_jobs()
+        self.assertEqual(load.call_count, 1)
+        self.assertEqual(list(related.RelatedJobRefresh.objects.values_list("job_id", flat=True)), [self.data.pk])
+        self.assertEqual(self.related_titles(self.backend)[0], newcomer.title)
+
+    @skipUnless(related_module.np is not None, "NumPy is not installed")
+    def test_numpy_and_python_paths_agree(self):
+        corpus = related_module.SimilarityCorpus.load()
+        rows = list(range(len(corpus.ids)))
+        python = {corpus.ids[i]: corpus._best(corpus.scores(i).items(), 10) for i in rows}
+        self.assertEqual(corpus.top_k(rows), python)
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class RecommendedJobsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        recommend_module.reset_job_matrix()
+        self.addCleanup(recommend_module.reset_job_matrix)
+        self.client = APIClient()
+        self.poster = User.objects.create_user(email="poster@example.com", password="pass1234")
+        self.seeker = User.objects.create_user(email="seeker@example.com", password="pass1234", location="Lagos")
+        self.client.force_authenticate(self.seeker)
+        self.python, self.figma = (JobTag.objects.create(name=n) for n in ("Python", "Figma"))
+        self.applied = self.make("Python Backend Engineer", "Django, PostgreSQL, REST APIs", [self.python])
+        self.backend = self.make("Senior Backend Engineer", "Python, Django and REST APIs", [self.python])
+        self.designer = self.make("Product Designer", "Figma and user research", [self.figma])
+        self.sales = self.make("Sales Lead", "Closing enterprise deals")
+
+    def make(self, title, requirements, tags=(), **kwargs):
+        job = Job.objects.create(title=title, description="d", requirements=requirements, company_name="Acme",
+                                 posted_by=self.poster, **kwargs)
+        job.tags.set(tags)
+        return job
+
+    def apply(self, job):
+        from applications.models import JobApplication
+        return JobApplication.objects.create(user=self.seeker, job=job)
+
+    def recommended(self, **params):
+        response = self.client.get("/api/jobs/recommended/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_ranks_by_application_history_and_excludes_applied(self):
+        self.apply(self.applied)
+        data = self.recommended()
+        self.assertTrue(data["personalized"])
+        titles = [item["title"] for item in data["results"]]
+        self.assertEqual(titles[0], "Senior Backend Engineer")
+        self.assertNotIn("Python Backend Engineer", titles)
+        self.assertNotIn("Sales Lead", titles)
+        self.assertGreater(data["results"][0]["score"], 0)
+
+    def test_location_boost(self):
+        self.apply(self.applied)
+        remote = self.make("Backend Engineer", "Python, Django and REST APIs", [self.python], location="Remote")
+        local = self.make("Backend Engineer", "Python, Django and REST APIs", [self.python], location="Lagos, Nigeria")
+        titles = [item["id"] for item in self.recommended()["results"]]
+        self.assertLess(titles.index(local.pk), titles.index(remote.pk))
+
+    def test_cold_start_falls_back_to_newest(self):
+        self.seeker.location = ""
+        self.seeker.save()
+        data = self.recommended(limit=2)
+        self.assertFalse(data["personalized"])
+        self.assertEqual([item["id"] for item in data["results"]], [self.sales.pk, self.designer.pk])
+        self.assertIsNone(data["results"][0]["score"])
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get("/api/jobs/recommended/").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_per_user_until_they_apply(self):
+        self.seeker.location = ""
+        self.seeker.save()
+        self.assertFalse(self.recommended()["personalized"])
+        self.apply(self.applied)
+        # Still the cached cold-start response
+        self.assertFalse(self.recommended()["personalized"])
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        with mock.patch("applications.views.send_application_email_task"), self.settings(MEDIA_ROOT=media.name):
+            resume = SimpleUploadedFile("cv.pdf", b"%PDF-1.4", content_type="application/pdf")
+            response = self.client.post("/api/applications/", {"job": self.backend.pk, "resume": resume})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.make("Django Engineer", "Python and Django", [self.python])
+        # New jobs reach the matrix on its next periodic rebuild
+        recommend_module.build_job_matrix()
+        recommend_module.reset_job_matrix()
+        data = self.recommended()
+        self.assertTrue(data["personalized"])
+        self.assertNotIn(self.backend.pk, [item["id"] for item in data["results"]])
+
+    def test_requests_never_build_the_matrix(self):
+        self.apply(self.applied)
+        # Distinct limits skip the per-user response cache
+        with self.settings(CELERY_TASK_ALWAYS_EAGER=False), \
+                mock.patch("jobs.tasks.rebuild_job_matrix.apply_async") as enqueue, \
+                mock.patch.object(recommend_module.JobMatrix, "load") as load:
+            self.assertFalse(self.recommended(limit=5)["personalized"])
+            self.assertFalse(self.recommended(limit=6)["personalized"])
+        load.assert_not_called()
+        # Queued once, for a worker to build
+        self.assertEqual(enqueue.call_count, 1)
+        recommend_module.build_job_matrix()
+        self.assertTrue(self.recommended(limit=7)["personalized"])
+
+    @skipUnless(recommend_module.np is not None, "NumPy is not installed")
+    def test_numpy_and_python_paths_agree(self):
+        self.apply(self.applied)
+        matrix = recommend_module.JobMatrix.load()
+        profile, applied = recommend_module.build_profile(self.seeker, matrix)
+        vectorized = matrix.score(profile, exclude=applied)
+        with mock.patch.object(recommend_module, "np", None):
+            python = recommend_module.JobMatrix.load().score(profile, exclude=applied)
+        self.assertEqual([job_id for job_id, _ in vectorized], [job_id for job_id, _ in python])
+        for (_, a), (_, b) in zip(vectorized, python):
+            self.assertAlmostEqual(a, b)
+
+
+class AutocompleteTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        autocomplete_index.reset()
+        self.addCleanup(autocomplete_index.reset)
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="poster@example.com", password="pass1234")
+        self.dev = JobCategory.objects.create(name="Software Development")
+        self.python = JobTag.objects.create(name="Python")
+        self.make("Python Developer", "Acme", tags=[self.python])
+        self.make("Python Developer", "Globex", tags=[self.python])
+        self.make("Senior Python Engineer", "Acme", category=self.dev)
+        self.make("Pastry Chef", "Pâtisserie Dupont")
+        self.make("Python Architect", "Initech", status="closed")
+
+    def make(self, title, company_name, tags=(), **kwargs):
+        job = Job.objects.create(title=title, description="d", requirements="r", company_name=company_name,
+                                 posted_by=self.user, **kwargs)
+        job.tags.set(tags)
+        return job
+
+    def suggest(self, q, **params):
+        response = self.client.get("/api/jobs/autocomplete/", {"q": q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(item["kind"], item["text"], item["jobs"]) for item in response.data]
+
+    def test_prefix_matches_ranked_by_open_jobs(self):
+        self.assertEqual(self.suggest("pyth"), [
+            ("tag", "Python", 2),
+            ("title", "Python Developer", 2),
+            ("title", "Senior Python Engineer", 1),
+        ])
+        # Any word of an entry can start the match; accents and case are ignored
+        self.assertEqual(self.suggest("patis"), [("company", "Pâtisserie Dupont", 1)])
+        self.assertEqual(self.suggest("DEVELOP"), [("title", "Python Developer", 2), ("category", "Software Development", 1)])
+        self.assertEqual(self.suggest("python eng"), [("title", "Senior Python Engineer", 1)])
+        self.assertEqual(self.suggest("pyth", limit=1), [("tag", "Python", 2)])
+        self.assertEqual(self.suggest(""), [])
+        response = self.client.get("/api/jobs/autocomplete/", {"q": "soft"})
+        self.assertEqual(response.data[0]["id"], self.dev.pk)
+
+    def test_warm_lookups_skip_the_database(self):
+        self.suggest("pyth")
+        with self.assertNumQueries(0):
+            self.suggest("pyth")
+            self.suggest("acm")
+
+    def test_job_writes_apply_incrementally(self):
+        self.suggest("pyth")
+        index = autocomplete_index.index
+        with self.captureOnCommitCallbacks(execute=True):
+            job = self.make("Python Developer", "Hooli")
+        self.assertIn(("title", "Python Developer", 3), self.suggest("pyth"))
+        self.assertIn(("company", "Hooli", 1), self.suggest("hoo"))
+
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f"/api/jobs/{job.pk}/", {"status": "closed"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.suggest("hoo"), [])
+        self.assertIn(("title", "Python Developer", 2), self.suggest("pyth"))
+        self.assertIs(autocomplete_index.index, index)
+
+    def test_tag_rename_rebuilds(self):
+        self.suggest("pyth")
+        self.python.name = "Python 3"
+        self.python.save()
+        self.assertIn(("tag", "Python 3", 2), self.suggest("pyth"))
+
+
+class JobViewCounterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        trending_module.view_buffer.drain()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="poster@example.com", password="pass1234")
+        self.hot, self.warm, self.closed = (
+            Job.objects.create(title=title, description="d", requirements="r", company_name="Acme",
+                               posted_by=self.user, status=job_status)
+            for title, job_status in (("Hot", "open"), ("Warm", "open"), ("Closed", "closed"))
+        )
+        self.now = time.time()
+
+    def view(self, job, times=1):
+        for _ in range(times):
+            self.assertEqual(self.client.get(f"/api/jobs/{job.pk}/").status_code, status.HTTP_200_OK)
+
+    def flush_at(self, now):
+        """Drain this process's buffer at `now` and flush once its epoch has closed."""
+        trending_module.view_buffer.drain(now=now)
+        grace = (trending_module.EPOCH_GRACE + 1) * trending_module.EPOCH_SECONDS
+        return trending_module.flush(now=now + grace)
+
+    def test_views_are_buffered_then_flushed_in_batches(self):
+        self.view(self.hot, 3)
+        self.view(self.warm)
+        self.client.get("/api/jobs/999999/")
+        self.assertEqual(trending_module.view_buffer.counts, {self.hot.pk: 3, self.warm.pk: 1})
+        self.assertFalse(JobStats.objects.exists())
+
+        # Job existence, then per batch: existing stats rows and one bulk insert
+        # (inside a savepoint); nothing per view or per job
+        with self.assertNumQueries(5):
+            self.assertEqual(self.flush_at(self.now), 2)
+        self.view(self.hot, 2)
+        self.flush_at(self.now + 300)
+        self.assertEqual(dict(JobStats.objects.values_list("job_id", "views")), {self.hot.pk: 5, self.warm.pk: 1})
+
+    def test_open_epochs_wait(self):
+        self.view(self.hot)
+        trending_module.view_buffer.drain(now=self.now)
+        self.assertEqual(trending_module.flush(now=self.now), 0)
+        self.assertFalse(JobStats.objects.exists())
+
+    def test_trending_decays_old_views(self):
+        self.view(self.hot, 10)
+        self.view(self.closed, 50)
+        self.flush_at(self.now)
+        response = self.client.get("/api/jobs/trending/")
+        self.assertEqual([item["title"] for item in response.data], ["Hot"])
+
+        # Two half-lives later, 4 fresh views beat 10 old ones (now worth 2.5)
+        later = self.now + 2 * trending_module.HALF_LIFE_SECONDS
+        self.view(self.warm, 4)
+        self.flush_at(later)
+        with mock.patch("jobs.trending.time.time", return_value=later + 180):
+            ranked = trending_module.trending_jobs(10)
+        self.assertEqual([(job.title, round(score, 1)) for job, score in ranked], [("Warm", 4.0), ("Hot", 2.5)])
+        response = self.client.get("/api/jobs/trending/", {"limit": 1})
+        self.assertEqual([item["title"] for item in response.data], ["Warm"])
+
+
+# Matching runs as a Celery task; run it inline whatever the settings module
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class SavedSearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.poster = User.objects.create_user(email="poster@example.com", password="pass1234")
+        self.seeker = User.objects.create_user(email="seeker@example.com", password="pass1234")
+        self.python = JobTag.objects.create(name="Python")
+        for n in range(5):
+            Job.objects.create(title=f"Clerk {n}", description="d", requirements="r", company_name="Acme",
+                               location="Lagos, Nigeria", posted_by=self.poster)
+
+    def save_search(self, user, query, name=""):
+        search = SavedSearch.objects.create(user=user, name=name, query=alerts_module.clean_query(query))
+        alerts_module.index_search(search)
+        return search
+
+    def post_job(self, title, tags=(), **fields):
+        fields.setdefault("location", "Lagos, Nigeria")
+        with self.captureOnCommitCallbacks(execute=True):
+            job = Job.objects.create(title=title, description="d", requirements="r", company_name="Initech",
+                                     posted_by=self.poster, **fields)
+            job.tags.add(*tags)
+        return job
+
+    def test_create_validates_against_job_filters(self):
+        self.client.force_authenticate(self.seeker)
+        response = self.client.post(
+            "/api/jobs/saved-searches/",
+            {"name": "Python in Lagos", "query": {"tags": [self.python.pk], "location": "Lagos", "fuzzy": ""}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["query"], {"tags": str(self.python.pk), "location": "Lagos"})
+        search = SavedSearch.objects.get(pk=response.data["id"])
+        self.assertEqual(list(search.keys.values_list("key", flat=True)), [f"tag:{self.python.pk}"])
+
+        for query in ({"status": "draft"}, {"tags": "python"}, {"near": "200,0"}, {}):
+            response = self.client.post("/api/jobs/saved-searches/", {"query": query}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+        self.client.force_authenticate(self.poster)
+        self.assertEqual(self.client.get("/api/jobs/saved-searches/").data["count"], 0)
+        self.assertEqual(self.client.get(f"/api/jobs/saved-searches/{search.pk}/").status_code, 404)
+
+    def test_indexed_under_most_selective_predicate(self):
+        self.post_job("Python Dev", tags=[self.python])
+        keys = alerts_module.search_keys
+        # One tagged job beats six in Lagos; a bare location uses its trigram
+        self.assertEqual(keys({"tags": str(self.python.pk), "location": "Lagos"}), [f"tag:{self.python.pk}"])
+        self.assertEqual(keys({"location": "Lagos"}), ["location:lag"])
+        self.assertEqual(keys({"location": "Lagos", "employment_type": "contract"}), ["employment_type:contract"])
+        self.assertEqual(keys({"search": "python", "fuzzy": "true", "location": "Lgos"}), ["*"])
+
+    def test_new_jobs_are_matched_against_candidate_searches_only(self):
+        python = self.save_search(self.seeker, {"tags": str(self.python.pk), "location": "lagos"}, "Python")
+        contract = self.save_search(self.seeker, {"employment_type": "contract"})
+        keyword = self.save_search(self.seeker, {"search": "pyth", "salary_min_gte": "1000"})
+        own = self.save_search(self.poster, {"location": "Lagos"})
+        paused = self.save_search(self.seeker, {"location": "Lagos"})
+        paused.is_active = False
+        paused.save()
+
+        # Filed under employment_type:contract, the full-time job never reaches `contract`
+        with mock.patch.object(alerts_module.SearchMatcher, "matches", autospec=True,
+                               side_effect=alerts_module.SearchMatcher.matches) as matches:
+            job = self.post_job("Python Dev", tags=[self.python], salary_min=900)
+        self.assertNotIn("contract", [call.args[0].data.get("employment_type") for call in matches.call_args_list])
+        self.assertEqual(list(SavedSearchMatch.objects.values_list("search_id", "job_id")), [(python.pk, job.pk)])
+
+        job.salary_min = 1500
+        with self.captureOnCommitCallbacks(execute=True):
+            job.save()
+        self.assertEqual(
+            sorted(SavedSearchMatch.objects.values_list("search_id", flat=True)), sorted([python.pk, keyword.pk])
+        )
+        self.assertFalse(SavedSearchMatch.objects.filter(search__in=[contract, own, paused]).exists())
+
+        self.post_job("Draft", tags=[self.python], status="draft")
+        self.assertEqual(SavedSearchMatch.objects.count(), 2)
+
+    def test_digest_sends_one_notification_per_user(self):
+        self.save_search(self.seeker, {"location": "Lagos"}, "Lagos")
+        self.save_search(self.seeker, {"tags": str(self.python.pk)}, "Python")
+        first = self.post_job("Python Dev", tags=[self.python])
+        self.post_job("Data Analyst")
+        gone = self.post_job("Filled Role")
+        Job.objects.filter(pk=gone.pk).update(status="closed")
+        self.assertEqual(SavedSearchMatch.objects.count(), 4)
+
+        self.assertEqual(alerts_module.send_digests(), 1)
+        notification = self.seeker.notifications.get()
+        self.assertIn("2 new jobs match your saved searches", notification.message)
+        self.assertEqual(notification.message.count("Python Dev"), 1)
+        self.assertNotIn("Filled Role", notification.message)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["seeker@example.com"])
+        self.assertFalse(SavedSearchMatch.objects.filter(notified_at__isnull=True).exists())
+
+        # Delivered matches are not re-queued when the job is edited
+        with self.captureOnCommitCallbacks(execute=True):
+            first.save()
+        self.assertEqual(alerts_module.send_digests(), 0)
+        self.assertEqual(len(mail.outbox), 1)
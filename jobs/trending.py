@@ -0,0 +1,197 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, PositiveBigIntegerField, Value, When
+from django.db.models.functions import Substr
+from django.utils import timezone
+
+from common.cache import JOBS_TRENDING, bump_generation
+
+from .models import Job, JobStats
+
+logger = logging.getLogger(__name__)
+
+# A process hands its buffered views to the shared cache this often, or
+# sooner once this many distinct jobs are waiting
+DRAIN_SECONDS = 10
+DRAIN_MAX_JOBS = 1000
+# Drained batches are grouped into epochs; an epoch is flushed once it is
+# EPOCH_GRACE epochs old, so late drains into it are never missed
+EPOCH_SECONDS = 60
+EPOCH_GRACE = 2
+# How far back a flush with no marker (first run, or evicted) looks, in epochs
+FIRST_FLUSH_EPOCHS = 60
+BATCH_TIMEOUT = 24 * 3600
+# Jobs per UPDATE when writing JobStats
+WRITE_BATCH_SIZE = 250
+# Trending score: views with a half-life, so a burst fades over a day or so
+HALF_LIFE_SECONDS = 6 * 3600
+LEADERBOARD_SIZE = 500
+MIN_SCORE = 0.01
+
+LEADERBOARD_KEY = "jobs:trending:scores"
+FLUSHED_EPOCH_KEY = "jobs:views:flushed"
+FLUSH_LOCK_KEY = "jobs:views:flush-lock"
+FLUSH_LOCK_TIMEOUT = 300
+
+
+def _slots_key(epoch):
+    return f"jobs:views:e{epoch}:slots"
+
+
+def _batch_key(epoch, slot):
+    return f"jobs:views:e{epoch}:{slot}"
+
+
+def decay(score, seconds):
+    return score * 0.5 ** (seconds / HALF_LIFE_SECONDS)
+
+
+class ViewBuffer:
+    """Per-process view counts, handed to the shared cache in batches.
+
+    Counting a view is a dict increment under a lock. Every DRAIN_SECONDS
+    (checked on the next view) the counts are written to the cache as one
+    batch in the current epoch: one INCR to claim a slot and one SET, no
+    matter how many views or jobs. `flush()` later sums the batches.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = Counter()
+        self.drained_at = time.monotonic()
+
+    def add(self, job_id):
+        with self._lock:
+            self.counts[job_id] += 1
+            due = len(self.counts) >= DRAIN_MAX_JOBS or time.monotonic() - self.drained_at >= DRAIN_SECONDS
+        if due:
+            self.drain()
+            # Without a broker there is no beat either; flush closed epochs from here
+            if getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False):
+                flush()
+
+    def drain(self, now=None):
+        with self._lock:
+            counts, self.counts = self.counts, Counter()
+            self.drained_at = time.monotonic()
+        if not counts:
+            return
+        epoch = int((time.time() if now is None else now) // EPOCH_SECONDS)
+        # Views are analytics: a cache outage loses them rather than failing the request
+        try:
+            slots = _slots_key(epoch)
+            if cache.add(slots, 1, timeout=BATCH_TIMEOUT):
+                slot = 1
+            else:
+                slot = cache.incr(slots)
+            cache.set(_batch_key(epoch, slot), dict(counts), timeout=BATCH_TIMEOUT)
+        except Exception:
+            logger.exception("Failed to buffer views for %d jobs", len(counts))
+
+
+view_buffer = ViewBuffer()
+# Hand over what this worker still holds when it shuts down cleanly
+atexit.register(view_buffer.drain)
+
+
+def record_view(job_id):
+    view_buffer.add(job_id)
+
+
+def flush(now=None):
+    """Move buffered views of closed epochs into JobStats and the leaderboard.
+
+    Run periodically (jobs.tasks.flush_job_views). Only one flush runs at a
+    time. Returns the number of jobs written.
+    """
+    now = time.time() if now is None else now
+    if not cache.add(FLUSH_LOCK_KEY, 1, timeout=FLUSH_LOCK_TIMEOUT):
+        return 0
+    try:
+        closed = int(now // EPOCH_SECONDS) - EPOCH_GRACE
+        last = cache.get(FLUSHED_EPOCH_KEY)
+        if last is None:
+            last = closed - FIRST_FLUSH_EPOCHS
+        if closed <= last:
+            return 0
+
+        totals, keys = Counter(), []
+        for epoch in range(last + 1, closed + 1):
+            slots = cache.get(_slots_key(epoch)) or 0
+            epoch_keys = [_batch_key(epoch, slot) for slot in range(1, slots + 1)]
+            for batch in cache.get_many(epoch_keys).values():
+                totals.update(batch)
+            keys.extend(epoch_keys)
+            keys.append(_slots_key(epoch))
+
+        written = write_stats(totals)
+        update_leaderboard(totals, (closed + 1) * EPOCH_SECONDS)
+        # Marked after the write: a crash in between recounts rather than loses
+        cache.set(FLUSHED_EPOCH_KEY, closed, timeout=None)
+        cache.delete_many(keys)
+        if totals:
+            bump_generation(JOBS_TRENDING)
+        return written
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+
+
+def write_stats(totals):
+    """Add `{job_id: views}` to JobStats, a fixed number of queries per WRITE_BATCH_SIZE jobs."""
+    job_ids = sorted(Job.objects.filter(pk__in=list(totals)).order_by().values_list("pk", flat=True))
+    now = timezone.now()
+    for start in range(0, len(job_ids), WRITE_BATCH_SIZE):
+        batch = job_ids[start:start + WRITE_BATCH_SIZE]
+        with transaction.atomic():
+            existing = set(JobStats.objects.filter(job_id__in=batch).values_list("job_id", flat=True))
+            if existing:
+                # One UPDATE for the whole batch instead of one per job
+                increments = Case(
+                    *(When(job_id=job_id, then=Value(totals[job_id])) for job_id in existing),
+                    output_field=PositiveBigIntegerField(),
+                )
+                JobStats.objects.filter(job_id__in=existing).update(views=F("views") + increments, updated_at=now)
+            JobStats.objects.bulk_create(
+                JobStats(job_id=job_id, views=totals[job_id]) for job_id in batch if job_id not in existing
+            )
+    return len(job_ids)
+
+
+def update_leaderboard(totals, as_of):
+    """Decay the cached leaderboard to `as_of` and add `totals` to it."""
+    board = cache.get(LEADERBOARD_KEY) or {"as_of": as_of, "scores": {}}
+    elapsed = max(0, as_of - board["as_of"])
+    scores = Counter({job_id: decay(score, elapsed) for job_id, score in board["scores"].items()})
+    scores.update(totals)
+    kept = {job_id: score for job_id, score in scores.most_common(LEADERBOARD_SIZE) if score >= MIN_SCORE}
+    cache.set(LEADERBOARD_KEY, {"as_of": max(as_of, board["as_of"]), "scores": kept}, timeout=None)
+
+
+def trending_jobs(limit, now=None):
+    """Return `[(job, score), ...]` for the top `limit` public jobs, score decayed to `now`.
+
+    One query for the jobs (plus one to prefetch their tags); the ranking
+    itself comes from the cache.
+    """
+    from .serializers import JobListSerializer
+
+    board = cache.get(LEADERBOARD_KEY)
+    if not board or not board["scores"]:
+        return []
+    elapsed = max(0, (time.time() if now is None else now) - board["as_of"])
+    ranked = sorted(board["scores"].items(), key=lambda item: (-item[1], item[0]))
+    jobs = (
+        Job.objects.public()
+        .defer("description", "requirements", "search_vector")
+        .annotate(description_snippet=Substr("description", 1, JobListSerializer.SNIPPET_LENGTH + 1))
+        .prefetch_related("tags")
+        .in_bulk([job_id for job_id, _ in ranked])
+    )
+    return [(jobs[job_id], decay(score, elapsed)) for job_id, score in ranked if job_id in jobs][:limit]
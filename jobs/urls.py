@@ -1,10 +1,12 @@
 from rest_framework.routers import DefaultRouter
-from .views import JobViewSet, CompanyProfileViewSet, JobCategoryViewSet, JobTagViewSet
+from .views import JobViewSet, CompanyProfileViewSet, JobCategoryViewSet, JobTagViewSet, SavedSearchViewSet
 
 router = DefaultRouter()
-router.register(r"", JobViewSet, basename="job")
 router.register(r"companies", CompanyProfileViewSet, basename="company")
 router.register(r"categories", JobCategoryViewSet, basename="category")
 router.register(r"tags", JobTagViewSet, basename="tag")
+router.register(r"saved-searches", SavedSearchViewSet, basename="saved-search")
+# Registered last: its `<pk>/` route would otherwise shadow the prefixes above
+router.register(r"", JobViewSet, basename="job")
 
 urlpatterns = router.urls
@@ -1,39 +1,150 @@
-from rest_framework import viewsets, permissions, generics, filters
+import io
+
+from rest_framework import viewsets, permissions, generics, filters, status
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
-from .models import Job, CompanyProfile, JobCategory, JobTag
+from rest_framework.filters import OrderingFilter
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.parsers import FormParser, MultiPartParser
+from django_filters import utils as filter_utils
+from django.db.models.functions import Substr
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from rest_framework.pagination import _positive_int
+from rest_framework import serializers
+from .models import Job, CompanyProfile, JobCategory, JobTag, JobTombstone, SavedSearch
 from .serializers import (
     JobSerializer,
+    JobListSerializer,
     CompanyProfileSerializer,
     JobCategorySerializer,
     JobTagSerializer,
+    SavedSearchSerializer,
 )
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from django.core.cache import cache
-from django.utils.encoding import iri_to_uri
 from common.permissions import IsOwnerOrReadOnly
-from .filters import JobFilter
+from common.pagination import PageOrCursorPagination
+from common.serializers import save_checking_references
+from common.cache import (
+    COMPANY_DETAIL,
+    JOB_CATEGORIES,
+    JOB_DETAIL,
+    JOB_TAGS,
+    JOBS_LIST,
+    JOBS_RECOMMENDED,
+    JOBS_TRENDING,
+    bump_generation,
+    get_or_compute,
+    object_namespace,
+    user_namespace,
+    versioned_key,
+)
+from common.mixins import (
+    CachedDetailMixin,
+    CachedListMixin,
+    ConditionalGetMixin,
+    ReferenceDataMixin,
+    SparseFieldsetMixin,
+)
+from .filters import JobFilter, JobSearchFilter
+from .facets import compute_facets
+from .importers import FORMATS, JobImporter, detect_format, read_rows
+from .exporters import CONTENT_TYPES, stream_export
+from .changes import Watermark, collect_changes
+from .alerts import index_search
+from .autocomplete import autocomplete_index
+from .recommend import recommended_jobs
+from .trending import record_view, trending_jobs
+from .related import related_jobs
+from .reference import get_categories, get_tags
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 
 # Jobs
-class JobViewSet(viewsets.ModelViewSet):
+class JobViewSet(
+    ConditionalGetMixin, CachedListMixin, CachedDetailMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     queryset = Job.objects.all().select_related("category").prefetch_related("tags")
     serializer_class = JobSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, JobSearchFilter, OrderingFilter]
     filterset_class = JobFilter
+    # Used by JobSearchFilter's icontains fallback on non-Postgres databases
     search_fields = ["title", "description", "requirements", "company_name"]
     ordering_fields = ["created_at", "salary_min"]
+    pagination_class = PageOrCursorPagination
+    list_cache_namespace = JOBS_LIST
+    list_cache_timeout = 30
+    list_cache_query_params = ("fields", "expand")
+    list_cache_unordered_params = ("fields", "expand", "tags", "category")
+    sparse_fieldset_actions = ("list", "retrieve", "changes")
+    # The public listing also changes as deadlines pass
+    conditional_etag_ttl = list_cache_timeout
+    # Invalidated per job by perform_update/perform_destroy and jobs.signals
+    detail_cache_namespace = JOB_DETAIL
+    detail_cache_timeout = 300
+    detail_cache_query_params = ("fields", "expand")
+    # Bumped by jobs.signals on category/tag writes; see CachedDetailMixin
+    detail_cache_expansions = {"category": JOB_CATEGORIES, "tags": JOB_TAGS}
+    changes_page_size = 100
+    changes_max_page_size = 500
+    autocomplete_page_size = 10
+    autocomplete_max_page_size = 20
+    trending_page_size = 20
+    trending_max_page_size = 50
+    trending_cache_timeout = 60
+    recommended_page_size = 20
+    recommended_max_page_size = 50
+    recommended_cache_timeout = 60
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return JobListSerializer
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, "swagger_fake_view", False) or self.action not in ("list", "facets", "export"):
+            return queryset
+        if self.action == "list":
+            # Column pruning: list pages never read the long text columns
+            queryset = (
+                queryset.select_related(None)
+                .defer("description", "requirements", "search_vector")
+                .annotate(
+                    description_snippet=Substr("description", 1, JobListSerializer.SNIPPET_LENGTH + 1)
+                )
+            )
+        status_param = self.request.query_params.get("status")
+        if not status_param:
+            # Default public listing: open jobs whose deadline hasn't passed
+            return queryset.public()
+        user = self.request.user
+        if status_param != "open" and not (user.is_staff or user.is_superuser):
+            # Drafts and closed postings are only listed for their poster
+            queryset = queryset.filter(posted_by_id=user.pk)
+        return queryset
+
+    def get_list_cache_namespace(self, request):
+        # Non-public listings depend on the requesting user; don't share them
+        if request.query_params.get("status", "open") not in ("", "open"):
+            return None
+        return super().get_list_cache_namespace(request)
 
     @swagger_auto_schema(
         operation_description="List jobs with rich filtering, search, and ordering.",
         manual_parameters=[
             openapi.Parameter("employment_type", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Employment type filter"),
-            openapi.Parameter("location", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Filter by location (icontains)"),
-            openapi.Parameter("category", openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Category id"),
-            openapi.Parameter("tags", openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Tag id (repeatable)"),
+            openapi.Parameter("location", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Filter by location (case-insensitive substring)"),
+            openapi.Parameter("company_name", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Filter by company name (case-insensitive substring)"),
+            openapi.Parameter("fuzzy", openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN, description="Match location/company_name by trigram similarity (typo-tolerant), best matches first"),
+            openapi.Parameter("near", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="lat,lon; only jobs whose location lies within radius_km, nearest first"),
+            openapi.Parameter("radius_km", openapi.IN_QUERY, type=openapi.TYPE_NUMBER, description="Radius for `near` in km (default 50, max 1000)"),
+            openapi.Parameter("category", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Category ids, comma-separated or repeated; matches any"),
+            openapi.Parameter("tags", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Tag ids, comma-separated or repeated"),
+            openapi.Parameter("tags_mode", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=["any", "all"], description="any (default): jobs with at least one of the tags; all: jobs with every tag"),
             openapi.Parameter("salary_min_gte", openapi.IN_QUERY, type=openapi.TYPE_NUMBER, description="Minimum salary greater-or-equal"),
             openapi.Parameter("salary_min_lte", openapi.IN_QUERY, type=openapi.TYPE_NUMBER, description="Minimum salary less-or-equal"),
             openapi.Parameter("salary_max_gte", openapi.IN_QUERY, type=openapi.TYPE_NUMBER, description="Maximum salary greater-or-equal"),
@@ -41,87 +152,348 @@ class JobViewSet(viewsets.ModelViewSet):
             openapi.Parameter("created_at_after", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Created at >= ISO datetime"),
             openapi.Parameter("created_at_before", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Created at <= ISO datetime"),
             openapi.Parameter("has_deadline", openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN, description="Whether job has a deadline"),
-            openapi.Parameter("search", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Search in title/description/requirements/company_name"),
+            openapi.Parameter("status", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="open/closed/draft; defaults to open jobs before their deadline. Closed and draft jobs are limited to your own postings"),
+            openapi.Parameter("search", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Full-text search (prefix-matched, relevance-ranked) over title/company_name/requirements/description"),
             openapi.Parameter("ordering", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Order by created_at or salary_min"),
+            openapi.Parameter("fields", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Comma-separated fields to return, e.g. id,title,company_name"),
+            openapi.Parameter("expand", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Comma-separated relations to inline: company, category, tags"),
+            openapi.Parameter("cursor", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Opt into keyset pagination; send empty for the first page, then follow `next`. Ranked results (search, fuzzy, near) need an explicit `ordering` or get a 400"),
         ],
-        responses={200: JobSerializer(many=True)},
+        responses={200: JobListSerializer(many=True)},
     )
     def list(self, request, *args, **kwargs):
-        """Cache list responses based on path and query params for a short TTL."""
-        # Build a cache key from the full path (includes querystring)
-        key = f"jobs:list:{iri_to_uri(request.get_full_path())}"
-        cached = cache.get(key)
-        if cached is not None:
-            return cached
-
-        response = super().list(request, *args, **kwargs)
-        # Cache for 30 seconds by default
+        """List jobs; rendered pages are cached for 30 seconds by CachedListMixin."""
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Counts per employment type, category, tag, status and salary band for the jobs "
+            "matching the same filter/search params as the list. Each facet ignores its own "
+            "filter so alternative options keep their counts."
+        ),
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def facets(self, request):
+        compute = lambda: compute_facets(request.query_params, self.get_facet_queryset)
+        namespace = self.get_list_cache_namespace(request)
+        if namespace is None:
+            return Response(compute())
+        key = versioned_key(namespace, self.get_list_cache_suffix(request))
+        return Response(get_or_compute(key, compute, timeout=self.list_cache_timeout))
+
+    def get_facet_queryset(self, excluded_params=()):
+        """Apply JobFilter and search with `excluded_params` removed from the request."""
+        data = self.request.query_params.copy()
+        for param in excluded_params:
+            data.pop(param, None)
+        filterset = self.filterset_class(data, queryset=self.get_queryset(), request=self.request)
+        if not filterset.is_valid():
+            raise filter_utils.translate_validation(filterset.errors)
+        queryset = JobSearchFilter().filter_queryset(self.request, filterset.qs, self)
+        # Collapse to a semi-join so M2M filters can never double-count a job
+        return Job.objects.filter(pk__in=queryset.values("pk"))
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Delta sync. Returns, in time order, listed jobs created or updated (`upsert`) and "
+            "jobs deleted, closed, unpublished or past their deadline (`delete`) after the `since` "
+            "watermark. Omit `since` for a full snapshot; keep requesting with the returned "
+            "`watermark` while `has_more` is true, then store it for the next sync."
+        ),
+        manual_parameters=[
+            openapi.Parameter("since", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Opaque watermark from a previous response"),
+            openapi.Parameter("page_size", openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Events per response (max 500)"),
+            openapi.Parameter("fields", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Comma-separated job fields to include in upserts"),
+        ],
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def changes(self, request):
+        since = request.query_params.get("since")
+        watermark = Watermark.decode(since) if since else None
         try:
-            cache.set(key, response, timeout=30)
-        except Exception:
-            # Silently ignore cache errors
-            pass
+            limit = _positive_int(
+                request.query_params["page_size"], strict=True, cutoff=self.changes_max_page_size
+            )
+        except (KeyError, ValueError):
+            limit = self.changes_page_size
+
+        events, next_watermark, has_more = collect_changes(watermark, limit, self.get_queryset())
+        jobs = [event for event in events if isinstance(event, Job)]
+        job_data = dict(zip((job.pk for job in jobs), self.get_serializer(jobs, many=True).data))
+        timestamp = serializers.DateTimeField()
+        results = []
+        for event in events:
+            if isinstance(event, JobTombstone):
+                results.append({
+                    "op": "delete",
+                    "id": event.job_id,
+                    "at": timestamp.to_representation(event.removed_at),
+                    "reason": event.reason,
+                })
+            else:
+                results.append({
+                    "op": "upsert",
+                    "id": event.pk,
+                    "at": timestamp.to_representation(event.updated_at),
+                    "job": job_data[event.pk],
+                })
+        return Response({"events": results, "watermark": next_watermark.encode(), "has_more": has_more})
 
+    @swagger_auto_schema(
+        operation_description=(
+            "Stream every job matching the list's filter/search/ordering params as CSV or "
+            "NDJSON, without pagination. Columns round-trip through the import endpoint."
+        ),
+        manual_parameters=[
+            openapi.Parameter("file_format", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=["csv", "ndjson"], description="csv (default) or ndjson"),
+        ],
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def export(self, request):
+        file_format = request.query_params.get("file_format", "csv")
+        if file_format not in FORMATS:
+            return Response(
+                {"file_format": [f"Expected one of: {', '.join(FORMATS)}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(stream_export(queryset, file_format), content_type=CONTENT_TYPES[file_format])
+        response["Content-Disposition"] = f'attachment; filename="jobs.{file_format}"'
         return response
 
+    @swagger_auto_schema(
+        operation_description=(
+            "Bulk-create jobs from an uploaded CSV or NDJSON feed (multipart field `file`). "
+            "Categories and tags are matched by name or slug and created if missing; "
+            "`company` is a company profile id or name. Valid rows are imported and a "
+            "per-line error report is returned for the rest."
+        ),
+        manual_parameters=[
+            openapi.Parameter("file", openapi.IN_FORM, type=openapi.TYPE_FILE, required=True, description="CSV (with header) or NDJSON feed"),
+            openapi.Parameter("file_format", openapi.IN_FORM, type=openapi.TYPE_STRING, description="csv or ndjson; inferred from the file name when omitted"),
+        ],
+        security=[{"Bearer": []}],
+    )
+    @action(detail=False, methods=["post"], url_path="import", parser_classes=[MultiPartParser, FormParser])
+    def bulk_import(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"file": ["This field is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = request.data.get("file_format") or detect_format(upload.name, upload.content_type)
+        if file_format not in FORMATS:
+            return Response(
+                {"file_format": [f"Expected one of: {', '.join(FORMATS)}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        report = JobImporter(request.user).run(read_rows(stream, file_format))
+        if report.created:
+            response_status = status.HTTP_201_CREATED
+        elif report.failed:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(report.as_dict(), status=response_status)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Open jobs most similar to this one by category, tags and title words, best first, "
+            "each with a `similarity` score in (0, 1]. Served from a precomputed index that is "
+            "refreshed in the background when jobs change."
+        ),
+        responses={200: JobListSerializer(many=True)},
+    )
+    @action(detail=True, methods=["get"], pagination_class=None)
+    def related(self, request, pk=None):
+        try:
+            job_id = int(pk)
+        except (TypeError, ValueError):
+            raise NotFound()
+        neighbours = related_jobs(job_id)
+        if not neighbours and not Job.objects.filter(pk=job_id).exists():
+            raise NotFound()
+        data = JobListSerializer(
+            [job for job, _ in neighbours], many=True, context=self.get_serializer_context()
+        ).data
+        for item, (_, score) in zip(data, neighbours):
+            item["similarity"] = round(score, 4)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            # Buffered in memory; jobs.trending flushes the counts in batches
+            record_view(int(self.kwargs[self.lookup_url_kwarg or self.lookup_field]))
+        return response
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Open jobs with the most recent detail views, best first. Each carries a "
+            "`trending_score`: views decayed with a 6-hour half-life. Counts are flushed "
+            "every minute or so, so new views show up after a short delay."
+        ),
+        manual_parameters=[
+            openapi.Parameter("limit", openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Number of jobs (default 20, max 50)"),
+        ],
+        responses={200: JobListSerializer(many=True)},
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def trending(self, request):
+        try:
+            limit = _positive_int(
+                request.query_params["limit"], strict=True, cutoff=self.trending_max_page_size
+            )
+        except (KeyError, ValueError):
+            limit = self.trending_page_size
+
+        def compute():
+            ranked = trending_jobs(limit)
+            data = JobListSerializer(
+                [job for job, _ in ranked], many=True, context=self.get_serializer_context()
+            ).data
+            for item, (_, score) in zip(data, ranked):
+                item["trending_score"] = round(score, 2)
+            return data
+
+        # Rolled over by every flush that adds views; the TTL covers jobs closing
+        key = versioned_key(JOBS_TRENDING, f"limit={limit}")
+        return Response(get_or_compute(key, compute, timeout=self.trending_cache_timeout))
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Search-box suggestions: job titles, company names, categories and tags with a word "
+            "starting with `q`, most open jobs first. Each has a `kind`, the `id` of the category "
+            "or tag (null otherwise) and its open-job count. Served from an in-memory index."
+        ),
+        manual_parameters=[
+            openapi.Parameter("q", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Prefix typed so far"),
+            openapi.Parameter("limit", openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Number of suggestions (default 10, max 20)"),
+        ],
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def autocomplete(self, request):
+        try:
+            limit = _positive_int(
+                request.query_params["limit"], strict=True, cutoff=self.autocomplete_max_page_size
+            )
+        except (KeyError, ValueError):
+            limit = self.autocomplete_page_size
+        return Response(autocomplete_index.suggest(request.query_params.get("q", ""), limit))
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Open jobs recommended for the requesting job seeker, best first, each with a "
+            "`score`. The profile combines the titles and requirements of jobs they applied "
+            "to, those jobs' tags, and their own location; jobs already applied to are left "
+            "out. Without any history `personalized` is false and the newest jobs are returned."
+        ),
+        manual_parameters=[
+            openapi.Parameter("limit", openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Number of jobs (default 20, max 50)"),
+        ],
+        security=[{"Bearer": []}],
+    )
+    @action(detail=False, methods=["get"], pagination_class=None, permission_classes=[permissions.IsAuthenticated])
+    def recommended(self, request):
+        try:
+            limit = _positive_int(
+                request.query_params["limit"], strict=True, cutoff=self.recommended_max_page_size
+            )
+        except (KeyError, ValueError):
+            limit = self.recommended_page_size
+
+        def compute():
+            scored, personalized = recommended_jobs(request.user, limit)
+            data = JobListSerializer(
+                [job for job, _ in scored], many=True, context=self.get_serializer_context()
+            ).data
+            for item, (_, score) in zip(data, scored):
+                item["score"] = None if score is None else round(score, 4)
+            return {"personalized": personalized, "results": data}
+
+        # Invalidated per user when they apply (applications.views)
+        key = versioned_key(user_namespace(JOBS_RECOMMENDED, request.user.pk), f"limit={limit}")
+        return Response(get_or_compute(key, compute, timeout=self.recommended_cache_timeout))
+
     @swagger_auto_schema(operation_description="Create a new job posting.", security=[{"Bearer": []}])
     def create(self, request, *args, **kwargs):
         return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        serializer.save(posted_by=self.request.user)
-        # Invalidate job list cache (simple approach: clear keys with prefix)
-        try:
-            # Using cache.delete_pattern if available (django-redis); fallback to clearing entire cache
-            if hasattr(cache, "delete_pattern"):
-                cache.delete_pattern("jobs:list:*")
-            else:
-                # Best-effort: clear the whole default cache
-                cache.clear()
-        except Exception:
-            pass
+        # Category and tag pks were validated against the reference cache
+        save_checking_references(serializer, posted_by=self.request.user)
+        # Invalidate job list cache by moving the namespace to a new generation
+        bump_generation(JOBS_LIST)
 
     def perform_update(self, serializer):
-        instance = serializer.save()
-        try:
-            if hasattr(cache, "delete_pattern"):
-                cache.delete_pattern("jobs:list:*")
-            else:
-                cache.clear()
-        except Exception:
-            pass
+        # Leaving the public feed is tombstoned by jobs.signals
+        instance = save_checking_references(serializer)
+        # Again after the tags are saved: a read between Job.save() (which
+        # bumps via jobs.signals) and the M2M update could have re-cached them
+        bump_generation(JOBS_LIST, object_namespace(JOB_DETAIL, instance.pk))
 
     def perform_destroy(self, instance):
+        pk = instance.pk
         instance.delete()
-        try:
-            if hasattr(cache, "delete_pattern"):
-                cache.delete_pattern("jobs:list:*")
-            else:
-                cache.clear()
-        except Exception:
-            pass
+        bump_generation(JOBS_LIST, object_namespace(JOB_DETAIL, pk))
 
 
 
 # Companies
-class CompanyProfileViewSet(viewsets.ModelViewSet):
+class CompanyProfileViewSet(ConditionalGetMixin, CachedDetailMixin, viewsets.ModelViewSet):
     queryset = CompanyProfile.objects.all()
     serializer_class = CompanyProfileSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
+    # Invalidated by jobs.signals on every company write
+    detail_cache_namespace = COMPANY_DETAIL
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
 # Categories
-class JobCategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class JobCategoryViewSet(ConditionalGetMixin, ReferenceDataMixin, viewsets.ReadOnlyModelViewSet):
     queryset = JobCategory.objects.all()
     serializer_class = JobCategorySerializer
     permission_classes = [permissions.AllowAny]
+    # Bumped by jobs.signals on every category write
+    conditional_namespace = JOB_CATEGORIES
+    conditional_timestamp_field = None
+    # Rows come from the in-process reference cache instead of the database
+    reference_loader = staticmethod(get_categories)
 
 
 # Tags
-class JobTagViewSet(viewsets.ReadOnlyModelViewSet):
+class JobTagViewSet(ConditionalGetMixin, ReferenceDataMixin, viewsets.ReadOnlyModelViewSet):
     queryset = JobTag.objects.all()
     serializer_class = JobTagSerializer
     permission_classes = [permissions.AllowAny]
+    # Bumped by jobs.signals on every tag write
+    conditional_namespace = JOB_TAGS
+    conditional_timestamp_field = None
+    reference_loader = staticmethod(get_tags)
+
+
+# Saved searches (job alerts)
+class SavedSearchViewSet(viewsets.ModelViewSet):
+    """The signed-in user's saved searches.
+
+    New jobs matching an active search are collected and delivered as one
+    notification and email per user by the periodic digest
+    (jobs.tasks.send_job_alert_digests).
+    """
+
+    serializer_class = SavedSearchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return SavedSearch.objects.none()
+        return SavedSearch.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            index_search(serializer.save(user=self.request.user))
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            index_search(serializer.save())